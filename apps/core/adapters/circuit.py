@@ -0,0 +1,194 @@
+"""
+Per-provider circuit breakers.
+
+A breaker tracks the outcome of recent calls to a provider. Once the error
+rate over the window crosses the threshold it opens and calls fail fast with
+``CircuitOpenError`` instead of waiting on retries and timeouts. After the
+cool-down it lets a limited number of probe calls through (half-open); if
+those succeed it closes again, otherwise it re-opens.
+
+Every state change starts a new generation. ``before_call`` hands out a
+``CallTicket`` stamped with the current one, and a call that outlives its
+generation (retries and timeouts can run past the cool-down) is counted in
+the totals but can't move the breaker.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(provider, retry_after)
+        self.provider = provider
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return (
+            f"{self.provider} is temporarily unavailable; "
+            f"retry in {self.retry_after:.0f}s"
+        )
+
+
+class CallTicket(NamedTuple):
+    """A call reserved by ``CircuitBreaker.before_call``."""
+
+    generation: int
+    probe: bool = False
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker with half-open probing. Thread-safe."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._window = deque()  # (timestamp, failed)
+        self._opened_at = 0.0
+        self._generation = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.totals = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    # --- state transitions (caller holds the lock) -------------------------
+    def _trim(self, now: float) -> None:
+        while self._window and now - self._window[0][0] > self.window_seconds:
+            self._window.popleft()
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._generation += 1
+        self._opened_at = now
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.totals["opened"] += 1
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._generation += 1
+        self._window.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._generation += 1
+        return self._state
+
+    # --- public API ---------------------------------------------------------
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def before_call(self) -> CallTicket:
+        """Reserve a call, or raise ``CircuitOpenError`` to fail fast."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == OPEN or (
+                state == HALF_OPEN and self._probes_in_flight >= self.half_open_probes
+            ):
+                self.totals["rejected"] += 1
+                retry_after = max(0.0, self.open_seconds - (now - self._opened_at))
+                raise CircuitOpenError(self.name, retry_after)
+            if state == HALF_OPEN:
+                self._probes_in_flight += 1
+                return CallTicket(self._generation, probe=True)
+            return CallTicket(self._generation)
+
+    def record(self, ticket: CallTicket, failed: bool) -> None:
+        """Record the outcome of the call ``ticket`` reserved."""
+        with self._lock:
+            now = time.monotonic()
+            self.totals["calls"] += 1
+            self.totals["failures"] += int(failed)
+            self._current_state(now)
+            if ticket.generation != self._generation:
+                return  # reserved before the last state change
+            if ticket.probe:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed:
+                    self._open(now)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._close()
+                return
+
+            self._window.append((now, failed))
+            self._trim(now)
+            calls = len(self._window)
+            failures = sum(1 for _, f in self._window if f)
+            if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                self._open(now)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            state = self._current_state(now)
+            calls = len(self._window)
+            failures = sum(1 for _, f in self._window if f)
+            return {
+                "state": state,
+                "window_calls": calls,
+                "window_failure_rate": failures / calls if calls else 0.0,
+                "retry_after": (
+                    max(0.0, self.open_seconds - (now - self._opened_at))
+                    if state == OPEN
+                    else 0.0
+                ),
+                **self.totals,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``provider``, configured from
+    ``settings.CIRCUIT_BREAKER``."""
+    with _breakers_lock:
+        breaker: Optional[CircuitBreaker] = _breakers.get(provider)
+        if breaker is None:
+            options = getattr(settings, "CIRCUIT_BREAKER", {})
+            breaker = _breakers[provider] = CircuitBreaker(provider, **options)
+        return breaker
+
+
+def all_breakers() -> Dict[str, CircuitBreaker]:
+    with _breakers_lock:
+        return dict(_breakers)
+
+
+def reset_breakers() -> None:
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,152 @@
+"""
+Hedged requests for tail latency.
+
+When hedging is enabled, a GET that hasn't responded within an adaptive
+threshold (a running percentile of recent latencies) is duplicated; the
+first response wins and the other is closed when it arrives. Hedges draw
+from a budget refilled as a fixed fraction of traffic, so they stay a small
+share of requests even when a provider is uniformly slow.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+
+class LatencyTracker:
+    """Running percentile over the last ``window`` latencies."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class HedgeBudget:
+    """Each request earns ``ratio`` of a hedge; a hedge spends one."""
+
+    def __init__(self, ratio: float, burst: float = 2.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def refund(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1.0)
+
+
+def _close_quietly(future) -> None:
+    if future.exception() is None:
+        future.result().close()
+
+
+class Hedger:
+    """Runs calls with at most one hedge each. Thread-safe."""
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        max_ratio: float = 0.05,
+        min_delay: float = 0.05,
+        window: int = 200,
+        min_samples: int = 20,
+        max_workers: int = 32,
+        can_hedge: Callable[[], bool] = lambda: True,
+    ):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.latencies = LatencyTracker(window, min_samples)
+        self.budget = HedgeBudget(max_ratio)
+        self.can_hedge = can_hedge
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+        self._stats_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hedge"
+        )
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _reserve_hedge(self) -> bool:
+        # Budget first: can_hedge() may take a rate token, which shouldn't be
+        # spent on a hedge the budget refuses. If can_hedge() refuses, the
+        # budget token goes back since no hedge was sent.
+        if not self.budget.try_spend():
+            return False
+        if self.can_hedge():
+            return True
+        self.budget.refund()
+        return False
+
+    def threshold(self) -> Optional[float]:
+        observed = self.latencies.percentile(self.percentile)
+        return None if observed is None else max(self.min_delay, observed)
+
+    def run(self, call: Callable):
+        """Return ``call()``'s result, hedging it if it runs past the threshold.
+
+        ``call`` must return an object with ``close()`` (a response); the
+        losing response is closed. In-flight requests can't be aborted, so a
+        loser still completes in the background before being discarded.
+        Losers are never cancelled either: a hedge may own something
+        ``can_hedge()`` reserved for it, which only its response releases.
+        """
+        self._count("requests")
+        self.budget.earn()
+        start = time.monotonic()
+        primary = self._pool.submit(call)
+        delay = self.threshold()
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._reserve_hedge():
+            result = primary.result()
+            self.latencies.record(time.monotonic() - start)
+            return result
+
+        self._count("hedged")
+        logging.debug("Hedging request after %.3fs", delay)
+        hedge = self._pool.submit(call)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer a successful response; a fast failure doesn't beat a
+            # request that is still running.
+            winner = next((f for f in done if f.exception() is None), None)
+            if winner is not None or not pending:
+                break
+        for future in (primary, hedge):
+            if future is not winner:
+                future.add_done_callback(_close_quietly)
+        if winner is None:
+            # both failed: surface the primary's error
+            return primary.result()
+        if winner is hedge:
+            self._count("hedge_wins")
+        self.latencies.record(time.monotonic() - start)
+        return winner.result()
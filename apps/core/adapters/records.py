@@ -0,0 +1,182 @@
+"""
+Normalized listing records produced by every provider adapter.
+
+Adapters parse prices, bed and bathroom counts once, at the edge; everything
+downstream (storage, exports, Sheets, the API) works with integer pence and
+counts instead of re-parsing strings like ``"£1,000,000"``.
+"""
+
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+# Where in the page a record came from
+JSON_LD = "json_ld"
+NEXT_DATA = "next_data"
+HTML = "html"
+
+AMOUNT_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+COUNT_RE = re.compile(r"\d+")
+# API field -> the record attribute it is built from. ``?fields=`` selects
+# API fields; adapters only extract the attributes those need.
+FIELD_ATTRIBUTES = {
+    "url": "url",
+    "address": "address",
+    "price": "price_pence",
+    "price_pence": "price_pence",
+    "beds": "beds",
+    "bathrooms": "bathrooms",
+    "summary": "summary",
+    "service_charge": "service_charge_pence",
+    "service_charge_pence": "service_charge_pence",
+    "source": "source",
+}
+FIELDS = tuple(FIELD_ATTRIBUTES)
+
+# UK outward code, optionally followed by the inward code: "E6", "SW1A 1AA"
+OUTCODE_RE = re.compile(r"\b([A-Z]{1,2}\d[A-Z\d]?)(?:\s*\d[A-Z]{2})?\b")
+
+
+def parse_pence(value: Union[str, int, float, None]) -> Optional[int]:
+    """``"£1,234.50"`` / ``1234.5`` -> ``123450``; anything unpriced -> None."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        amount = Decimal(str(value))
+    else:
+        m = AMOUNT_RE.search(value)
+        if not m:
+            return None
+        try:
+            amount = Decimal(m.group().replace(",", ""))
+        except InvalidOperation:
+            return None
+    return int((amount * 100).to_integral_value())
+
+
+def parse_count(value: Union[str, int, None]) -> Optional[int]:
+    """``"2"`` / ``2`` / ``"2 bedrooms"`` -> ``2``; anything else -> None."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    m = COUNT_RE.search(str(value))
+    return int(m.group()) if m else None
+
+
+def format_pence(pence: Optional[int]) -> Optional[str]:
+    """``100000000`` -> ``"£1,000,000"``; keeps pence only when non-zero."""
+    if pence is None:
+        return None
+    pounds, rem = divmod(pence, 100)
+    return f"£{pounds:,}.{rem:02d}" if rem else f"£{pounds:,}"
+
+
+def extract_outcode(address: Optional[str]) -> Optional[str]:
+    """``"Jahanam Dare, London, E6"`` -> ``"E6"``; the last postcode-like token."""
+    if not address:
+        return None
+    matches = OUTCODE_RE.findall(address.upper())
+    return matches[-1] if matches else None
+
+
+def parse_fields(
+    value: Optional[str], allowed: Iterable[str] = FIELDS
+) -> Optional[Tuple[str, ...]]:
+    """``"url, price"`` -> ``("url", "price")``; empty -> None (every field).
+
+    Raises ValueError naming any field not in ``allowed``.
+    """
+    fields = tuple(
+        dict.fromkeys(f.strip() for f in (value or "").split(",") if f.strip())
+    )
+    if not fields:
+        return None
+    allowed = set(allowed)
+    if unknown := [field for field in fields if field not in allowed]:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. "
+            f"Choose from: {', '.join(sorted(allowed))}."
+        )
+    return fields
+
+
+def attributes_for(fields: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """Record attributes needed to render ``fields`` (None -> all of them)."""
+    if fields is None:
+        return frozenset(FIELD_ATTRIBUTES.values())
+    return frozenset({"url", "source"} | {FIELD_ATTRIBUTES[f] for f in fields})
+
+
+@dataclass(frozen=True, slots=True)
+class ListingRecord:
+    """One scraped listing. Slotted and immutable, so large batches stay small."""
+
+    url: str
+    source: str
+    address: Optional[str] = None
+    price_pence: Optional[int] = None
+    beds: Optional[int] = None
+    bathrooms: Optional[int] = None
+    summary: Optional[str] = None
+    service_charge_pence: Optional[int] = None
+
+    @classmethod
+    def from_raw(
+        cls,
+        url: str,
+        source: str,
+        address=None,
+        price=None,
+        beds=None,
+        bathrooms=None,
+        summary=None,
+        service_charge=None,
+    ) -> "ListingRecord":
+        """Build a record from values as they appear in the page."""
+        return cls(
+            url=url,
+            source=source,
+            address=address,
+            price_pence=parse_pence(price),
+            beds=parse_count(beds),
+            bathrooms=parse_count(bathrooms),
+            summary=summary,
+            service_charge_pence=parse_pence(service_charge),
+        )
+
+    @property
+    def outcode(self) -> Optional[str]:
+        return extract_outcode(self.address)
+
+    @property
+    def price(self) -> Optional[str]:
+        return format_pence(self.price_pence)
+
+    @property
+    def service_charge(self) -> Optional[str]:
+        return format_pence(self.service_charge_pence)
+
+    def as_dict(
+        self, fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Union[str, int, None]]:
+        """API representation: normalized values plus display strings.
+
+        ``fields`` (names from ``FIELDS``) keeps only those keys, in order.
+        """
+        data = {
+            "url": self.url,
+            "address": self.address,
+            "price": self.price,
+            "price_pence": self.price_pence,
+            "beds": self.beds,
+            "bathrooms": self.bathrooms,
+            "summary": self.summary,
+            "service_charge": self.service_charge,
+            "service_charge_pence": self.service_charge_pence,
+            "source": self.source,
+        }
+        if fields is None:
+            return data
+        return {field: data[field] for field in fields}
@@ -2,12 +2,31 @@
 import re
 import json
 import logging
-from typing import Dict, Optional
+import threading
+from functools import partial
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-import requests
-from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from django.conf import settings
+
+from .circuit import get_breaker
+from .hedging import Hedger
+from .ratelimit import TokenBucket
+from .records import HTML, JSON_LD, NEXT_DATA, ListingRecord, attributes_for
+from .scheduling import LaneScheduler, current_lane
+from .streaming import read_until_model
+from .transport import HttpxTransport, RequestsTransport, Transport
+
+# requests/urllib3 and bs4 are imported on first use rather than at module
+# import: views, management commands and fresh workers import this module
+# without ever scraping, and shouldn't pay for the HTTP and parsing stacks.
+
+LISTING_ID_RE = re.compile(r"/properties/(\d+)")
+SEARCH_PATH_RE = re.compile(r"^/property-(for-sale|to-rent)/")
+# crawls only ever fetch from Rightmove itself; any other host would let
+# a caller point the crawler at internal services
+SEARCH_HOSTS = frozenset({"rightmove.co.uk", "www.rightmove.co.uk"})
+JSON_MODEL_RE = re.compile(r"window\.jsonModel\s*=\s*(\{.*?\})\s*</script>", re.DOTALL)
 
 
 class RightmoveAdapterError(Exception):
@@ -21,8 +40,50 @@ class RightmoveAdapterError(Exception):
         return f"RightmoveAdapterError: {self.message}"
 
 
-class RightmoveAdapter:
-    # --- shared session with retries & headers ------------------------------
+class ListingGoneError(RightmoveAdapterError):
+    """The listing returned 410: withdrawn or sold."""
+
+    def __init__(self, url: str):
+        super().__init__("It seems the listing is gone or the property is sold.")
+        self.url = url
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/114.0.0.0 Safari/537.36"
+    )
+}
+
+
+class _ReleaseOnClose:
+    """A streamed response that calls ``release`` once, when it is closed."""
+
+    def __init__(self, resp, release):
+        self._resp = resp
+        self._release = release
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self._resp, name)
+
+    def close(self):
+        try:
+            self._resp.close()
+        finally:
+            with self._lock:
+                release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+def _build_session():
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
     session = requests.Session()
     retry_strategy = Retry(
         total=3,
@@ -33,44 +94,284 @@ class RightmoveAdapter:
     adapter = HTTPAdapter(max_retries=retry_strategy)
     session.mount("https://", adapter)
     session.mount("http://", adapter)
-    session.headers.update(
-        {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/114.0.0.0 Safari/537.36"
-            )
-        }
-    )
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+class _LazyClassAttribute:
+    """Class attribute computed by ``factory`` on first access, then cached.
+
+    The first lookup replaces the descriptor on the owner class with the
+    built value, so later lookups are plain attribute reads.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.lock = threading.Lock()
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        with self.lock:
+            value = owner.__dict__.get(self.name, self)
+            if value is self:
+                value = self.factory()
+                setattr(owner, self.name, value)
+        return value
+
+
+def _soup(body: str):
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+
+    return BeautifulSoup(body, "html.parser")
+
+
+class RightmoveAdapter:
+    # --- shared session with retries & headers, built on first use ----------
+    session = _LazyClassAttribute(_build_session)
+
+    # --- request budget shared by every fetch in the process ----------------
+    SEARCH_PAGE_SIZE = 24
+    # Rightmove stops serving search pages past 42 pages regardless of the total
+    SEARCH_MAX_RESULTS = 42 * 24
+
+    _limiter: Optional[TokenBucket] = None
+    _limiter_lock = threading.Lock()
+
+    @classmethod
+    def limiter(cls) -> TokenBucket:
+        if cls._limiter is None:
+            with cls._limiter_lock:
+                if cls._limiter is None:
+                    cls._limiter = TokenBucket(
+                        getattr(settings, "SCRAPE_RATE_LIMIT", 5.0),
+                        getattr(settings, "SCRAPE_RATE_BURST", 10),
+                    )
+        return cls._limiter
+
+    _scheduler: Optional[LaneScheduler] = None
+
+    @classmethod
+    def scheduler(cls) -> LaneScheduler:
+        """Priority lanes sharing the rate budget and concurrency slots."""
+        if cls._scheduler is None:
+            limiter = cls.limiter()
+            with cls._limiter_lock:
+                if cls._scheduler is None:
+                    cls._scheduler = LaneScheduler(
+                        weights=getattr(settings, "SCRAPE_LANE_WEIGHTS", None),
+                        concurrency=getattr(settings, "SCRAPE_CONCURRENCY", 8),
+                        reserved_interactive=getattr(
+                            settings, "SCRAPE_INTERACTIVE_RESERVED", 1
+                        ),
+                        limiter=limiter,
+                    )
+        return cls._scheduler
+
+    _transport: Optional[Transport] = None
+
+    @classmethod
+    def transport(cls) -> Transport:
+        """The process-wide transport named by ``SCRAPE_TRANSPORT``."""
+        if cls._transport is None:
+            with cls._limiter_lock:
+                if cls._transport is None:
+                    if getattr(settings, "SCRAPE_TRANSPORT", "requests") == "httpx":
+                        cls._transport = HttpxTransport(
+                            headers=DEFAULT_HEADERS,
+                            max_connections=getattr(
+                                settings, "SCRAPE_MAX_CONNECTIONS", 10
+                            ),
+                        )
+                    else:
+                        cls._transport = RequestsTransport(cls.session)
+        return cls._transport
+
+    _hedger: Optional[Hedger] = None
+
+    @classmethod
+    def hedger(cls) -> Optional[Hedger]:
+        """The shared ``Hedger`` if ``SCRAPE_HEDGING["enabled"]``, else None."""
+        options = dict(getattr(settings, "SCRAPE_HEDGING", {}))
+        if not options.pop("enabled", False):
+            return None
+        if cls._hedger is None:
+            with cls._limiter_lock:
+                if cls._hedger is None:
+                    # A hedge is an extra request: it only goes out if the
+                    # caller's lane has a free slot and a rate token right
+                    # now, and never ahead of queued requests.
+                    cls._hedger = Hedger(
+                        can_hedge=lambda: cls.scheduler().try_acquire(current_lane()),
+                        **options,
+                    )
+        return cls._hedger
+
+    PROVIDER = "rightmove"
+
+    @staticmethod
+    def _get(url: str, stream: bool = False):
+        """GET through the rate budget and the provider's circuit breaker.
+
+        The request waits in the caller's priority lane (see
+        ``scheduling.lane``) for a slot and a rate token; a hedge takes its
+        own slot in the same lane. A streamed response keeps its slot until
+        it is closed, so ``SCRAPE_CONCURRENCY`` bounds open downloads rather
+        than just the time to headers. Connection
+        errors, timeouts, exhausted retries and 5xx responses count as
+        failures; while the breaker is open this raises ``CircuitOpenError``
+        without touching the network.
+        """
+        import requests  # pylint: disable=import-outside-toplevel
+
+        breaker = get_breaker(RightmoveAdapter.PROVIDER)
+        scheduler = RightmoveAdapter.scheduler()
+        lane_name = current_lane()
+        ticket = breaker.before_call()
+        hedger = RightmoveAdapter.hedger()
+        transport = RightmoveAdapter.transport()
+
+        def send():
+            # Runs holding a slot in lane_name (the primary's or a hedge's);
+            # the slot is released with the response.
+            release = partial(scheduler.release, lane_name)
+            try:
+                resp = transport.get(url, timeout=10, stream=stream)
+            except BaseException:
+                release()
+                raise
+            if not stream:
+                release()
+                return resp
+            # the body is still to be read: the slot goes with it
+            return _ReleaseOnClose(resp, release)
+
+        failed = False
+        try:
+            scheduler.acquire(lane_name)
+            resp = send() if hedger is None else hedger.run(send)
+            failed = resp.status_code >= 500
+            return resp
+        except requests.RequestException:
+            failed = True
+            raise
+        finally:
+            breaker.record(ticket, failed)
+
+    # --- URL helpers --------------------------------------------------------
+    @staticmethod
+    def listing_id(url: str) -> Optional[str]:
+        m = LISTING_ID_RE.search(url)
+        return m.group(1) if m else None
+
+    @staticmethod
+    def listing_url(listing_id: str) -> str:
+        return f"https://www.rightmove.co.uk/properties/{listing_id}"
 
     @staticmethod
-    def fetch(url: str) -> Dict[str, Optional[str]]:
+    def is_search_url(url: str) -> bool:
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return False
+        return (
+            parts.scheme == "https"
+            and parts.hostname in SEARCH_HOSTS
+            and port in (None, 443)
+            and bool(SEARCH_PATH_RE.match(parts.path))
+        )
+
+    @staticmethod
+    def search_page_url(url: str, index: int) -> str:
+        parts = urlsplit(url.split("#")[0])
+        query = [(k, v) for k, v in parse_qsl(parts.query) if k != "index"]
+        if index:
+            query.append(("index", str(index)))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    # --- search results -----------------------------------------------------
+    @staticmethod
+    def fetch_search_page(url: str) -> Tuple[List[str], int]:
+        """Return ``(listing_ids, total_results)`` for one search-results page."""
+        logging.debug("Fetching search page: %r", url)
+        resp = RightmoveAdapter._get(url)
+        resp.raise_for_status()
+        body = resp.text
+
+        model = None
+        if m := JSON_MODEL_RE.search(body):
+            model = json.loads(m.group(1))
+        else:
+            soup = _soup(body)
+            next_data = soup.find("script", id="__NEXT_DATA__")
+            if next_data:
+                payload = json.loads(next_data.string or "{}")
+                model = (
+                    payload.get("props", {})
+                    .get("pageProps", {})
+                    .get("searchResults", {})
+                )
+        if not model:
+            raise ValueError("Search results JSON extraction failed")
+
+        ids = [
+            str(prop["id"]) for prop in model.get("properties", []) if prop.get("id")
+        ]
+        total = int(str(model.get("resultCount") or len(ids)).replace(",", ""))
+        return ids, total
+
+    @staticmethod
+    def fetch(url: str, fields: Optional[Iterable[str]] = None) -> ListingRecord:
+        """Scrape one listing page.
+
+        ``fields`` (API field names, see ``records.FIELDS``) limits extraction
+        to what those fields need; attributes nobody asked for, such as the
+        description, are left as None instead of being looked up.
+        """
+        import requests  # pylint: disable=import-outside-toplevel
+
+        wanted = attributes_for(fields)
         clean_url = url.split("#")[0]
         logging.debug("Fetching URL: %r", clean_url)
 
+        resp = None
         try:
-            resp = RightmoveAdapter.session.get(clean_url, timeout=10)
+            resp = RightmoveAdapter._get(clean_url, stream=True)
             resp.raise_for_status()
         except requests.HTTPError as e:
+            if resp is not None:
+                resp.close()
             if (
                 hasattr(e, "response")
                 and e.response is not None
                 and e.response.status_code == 410
             ):
                 logging.error("Listing gone (410): %r", clean_url)
-                return {
-                    "error": "It seems the listing is gone or the property is sold."
-                }
+                raise ListingGoneError(clean_url) from e
             logging.error("HTTP error fetching %r: %s", clean_url, e)
             raise
         except requests.exceptions.RequestException as e:
             logging.error("Request exception for %r: %s", clean_url, e)
             raise
 
-        body = resp.text
-        logging.debug("HTTP %d received, body length=%d", resp.status_code, len(body))
+        # Stop reading once the embedded model is complete; the HTML fallback
+        # below only sees the whole page when no model was found.
+        page = read_until_model(
+            resp, getattr(settings, "SCRAPE_MAX_BODY_BYTES", 5 * 1024 * 1024)
+        )
+        body = page.text
+        logging.debug(
+            "HTTP %d received, read %d bytes (model=%s, truncated=%s)",
+            resp.status_code,
+            page.bytes_read,
+            page.model_kind,
+            page.truncated,
+        )
 
-        soup = BeautifulSoup(body, "html.parser")
+        soup = _soup(body)
 
         # --- 1) JSON-LD parsing ---------------------------------------------
         for script in soup.find_all("script", type="application/ld+json"):
@@ -84,15 +385,9 @@ class RightmoveAdapter:
                     )
                     price = data.get("price")
                     logging.debug("Parsed JSON-LD Offer object")
-                    return {
-                        "url": clean_url,
-                        "address": address,
-                        "price": f"£{price}" if price else None,
-                        "beds": None,
-                        "bathrooms": None,
-                        "summary": None,
-                        "service_charge": None,
-                    }
+                    return ListingRecord.from_raw(
+                        clean_url, JSON_LD, address=address, price=price
+                    )
             except (ValueError, TypeError):
                 continue
         logging.debug("Found 0 usable JSON-LD scripts")
@@ -109,29 +404,35 @@ class RightmoveAdapter:
                     .get("propertySummary", {})
                     .get("listing", {})
                 )
-                # Robustly check for propertyDescription in all likely locations
                 desc = None
-                if "propertyDescription" in page_props:
-                    desc = page_props["propertyDescription"].get("description")
-                elif "propertyDescription" in props:
-                    desc = props["propertyDescription"].get("description")
-                elif "propertyDescription" in payload.get("props", {}):
-                    desc = payload["props"]["propertyDescription"].get("description")
-                elif "propertyDescription" in page_props.get("initialReduxState", {}):
-                    desc = page_props["initialReduxState"]["propertyDescription"].get(
-                        "description"
-                    )
-                print("DEBUG: desc:", desc)
+                # Only look the description up when it was asked for; check
+                # for propertyDescription in all likely locations
+                if "summary" in wanted:
+                    if "propertyDescription" in page_props:
+                        desc = page_props["propertyDescription"].get("description")
+                    elif "propertyDescription" in props:
+                        desc = props["propertyDescription"].get("description")
+                    elif "propertyDescription" in payload.get("props", {}):
+                        desc = payload["props"]["propertyDescription"].get(
+                            "description"
+                        )
+                    elif "propertyDescription" in page_props.get(
+                        "initialReduxState", {}
+                    ):
+                        desc = page_props["initialReduxState"][
+                            "propertyDescription"
+                        ].get("description")
                 logging.debug("Parsed __NEXT_DATA__ model")
-                return {
-                    "url": clean_url,
-                    "address": listing.get("displayAddress"),
-                    "price": listing.get("formattedPrice"),
-                    "beds": listing.get("bedroomNumber"),
-                    "bathrooms": listing.get("bathroomNumber"),
-                    "summary": desc,
-                    "service_charge": listing.get("serviceCharge"),
-                }
+                return ListingRecord.from_raw(
+                    clean_url,
+                    NEXT_DATA,
+                    address=listing.get("displayAddress"),
+                    price=listing.get("formattedPrice"),
+                    beds=listing.get("bedroomNumber"),
+                    bathrooms=listing.get("bathroomNumber"),
+                    summary=desc,
+                    service_charge=listing.get("serviceCharge"),
+                )
             except (KeyError, ValueError, TypeError) as e:
                 logging.warning("Failed to parse __NEXT_DATA__: %s", e)
 
@@ -153,15 +454,20 @@ class RightmoveAdapter:
             price = m.group()
 
         # service charge: “Service Charge … £X”
-        if sc := re.search(r"Service\s*Charge.*?(£[\d,]+)", body, flags=re.IGNORECASE):
+        if "service_charge_pence" in wanted and (
+            sc := re.search(r"Service\s*Charge.*?(£[\d,]+)", body, flags=re.IGNORECASE)
+        ):
             service_charge = sc.group(1)
 
         # summary: page’s meta[name="description"]
-        if meta := soup.find("meta", attrs={"name": "description"}):
+        if "summary" in wanted and (
+            meta := soup.find("meta", attrs={"name": "description"})
+        ):
             summary = meta.get("content", "").strip() or None
 
         # beds & bathrooms: look up <dt> label + next <dd>
-        for dt in soup.select("dl dt"):
+        rooms = soup.select("dl dt") if wanted & {"beds", "bathrooms"} else []
+        for dt in rooms:
             label = dt.get_text(strip=True).lower()
             dd = dt.find_next_sibling("dd")
             if not dd:
@@ -184,15 +490,16 @@ class RightmoveAdapter:
                 summary,
                 service_charge,
             )
-            return {
-                "url": clean_url,
-                "address": address,
-                "price": price,
-                "beds": beds,
-                "bathrooms": bathrooms,
-                "summary": summary,
-                "service_charge": service_charge,
-            }
+            return ListingRecord.from_raw(
+                clean_url,
+                HTML,
+                address=address,
+                price=price,
+                beds=beds,
+                bathrooms=bathrooms,
+                summary=summary,
+                service_charge=service_charge,
+            )
 
         # --- all strategies failed ------------------------------------------
         # If the response was not 2xx, raise HTTPError (for test_fetch_non_200_status_code)
@@ -0,0 +1,207 @@
+"""
+Priority lanes for outbound provider requests.
+
+Requests are queued per lane (interactive scrapes, bulk crawls, background
+rescrapes) and dispatched by weighted fair queueing: when lanes compete,
+each gets concurrency slots and rate tokens in proportion to its weight, so
+a large import can't starve a single interactive scrape. A few slots can be
+reserved for the interactive lane, which bounds its wait to the rate
+budget rather than to the bulk backlog.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from .ratelimit import TokenBucket
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BULK, BACKGROUND)
+
+_current_lane = contextvars.ContextVar("scrape_lane", default=BULK)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+@contextmanager
+def lane(name: str):
+    """Run the enclosed requests in lane ``name``."""
+    if name not in LANES:
+        raise ValueError(f"Unknown lane: {name!r}")
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def in_lane(name: str, func: Callable) -> Callable:
+    """Wrap ``func`` so it runs in lane ``name``, e.g. on a worker thread."""
+
+    def wrapper(*args, **kwargs):
+        with lane(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class _Ticket:
+    __slots__ = ("lane", "enqueued", "granted")
+
+    def __init__(self, lane_name: str):
+        self.lane = lane_name
+        self.enqueued = time.monotonic()
+        self.granted = False
+
+
+class _LaneStats:
+    def __init__(self, window: int = 500):
+        self.dispatched = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, waited: float) -> None:
+        self.dispatched += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.recent.append(waited)
+
+    def snapshot(self) -> Dict:
+        recent = sorted(self.recent)
+        return {
+            "dispatched": self.dispatched,
+            "avg_wait": self.total_wait / self.dispatched if self.dispatched else 0.0,
+            "max_wait": self.max_wait,
+            "p95_wait": recent[int(len(recent) * 0.95)] if recent else 0.0,
+        }
+
+
+class LaneScheduler:
+    """Weighted fair scheduler over concurrency slots and rate tokens."""
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        concurrency: int = 8,
+        reserved_interactive: int = 1,
+        limiter: Optional[TokenBucket] = None,
+    ):
+        self.weights = {INTERACTIVE: 8, BULK: 3, BACKGROUND: 1, **(weights or {})}
+        self.concurrency = concurrency
+        self.reserved_interactive = min(reserved_interactive, concurrency - 1)
+        self.limiter = limiter
+        self._cond = threading.Condition()
+        self._queues = {name: deque() for name in LANES}
+        self._active = {name: 0 for name in LANES}
+        self._stats = {name: _LaneStats() for name in LANES}
+        # Stride scheduling: each dispatch advances the lane's pass by
+        # 1 / weight; the backlogged lane with the lowest pass goes next.
+        self._pass = {name: 0.0 for name in LANES}
+
+    # --- dispatch (caller holds the condition) -----------------------------
+    def _pick(self) -> Optional[str]:
+        in_use = sum(self._active.values())
+        candidates = [
+            name
+            for name in LANES
+            if self._queues[name]
+            and (
+                name == INTERACTIVE
+                or in_use < self.concurrency - self.reserved_interactive
+            )
+        ]
+        if not candidates or in_use >= self.concurrency:
+            return None
+        return min(candidates, key=lambda name: (self._pass[name], LANES.index(name)))
+
+    def _dispatch(self) -> None:
+        while (name := self._pick()) is not None:
+            if self.limiter is not None and not self.limiter.try_acquire():
+                return
+            ticket = self._queues[name].popleft()
+            ticket.granted = True
+            self._active[name] += 1
+            self._pass[name] += 1.0 / self.weights[name]
+            self._stats[name].record(time.monotonic() - ticket.enqueued)
+            self._cond.notify_all()
+
+    def _retry_delay(self) -> Optional[float]:
+        if self.limiter is None or self.limiter.rate <= 0:
+            return None
+        return 1.0 / self.limiter.rate
+
+    # --- public API ---------------------------------------------------------
+    def acquire(self, lane_name: str) -> None:
+        ticket = _Ticket(lane_name)
+        with self._cond:
+            if not self._queues[lane_name]:
+                # A lane returning from idle starts level with the busiest
+                # lane instead of spending credit it built up while idle.
+                busy = [self._pass[n] for n in LANES if self._queues[n]]
+                if busy:
+                    self._pass[lane_name] = max(self._pass[lane_name], min(busy))
+            self._queues[lane_name].append(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                self._cond.wait(self._retry_delay())
+                if not ticket.granted:
+                    self._dispatch()
+
+    def try_acquire(self, lane_name: str) -> bool:
+        """Take a slot in ``lane_name`` only if one is free right now.
+
+        Fails while any request is queued, so an opportunistic request (a
+        hedge) never gets ahead of one that is waiting.
+        """
+        with self._cond:
+            in_use = sum(self._active.values())
+            limit = self.concurrency
+            if lane_name != INTERACTIVE:
+                limit -= self.reserved_interactive
+            if any(self._queues.values()) or in_use >= limit:
+                return False
+            if self.limiter is not None and not self.limiter.try_acquire():
+                return False
+            self._active[lane_name] += 1
+            self._pass[lane_name] += 1.0 / self.weights[lane_name]
+            self._stats[lane_name].record(0.0)
+            return True
+
+    def release(self, lane_name: str) -> None:
+        with self._cond:
+            self._active[lane_name] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, lane_name: Optional[str] = None):
+        lane_name = lane_name or current_lane()
+        self.acquire(lane_name)
+        try:
+            yield
+        finally:
+            self.release(lane_name)
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return {
+                name: {
+                    "weight": self.weights[name],
+                    "queued": len(self._queues[name]),
+                    "active": self._active[name],
+                    "oldest_wait": (
+                        time.monotonic() - self._queues[name][0].enqueued
+                        if self._queues[name]
+                        else 0.0
+                    ),
+                    **self._stats[name].snapshot(),
+                }
+                for name in LANES
+            }
@@ -0,0 +1,138 @@
+"""
+Incremental reading of listing pages.
+
+Listing pages embed their data model (``__NEXT_DATA__`` or a JSON-LD
+``Offer``) well before the end of the document. ``read_until_model`` streams
+the response body, scans each chunk for a complete embedded model and stops
+reading as soon as one is captured, or once the body exceeds a size cap.
+"""
+
+import codecs
+import json
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+OPEN_SCRIPT_RE = re.compile(r"<script\b([^>]*)>", re.IGNORECASE)
+CLOSE_SCRIPT_RE = re.compile(r"</script\s*>", re.IGNORECASE)
+NEXT_DATA_ATTR_RE = re.compile(r"""id\s*=\s*["']?__NEXT_DATA__""", re.IGNORECASE)
+JSON_LD_ATTR_RE = re.compile(r"application/ld\+json", re.IGNORECASE)
+
+# Longest suffix of a chunk that may hold a tag split across chunks
+_TAG_TAIL = 256
+
+
+class ModelScanner:
+    """Feed decoded text chunks; reports when a usable model has closed.
+
+    Chunks are kept as a list and joined once, in ``text``. Each ``feed``
+    only searches the unscanned tail of the previous chunks (at most
+    ``_TAG_TAIL`` characters) plus the new chunk, so the cost stays linear in
+    the body size however many chunks arrive.
+    """
+
+    def __init__(self):
+        self.model_kind = None
+        self._chunks = []
+        self._offsets = []  # where each chunk starts in the body
+        self._length = 0
+        self._window = ""  # body text from self._pos onwards
+        self._pos = 0
+        self._open = None  # (kind, content start) of an unclosed <script>
+
+    @property
+    def text(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+            self._offsets = [0]
+        return self._chunks[0] if self._chunks else ""
+
+    def _slice(self, start: int, end: int) -> str:
+        first = bisect_right(self._offsets, start) - 1
+        last = bisect_left(self._offsets, end)
+        base = self._offsets[first]
+        return "".join(self._chunks[first:last])[start - base : end - base]
+
+    def feed(self, chunk: str) -> bool:
+        if chunk:
+            self._chunks.append(chunk)
+            self._offsets.append(self._length)
+            self._length += len(chunk)
+            self._window += chunk
+        base = self._pos
+        pos = 0
+        while self.model_kind is None:
+            if self._open is None:
+                m = OPEN_SCRIPT_RE.search(self._window, pos)
+                if not m:
+                    pos = max(pos, len(self._window) - _TAG_TAIL)
+                    break
+                attrs = m.group(1)
+                if NEXT_DATA_ATTR_RE.search(attrs):
+                    kind = "next_data"
+                elif JSON_LD_ATTR_RE.search(attrs):
+                    kind = "json_ld"
+                else:
+                    kind = None
+                self._open = (kind, base + m.end())
+                pos = m.end()
+
+            kind, start = self._open
+            m = CLOSE_SCRIPT_RE.search(self._window, pos)
+            if not m:
+                pos = max(pos, len(self._window) - _TAG_TAIL)
+                break
+            self._open = None
+            pos = m.end()
+            if kind and self._is_model(kind, self._slice(start, base + m.start())):
+                self.model_kind = kind
+        self._window = self._window[pos:]
+        self._pos = base + pos
+        return self.model_kind is not None
+
+    @staticmethod
+    def _is_model(kind: str, content: str) -> bool:
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return False
+        if kind == "next_data":
+            return isinstance(data, dict)
+        return isinstance(data, dict) and data.get("@type") == "Offer"
+
+
+@dataclass
+class BodyRead:
+    text: str
+    bytes_read: int
+    model_kind: str = None
+    truncated: bool = False
+
+
+def read_until_model(resp, max_bytes: int, chunk_size: int = 16384) -> BodyRead:
+    """Stream ``resp`` until an embedded model is complete or ``max_bytes``.
+
+    The response is always closed on return, which drops the connection
+    instead of draining the rest of the page.
+    """
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    scanner = ModelScanner()
+    read = 0
+    truncated = False
+    try:
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            read += len(chunk)
+            if scanner.feed(decoder.decode(chunk)):
+                break
+            if max_bytes and read >= max_bytes:
+                truncated = True
+                logging.warning(
+                    "Body exceeded %d bytes; parsing what was read", max_bytes
+                )
+                break
+        else:
+            scanner.feed(decoder.decode(b"", final=True))
+    finally:
+        resp.close()
+    return BodyRead(scanner.text, read, scanner.model_kind, truncated)
@@ -0,0 +1,267 @@
+"""
+HTTP transports under ``RightmoveAdapter``.
+
+A transport does one thing: ``get(url, timeout, stream)`` returning a
+requests-style response (``status_code``, ``encoding``, ``text``,
+``iter_content``, ``raise_for_status``, ``close``) and raising ``requests``
+exceptions, so the breaker, hedger and parsers work unchanged on top of
+either implementation:
+
+- ``RequestsTransport`` (default): the adapter's ``requests`` session over
+  HTTP/1.1, one pooled connection per concurrent request.
+- ``HttpxTransport`` (``SCRAPE_TRANSPORT = "httpx"``, needs ``httpx[http2]``):
+  one process-wide HTTP/2 client, so concurrent fetches to a host share a few
+  multiplexed connections, and DNS lookups and TLS handshakes happen once per
+  connection rather than per worker. It counts connections and handshake
+  time through httpcore's trace hook.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# (step, perf_counter at start) of the handshake step the current request's
+# task is in
+_step_started: ContextVar[Optional[Tuple[str, float]]] = ContextVar(
+    "transport_step_started", default=None
+)
+
+
+class Transport(ABC):
+    """Interface shared by the adapter's HTTP transports."""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, url: str, timeout: float = 10, stream: bool = False):
+        """GET ``url``, returning a requests-style response."""
+
+    def stats(self) -> Dict:
+        return {"transport": self.name}
+
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    """GET through a ``requests`` session (retries and headers are the session's)."""
+
+    name = "requests"
+
+    def __init__(self, session):
+        self.session = session
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, timeout: float = 10, stream: bool = False):
+        with self._lock:
+            self._requests += 1
+        return self.session.get(url, timeout=timeout, stream=stream)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"transport": self.name, "requests": self._requests}
+
+    def close(self) -> None:
+        self.session.close()
+
+
+@contextmanager
+def _translated_errors():
+    """Re-raise httpx errors as the ``requests`` exceptions callers handle."""
+    # pylint: disable=import-outside-toplevel
+    import httpx
+    import requests
+
+    try:
+        yield
+    except httpx.TimeoutException as exc:
+        raise requests.Timeout(str(exc)) from exc
+    except (httpx.ConnectError, httpx.RemoteProtocolError) as exc:
+        raise requests.ConnectionError(str(exc)) from exc
+    except httpx.HTTPError as exc:
+        raise requests.RequestException(str(exc)) from exc
+
+
+class HttpxResponse:
+    """An ``httpx.Response`` owned by the transport's event loop, behind the
+    requests interface; body reads are run on that loop."""
+
+    def __init__(self, response, run):
+        self._response = response
+        self._run = run
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+
+    @property
+    def encoding(self) -> Optional[str]:
+        return self._response.charset_encoding
+
+    @property
+    def content(self) -> bytes:
+        return self._run(self._response.aread())
+
+    @property
+    def text(self) -> str:
+        self._run(self._response.aread())
+        return self._response.text
+
+    def iter_content(self, chunk_size: int = 16384) -> Iterator[bytes]:
+        chunks = self._response.aiter_bytes(chunk_size)
+        while (chunk := self._run(_next_chunk(chunks))) is not None:
+            yield chunk
+
+    def raise_for_status(self) -> None:
+        import requests  # pylint: disable=import-outside-toplevel
+
+        if self.status_code >= 400:
+            raise requests.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+    def close(self) -> None:
+        self._run(self._response.aclose())
+
+
+async def _next_chunk(chunks) -> Optional[bytes]:
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class HttpxTransport(Transport):
+    """GET through one shared ``httpx.AsyncClient`` with HTTP/2 enabled.
+
+    The client and its connection pool live on a private event-loop thread;
+    worker threads submit requests to it and block on the result. (httpcore's
+    synchronous HTTP/2 connection isn't safe to share between threads: its
+    header compression state races.) ``http1=False`` speaks HTTP/2 with prior
+    knowledge (h2c), which is how the tests reach a cleartext local server;
+    against https hosts the protocol is negotiated with ALPN.
+    """
+
+    name = "httpx"
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        max_connections: int = 10,
+        retries: int = 3,
+        backoff_factor: float = 1.0,
+        http1: bool = True,
+    ):
+        # pylint: disable=import-outside-toplevel
+        import asyncio
+        import ssl
+
+        import httpx
+
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="httpx-transport", daemon=True
+        )
+        self._thread.start()
+        # One SSL context and one connection pool for every worker thread
+        self.ssl_context = ssl.create_default_context()
+        self.client = httpx.AsyncClient(
+            http1=http1,
+            http2=True,
+            verify=self.ssl_context,
+            headers=headers,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=httpx.AsyncHTTPTransport(
+                http1=http1, http2=True, verify=self.ssl_context, retries=1
+            ),
+        )
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "connections": 0,
+            "tls_handshakes": 0,
+            "connect_seconds": 0.0,
+            "tls_seconds": 0.0,
+            "http_versions": {},
+        }
+
+    def _run(self, coro):
+        """Run ``coro`` on the transport's loop and wait for its result."""
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        with _translated_errors():
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _trace(self, event: str, info: Dict) -> None:
+        # Called by httpcore around each step of a request; a connect or
+        # start_tls step only happens when a new connection is opened. Each
+        # request runs in its own task, so the step's start time is kept in a
+        # context variable: concurrent handshakes don't see each other's.
+        step, _, phase = event.rpartition(".")
+        if step not in ("connection.connect_tcp", "connection.start_tls"):
+            return
+        now = time.perf_counter()
+        if phase == "started":
+            _step_started.set((step, now))
+            return
+        started = _step_started.get()
+        _step_started.set(None)
+        if phase != "complete" or started is None or started[0] != step:
+            return
+        began = started[1]
+        with self._lock:
+            if step == "connection.connect_tcp":
+                self._stats["connections"] += 1
+                self._stats["connect_seconds"] += now - began
+            else:
+                self._stats["tls_handshakes"] += 1
+                self._stats["tls_seconds"] += now - began
+
+    async def _get(self, url: str, timeout: float, stream: bool):
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        attempt = 0
+        while True:
+            request = self.client.build_request(
+                "GET", url, timeout=timeout, extensions={"trace": self._trace}
+            )
+            response = await self.client.send(request, stream=stream)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                return response
+            await response.aclose()
+            await asyncio.sleep(self.backoff_factor * 2**attempt)
+            attempt += 1
+
+    def get(self, url: str, timeout: float = 10, stream: bool = False):
+        response = self._run(self._get(url, timeout, stream))
+        with self._lock:
+            self._stats["requests"] += 1
+            versions = self._stats["http_versions"]
+            versions[response.http_version] = versions.get(response.http_version, 0) + 1
+        return HttpxResponse(response, self._run)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "transport": self.name,
+                **self._stats,
+                "http_versions": dict(self._stats["http_versions"]),
+            }
+
+    def close(self) -> None:
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,462 @@
+"""
+Saved-search alerts.
+
+Active saved searches are held in an in-memory ``SearchIndex`` keyed by
+outcode and price bucket: a search is registered under every bucket its
+price range overlaps (a missing minimum counts as £0), so matching a listing
+looks at one bucket instead of scanning every search. Ranges too wide to
+bucket (no maximum, or spanning more than ``MAX_BUCKETS``) are kept per
+outcode sorted by their open bound, and a bisect finds the ones a price
+falls into.
+
+When ``upsert_listing`` stores a new listing or a new price, the matches are
+recorded as ``SearchAlert`` rows (at most one per search, listing and
+price) and, once the transaction commits, handed to ``AlertDispatcher``.
+Its thread batches pending alerts per destination: one webhook POST per
+URL, one email per address. Webhook URLs must resolve to public addresses
+(checked when a search is saved and again before each POST, which then
+connects to the checked address), unless their host is listed in
+``ALERTS_WEBHOOK_ALLOWED_HOSTS``.
+"""
+
+import ipaddress
+import logging
+import queue
+import socket
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .adapters.records import format_pence
+from .models import Listing, SavedSearch, SearchAlert
+
+logger = logging.getLogger(__name__)
+
+PRICE_BUCKET_PENCE = 2_500_000  # £25k
+# A search spanning more buckets than this is kept in its outcode's list of
+# wide searches sorted by maximum price instead
+MAX_BUCKETS = 64
+
+
+@dataclass(frozen=True, slots=True)
+class SearchSpec:
+    """The matching criteria of one ``SavedSearch``."""
+
+    id: int
+    outcode: Optional[str] = None
+    min_price_pence: Optional[int] = None
+    max_price_pence: Optional[int] = None
+    min_beds: Optional[int] = None
+    max_beds: Optional[int] = None
+
+    @classmethod
+    def from_model(cls, search: SavedSearch) -> "SearchSpec":
+        return cls(
+            search.pk,
+            (search.outcode or "").upper() or None,
+            search.min_price_pence,
+            search.max_price_pence,
+            search.min_beds,
+            search.max_beds,
+        )
+
+    def matches(
+        self, outcode: Optional[str], price_pence: Optional[int], beds: Optional[int]
+    ) -> bool:
+        if self.outcode is not None and self.outcode != outcode:
+            return False
+        for value, low, high in (
+            (price_pence, self.min_price_pence, self.max_price_pence),
+            (beds, self.min_beds, self.max_beds),
+        ):
+            if low is None and high is None:
+                continue
+            if value is None:
+                return False
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+
+class SearchIndex:
+    """Saved searches bucketed by (outcode, price bucket) for matching.
+
+    Per outcode, searches without price bounds are kept in ``_any`` (they
+    match every price), searches with only a minimum in ``_from`` sorted by
+    minimum, and searches too wide to bucket in ``_upto`` sorted by maximum.
+    """
+
+    def __init__(
+        self, specs: Iterable[SearchSpec] = (), bucket_pence: int = PRICE_BUCKET_PENCE
+    ):
+        self.bucket_pence = bucket_pence
+        self._buckets: Dict[Tuple[Optional[str], int], List[SearchSpec]] = defaultdict(
+            list
+        )
+        # (bound, id, spec) tuples; the unique id keeps specs out of comparisons
+        self._from: Dict[Optional[str], List[Tuple]] = defaultdict(list)
+        self._upto: Dict[Optional[str], List[Tuple]] = defaultdict(list)
+        self._any: Dict[Optional[str], List[SearchSpec]] = defaultdict(list)
+        self.size = 0
+        for spec in specs:
+            self.add(spec)
+
+    def add(self, spec: SearchSpec) -> None:
+        self.size += 1
+        low, high = spec.min_price_pence, spec.max_price_pence
+        if low is None and high is None:
+            self._any[spec.outcode].append(spec)
+            return
+        if high is None:
+            insort(self._from[spec.outcode], (low, spec.id, spec))
+            return
+        first = (low or 0) // self.bucket_pence
+        last = high // self.bucket_pence
+        if last - first + 1 > MAX_BUCKETS:
+            insort(self._upto[spec.outcode], (high, spec.id, spec))
+            return
+        for bucket in range(first, last + 1):
+            self._buckets[(spec.outcode, bucket)].append(spec)
+
+    def match(
+        self, outcode: Optional[str], price_pence: Optional[int], beds: Optional[int]
+    ) -> List[int]:
+        """IDs of the searches matching a listing with these attributes."""
+        candidates: List[SearchSpec] = []
+        for key in {outcode, None}:
+            candidates += self._any.get(key, ())
+            if price_pence is None:
+                continue  # searches with price bounds skip unpriced listings
+            candidates += self._buckets.get((key, price_pence // self.bucket_pence), ())
+            if opened := self._from.get(key):
+                # minimum <= price
+                end = bisect_right(opened, (price_pence, float("inf")))
+                candidates += (spec for _, _, spec in opened[:end])
+            if capped := self._upto.get(key):
+                # maximum >= price
+                start = bisect_left(capped, (price_pence, float("-inf")))
+                candidates += (spec for _, _, spec in capped[start:])
+        return sorted(
+            spec.id for spec in candidates if spec.matches(outcode, price_pence, beds)
+        )
+
+    @classmethod
+    def load(cls) -> "SearchIndex":
+        return cls(
+            SearchSpec.from_model(search)
+            for search in SavedSearch.objects.filter(active=True).iterator()
+        )
+
+
+_index: Optional[SearchIndex] = None
+_index_loaded_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_index() -> SearchIndex:
+    """The process-wide index; reloaded after ``ALERTS_INDEX_TTL`` seconds.
+
+    Edits made in this process invalidate it immediately; the TTL picks up
+    searches saved by other processes.
+    """
+    global _index, _index_loaded_at  # pylint: disable=global-statement
+    ttl = getattr(settings, "ALERTS_INDEX_TTL", 300)
+    with _index_lock:
+        if _index is None or time.monotonic() - _index_loaded_at > ttl:
+            _index = SearchIndex.load()
+            _index_loaded_at = time.monotonic()
+        return _index
+
+
+def invalidate_index() -> None:
+    global _index  # pylint: disable=global-statement
+    with _index_lock:
+        _index = None
+
+
+@receiver(post_save, sender=SavedSearch)
+@receiver(post_delete, sender=SavedSearch)
+def _saved_search_changed(**kwargs):
+    transaction.on_commit(invalidate_index)
+
+
+def listing_ingested(
+    listing: Listing, created: bool, previous_price_pence: Optional[int]
+) -> List[SearchAlert]:
+    """Record alerts for a new or re-priced listing and queue their delivery."""
+    if not created and previous_price_pence == listing.price_pence:
+        return []
+    search_ids = get_index().match(listing.outcode, listing.price_pence, listing.beds)
+    if not search_ids:
+        return []
+    already = set(
+        SearchAlert.objects.filter(
+            search_id__in=search_ids,
+            listing=listing,
+            price_pence=listing.price_pence,
+        ).values_list("search_id", flat=True)
+    )
+    alerts = [
+        SearchAlert.objects.create(
+            search_id=search_id,
+            listing=listing,
+            price_pence=listing.price_pence,
+            previous_price_pence=None if created else previous_price_pence,
+        )
+        for search_id in search_ids
+        if search_id not in already
+    ]
+    if alerts:
+        ids = [alert.pk for alert in alerts]
+        transaction.on_commit(lambda: get_dispatcher().enqueue(ids))
+    return alerts
+
+
+# --- delivery ----------------------------------------------------------------
+class WebhookURLError(ValueError):
+    """A webhook URL the server must not POST to."""
+
+
+def check_webhook_url(url: str) -> List[str]:
+    """Raise ``WebhookURLError`` unless ``url`` is http(s) to public addresses.
+
+    Every address the host resolves to must be globally routable (no
+    loopback, private, link-local or metadata addresses). Returns those
+    addresses, for the POST to connect to. Hosts listed in
+    ``ALERTS_WEBHOOK_ALLOWED_HOSTS`` skip the address check and return [].
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookURLError("Webhook URLs must be http(s) URLs with a host.")
+    host = parts.hostname
+    if host in getattr(settings, "ALERTS_WEBHOOK_ALLOWED_HOSTS", ()):
+        return []
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError, ValueError) as exc:
+        raise WebhookURLError(f"Can't resolve webhook host {host!r}.") from exc
+    addresses = []
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            raise WebhookURLError(
+                f"Webhook host {host!r} resolves to a non-public address."
+            )
+        addresses.append(str(address))
+    return list(dict.fromkeys(addresses))
+
+
+def post_pinned(url: str, address: Optional[str], **kwargs):
+    """``requests.post`` to ``url``, connecting to ``address`` if given.
+
+    Only the TCP connection is pinned: the Host header, TLS SNI and the
+    certificate check still use the URL's hostname. A host whose DNS answer
+    changes after ``check_webhook_url`` (DNS rebinding) can't steer the POST
+    to an address that wasn't checked.
+    """
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    if address is None:
+        return requests.post(url, **kwargs)
+    parts = urlsplit(url)
+    ip = f"[{address}]" if ":" in address else address
+    netloc = ip if parts.port is None else f"{ip}:{parts.port}"
+    kwargs["headers"] = {
+        "Host": parts.netloc.rpartition("@")[2],
+        **kwargs.get("headers", {}),
+    }
+    if parts.username:
+        kwargs.setdefault(
+            "auth", (unquote(parts.username), unquote(parts.password or ""))
+        )
+    with requests.Session() as session:
+        adapter = HTTPAdapter()
+        adapter.poolmanager.connection_pool_kw.update(
+            server_hostname=parts.hostname, assert_hostname=parts.hostname
+        )
+        session.mount("https://", adapter)
+        return session.post(urlunsplit(parts._replace(netloc=netloc)), **kwargs)
+
+
+def alert_payload(alert: SearchAlert) -> Dict:
+    listing = alert.listing
+    return {
+        "search": {"id": alert.search_id, "name": alert.search.name},
+        "listing": {
+            "url": listing.url,
+            "address": listing.address,
+            "outcode": listing.outcode,
+            "price_pence": alert.price_pence,
+            "beds": listing.beds,
+        },
+        "previous_price_pence": alert.previous_price_pence,
+        "created_at": alert.created_at.isoformat(),
+    }
+
+
+def _email_line(alert: SearchAlert) -> str:
+    listing = alert.listing
+    price = format_pence(alert.price_pence) if alert.price_pence is not None else "POA"
+    if alert.previous_price_pence is not None:
+        price += f" (was {format_pence(alert.previous_price_pence)})"
+    label = listing.address or listing.url
+    return f"[{alert.search.name}] {label} - {price}\n{listing.url}"
+
+
+class AlertDispatcher:
+    """Deliver queued alerts from a background thread, batched per destination."""
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        max_delay: float = 1.0,
+        timeout: float = 5.0,
+        retries: int = 3,
+    ):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.retries = retries
+        self._queue: "queue.Queue[int]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"delivered": 0, "failed": 0, "webhooks": 0, "emails": 0}
+
+    def enqueue(self, alert_ids: Iterable[int]) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="alert-dispatcher", daemon=True
+                )
+                self._thread.start()
+        for alert_id in alert_ids:
+            self._queue.put(alert_id)
+
+    def flush(self) -> None:
+        """Block until everything enqueued so far has been attempted."""
+        self._queue.join()
+
+    def _next_batch(self) -> List[int]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self.deliver(batch)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # Keep the thread alive for later alerts; these stay undelivered
+                logger.exception("Delivering %d alerts failed", len(batch))
+            finally:
+                connection.close()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def deliver(self, alert_ids: List[int]) -> None:
+        """Send one webhook POST per URL and one email per address."""
+        alerts = list(
+            SearchAlert.objects.filter(pk__in=alert_ids, delivered_at__isnull=True)
+            .select_related("search", "listing")
+            .order_by("pk")
+        )
+        by_webhook, by_email = defaultdict(list), defaultdict(list)
+        for alert in alerts:
+            if alert.search.webhook_url:
+                by_webhook[alert.search.webhook_url].append(alert)
+            if alert.search.email:
+                by_email[alert.search.email].append(alert)
+
+        failed = set()
+        for url, group in by_webhook.items():
+            if not self._post(url, {"alerts": [alert_payload(a) for a in group]}):
+                failed.update(a.pk for a in group)
+        for address, group in by_email.items():
+            try:
+                send_mail(
+                    f"{len(group)} new listing match{'es' if len(group) != 1 else ''}",
+                    "\n\n".join(_email_line(alert) for alert in group),
+                    None,
+                    [address],
+                )
+                self.stats["emails"] += 1
+            except OSError as exc:
+                logger.warning("Alert email to %s failed: %s", address, exc)
+                failed.update(a.pk for a in group)
+
+        delivered = [a.pk for a in alerts if a.pk not in failed]
+        SearchAlert.objects.filter(pk__in=delivered).update(delivered_at=timezone.now())
+        self.stats["delivered"] += len(delivered)
+        self.stats["failed"] += len(failed)
+
+    def _post(self, url: str, payload: Dict) -> bool:
+        import requests  # pylint: disable=import-outside-toplevel
+
+        try:
+            # again: DNS may have changed since saving
+            addresses = check_webhook_url(url)
+        except WebhookURLError as exc:
+            logger.warning("Alert webhook %s refused: %s", url, exc)
+            return False
+        for attempt in range(self.retries):
+            # connect to a checked address, not whatever DNS answers next
+            address = addresses[attempt % len(addresses)] if addresses else None
+            try:
+                resp = post_pinned(
+                    url,
+                    address,
+                    json=payload,
+                    timeout=self.timeout,
+                    allow_redirects=False,
+                )
+                if resp.status_code < 400:
+                    self.stats["webhooks"] += 1
+                    return True
+                error = f"HTTP {resp.status_code}"
+            except requests.RequestException as exc:
+                error = str(exc)
+            if attempt + 1 < self.retries:
+                time.sleep(0.5 * 2**attempt)
+        logger.warning(
+            "Alert webhook %s failed after %d tries: %s", url, self.retries, error
+        )
+        return False
+
+
+_dispatcher: Optional[AlertDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> AlertDispatcher:
+    global _dispatcher  # pylint: disable=global-statement
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher(
+                batch_size=getattr(settings, "ALERTS_BATCH_SIZE", 50),
+                max_delay=getattr(settings, "ALERTS_BATCH_DELAY", 1.0),
+                timeout=getattr(settings, "ALERTS_WEBHOOK_TIMEOUT", 5.0),
+            )
+        return _dispatcher
@@ -0,0 +1,242 @@
+"""
+Market analytics over stored listings.
+
+The analytics columns of every listing are held in a columnar NumPy snapshot,
+loaded from the database in chunks, and aggregates are computed with
+vectorized group-bys instead of Python loops over ORM objects. Results are
+materialized per outcode: upserting a listing patches its row in the
+snapshot and drops only the results for the outcodes it touched.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Listing
+
+PERCENTILES = (10, 25, 50, 75, 90)
+ALL = "*"
+COLUMNS = ("id", "outcode", "price_pence", "beds", "service_charge_pence")
+DEFAULT_BINS = 20
+
+
+def _np():
+    # Imported on first use so startup doesn't pay for NumPy (see import_report)
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    return numpy
+
+
+def grouped_percentiles(keys, values, qs: Sequence[float]):
+    """Percentiles of ``values`` within each distinct key, without a loop.
+
+    Sorts once by (key, value), then interpolates linearly between the
+    order statistics of each group, matching ``numpy.percentile``.
+    Returns ``(group_keys, results)`` with ``results.shape == (groups, len(qs))``.
+    """
+    np = _np()
+    if len(values) == 0:
+        return keys[:0], np.empty((0, len(qs)))
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+    fractions = np.asarray(qs, dtype=float)[None, :] / 100.0
+    positions = starts[:, None] + (counts[:, None] - 1) * fractions
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    results = values[lower] + (values[upper] - values[lower]) * (positions - lower)
+    return keys[starts], results
+
+
+def _percentile_dict(row) -> Dict[str, int]:
+    return {f"p{q}": int(round(v)) for q, v in zip(PERCENTILES, row)}
+
+
+class MarketSnapshot:
+    """Columnar copy of the analytics columns, kept in sync with upserts."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._loaded_at: Optional[float] = None
+        self._size = 0
+        self._rows: Dict[int, int] = {}  # listing id -> row
+        self._outcodes: list = []  # code -> outcode
+        self._codes: Dict[str, int] = {}  # outcode -> code
+        self._results: Dict[Tuple[str, int], Dict] = {}
+        self._cols: Dict[str, object] = {}
+
+    # --- storage ------------------------------------------------------------
+    def _code(self, outcode: Optional[str]) -> int:
+        if outcode is None:
+            return -1
+        if outcode not in self._codes:
+            self._codes[outcode] = len(self._outcodes)
+            self._outcodes.append(outcode)
+        return self._codes[outcode]
+
+    def _reserve(self, extra: int) -> None:
+        np = _np()
+        capacity = len(self._cols["id"]) if self._cols else 0
+        needed = self._size + extra
+        if self._cols and needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        fresh = {
+            "id": np.zeros(capacity, dtype=np.int64),
+            "outcode": np.full(capacity, -1, dtype=np.int32),
+            "price_pence": np.full(capacity, np.nan),
+            "beds": np.full(capacity, np.nan),
+            "service_charge_pence": np.full(capacity, np.nan),
+        }
+        for name, column in self._cols.items():
+            fresh[name][: self._size] = column[: self._size]
+        self._cols = fresh
+
+    def _append_chunk(self, chunk) -> None:
+        np = _np()
+        self._reserve(len(chunk))
+        start, end = self._size, self._size + len(chunk)
+        ids, outcodes, prices, beds, charges = zip(*chunk)
+        uniques, inverse = np.unique(
+            np.array([o or "" for o in outcodes], dtype=object), return_inverse=True
+        )
+        codes = np.array([self._code(o or None) for o in uniques], dtype=np.int32)
+        self._cols["id"][start:end] = ids
+        self._cols["outcode"][start:end] = codes[inverse]
+        self._cols["price_pence"][start:end] = np.array(prices, dtype=float)
+        self._cols["beds"][start:end] = np.array(beds, dtype=float)
+        self._cols["service_charge_pence"][start:end] = np.array(charges, dtype=float)
+        self._rows.update(zip(ids, range(start, end)))
+        self._size = end
+
+    def load(self, chunk_size=5000) -> None:
+        """(Re)build the snapshot from the database, ``chunk_size`` rows at a time."""
+        with self._lock:
+            self._reset()
+            self._reserve(0)
+            chunk = []
+            rows = Listing.objects.order_by("id").values_list(*COLUMNS)
+            for row in rows.iterator(chunk_size=chunk_size):
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    self._append_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self._append_chunk(chunk)
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self) -> None:
+        ttl = getattr(settings, "ANALYTICS_SNAPSHOT_TTL", 300)
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > ttl:
+            self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    # --- incremental maintenance -------------------------------------------
+    def apply(self, listing: Listing) -> Set[str]:
+        """Upsert one listing's row and invalidate the results it affects.
+
+        Returns the outcodes whose materialized results were dropped.
+        """
+        np = _np()
+        with self._lock:
+            if not self.loaded:
+                return set()
+            touched = {ALL}
+            row = self._rows.get(listing.id)
+            if row is None:
+                self._append_chunk([tuple(getattr(listing, name) for name in COLUMNS)])
+            else:
+                old = self._cols["outcode"][row]
+                if old >= 0:
+                    touched.add(self._outcodes[old])
+                self._cols["outcode"][row] = self._code(listing.outcode)
+                for name in ("price_pence", "beds", "service_charge_pence"):
+                    value = getattr(listing, name)
+                    self._cols[name][row] = np.nan if value is None else value
+            if listing.outcode:
+                touched.add(listing.outcode)
+            for key in [k for k in self._results if k[0] in touched]:
+                del self._results[key]
+            return touched
+
+    # --- aggregates ---------------------------------------------------------
+    def market(self, outcode: Optional[str] = None, bins=DEFAULT_BINS) -> Dict:
+        """Price and service-charge aggregates for one outcode, or all."""
+        with self._lock:
+            self._ensure_loaded()
+            key = (outcode or ALL, bins)
+            if key not in self._results:
+                self._results[key] = self._compute(outcode, bins)
+            return self._results[key]
+
+    def _compute(self, outcode: Optional[str], bins: int) -> Dict:
+        np = _np()
+        size = self._size
+        codes = self._cols["outcode"][:size]
+        price = self._cols["price_pence"][:size]
+        beds = self._cols["beds"][:size]
+        charge = self._cols["service_charge_pence"][:size]
+        if outcode:
+            mask = codes == self._codes.get(outcode, -2)
+            codes, price, beds, charge = (
+                codes[mask],
+                price[mask],
+                beds[mask],
+                charge[mask],
+            )
+
+        priced = ~np.isnan(price)
+        with_beds = priced & ~np.isnan(beds)
+        bed_keys, medians = grouped_percentiles(
+            beds[with_beds].astype(np.int64), price[with_beds], (50,)
+        )
+
+        per_bed_mask = with_beds & (beds > 0)
+        per_bed = price[per_bed_mask] / beds[per_bed_mask]
+        per_bed_stats = {"count": int(per_bed.size)}
+        if per_bed.size:
+            counts, edges = np.histogram(per_bed, bins=bins)
+            per_bed_stats["percentiles"] = _percentile_dict(
+                np.percentile(per_bed, PERCENTILES)
+            )
+            per_bed_stats["histogram"] = {
+                "edges": [int(round(e)) for e in edges],
+                "counts": counts.tolist(),
+            }
+
+        charged = ~np.isnan(charge) & (codes >= 0)
+        charge_keys, charge_pcts = grouped_percentiles(
+            codes[charged], charge[charged], PERCENTILES
+        )
+        return {
+            "outcode": outcode,
+            "listings": int(codes.size),
+            "priced": int(priced.sum()),
+            "median_price_by_beds": {
+                str(int(b)): int(round(m[0])) for b, m in zip(bed_keys, medians)
+            },
+            "price_per_bed": per_bed_stats,
+            "service_charge_percentiles": {
+                self._outcodes[c]: _percentile_dict(row)
+                for c, row in zip(charge_keys, charge_pcts)
+            },
+        }
+
+
+snapshot = MarketSnapshot()
+
+
+def listing_saved(listing: Listing) -> None:
+    """Patch the snapshot once the surrounding transaction commits."""
+    if snapshot.loaded:
+        transaction.on_commit(lambda: snapshot.apply(listing))
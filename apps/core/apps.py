@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        # Registers the saved-search signal receivers
+        from . import alerts  # noqa: F401
@@ -0,0 +1,263 @@
+"""
+Search-results crawler for Rightmove.
+
+Expands a search URL into listing IDs by paging through results
+concurrently, skips listings already fresh in storage and fans the rest out
+to ``RightmoveAdapter.fetch``. All HTTP calls draw from the adapter's shared
+rate budget in the crawler's priority lane (bulk by default, background for
+rescrapes); database writes go through the process-wide batch writer.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from apps.sheets.sheets import write_rows
+
+from .adapters.circuit import CircuitOpenError
+from .adapters.rightmove import RightmoveAdapter, RightmoveAdapterError
+from .adapters.scheduling import BULK, in_lane
+from .services import fresh_listing_ids, sheet_row, stale_listings
+from .writer import get_writer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CrawlProgress:
+    """Running counters for a single crawl, reported after every step."""
+
+    search_url: str
+    pages_total: int = 0
+    pages_done: int = 0
+    listings_found: int = 0
+    skipped_fresh: int = 0
+    fetched: int = 0
+    saved: int = 0
+    failed: int = 0
+    finished: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+class SearchCrawler:
+    """Crawl one search URL and ingest every listing it returns."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        fresh_for: Optional[timedelta] = None,
+        on_progress: Optional[Callable[[CrawlProgress], None]] = None,
+        lane: str = BULK,
+    ):
+        self.max_workers = max_workers or getattr(settings, "CRAWL_MAX_WORKERS", 8)
+        self.fresh_for = fresh_for or timedelta(
+            seconds=getattr(settings, "CRAWL_FRESH_SECONDS", 24 * 3600)
+        )
+        self.on_progress = on_progress
+        self.lane = lane
+
+    def _report(self, progress: CrawlProgress) -> None:
+        logger.info(
+            "Crawl %r: pages %d/%d, found=%d, fresh=%d, fetched=%d, failed=%d",
+            progress.search_url,
+            progress.pages_done,
+            progress.pages_total,
+            progress.listings_found,
+            progress.skipped_fresh,
+            progress.fetched,
+            progress.failed,
+        )
+        if self.on_progress:
+            self.on_progress(progress)
+
+    def _collect_ids(self, search_url: str, progress: CrawlProgress) -> List[str]:
+        import requests  # pylint: disable=import-outside-toplevel
+
+        first_ids, total = in_lane(self.lane, RightmoveAdapter.fetch_search_page)(
+            RightmoveAdapter.search_page_url(search_url, 0)
+        )
+        total = min(total, RightmoveAdapter.SEARCH_MAX_RESULTS)
+        page_size = RightmoveAdapter.SEARCH_PAGE_SIZE
+        indexes = range(page_size, total, page_size)
+        progress.pages_total = 1 + len(indexes)
+        progress.pages_done = 1
+        self._report(progress)
+
+        pages = {0: first_ids}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(
+                    in_lane(self.lane, RightmoveAdapter.fetch_search_page),
+                    RightmoveAdapter.search_page_url(search_url, index),
+                ): index
+                for index in indexes
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    pages[index] = future.result()[0]
+                except (requests.RequestException, ValueError, CircuitOpenError) as exc:
+                    progress.errors.append(f"page index={index}: {exc}")
+                progress.pages_done += 1
+                self._report(progress)
+
+        # Keep result order stable and drop IDs repeated across pages
+        # (featured listings are pinned to every page).
+        seen = {}
+        for index in sorted(pages):
+            for listing_id in pages[index]:
+                seen.setdefault(listing_id, None)
+        return list(seen)
+
+    def crawl(self, search_url: str) -> CrawlProgress:
+        progress = CrawlProgress(search_url=search_url)
+        ids = self._collect_ids(search_url, progress)
+        progress.listings_found = len(ids)
+
+        fresh = fresh_listing_ids(ids, self.fresh_for)
+        progress.skipped_fresh = len(fresh)
+        todo = [listing_id for listing_id in ids if listing_id not in fresh]
+        self._report(progress)
+
+        self.fetch_listings(
+            [RightmoveAdapter.listing_url(listing_id) for listing_id in todo], progress
+        )
+        progress.finished = True
+        self._report(progress)
+        return progress
+
+    def fetch_listings(self, urls: List[str], progress: CrawlProgress) -> None:
+        """Fetch and ingest listing ``urls``, counting results into ``progress``.
+
+        Records are handed to the batch writer as they arrive; this returns
+        once every one of them is committed and the saved listings' rows are
+        written to Google Sheets.
+        """
+        import requests  # pylint: disable=import-outside-toplevel
+
+        fetch = in_lane(self.lane, RightmoveAdapter.fetch)
+        writer = get_writer()
+        saves = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(fetch, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    record = future.result()
+                except (
+                    requests.RequestException,
+                    ValueError,
+                    RightmoveAdapterError,
+                    CircuitOpenError,
+                ) as exc:
+                    progress.failed += 1
+                    progress.errors.append(f"listing {url}: {exc}")
+                else:
+                    saves[writer.submit(record)] = url
+                    progress.fetched += 1
+                self._report(progress)
+
+        rows = []
+        for save in as_completed(saves):
+            try:
+                listing = save.result()
+            except DatabaseError as exc:
+                progress.failed += 1
+                progress.errors.append(f"listing {saves[save]}: {exc}")
+            else:
+                progress.saved += 1
+                rows.append(sheet_row(listing))
+        self._report(progress)
+        # One batched write per GOOGLE_SHEETS_BATCH_ROWS rows
+        write_rows(rows)
+
+    def rescrape_stale(self, max_age: timedelta, limit: int = 500) -> CrawlProgress:
+        """Re-fetch up to ``limit`` listings older than ``max_age``, oldest first."""
+        progress = CrawlProgress(search_url="")
+        urls = [url for _, url in stale_listings(max_age, limit)]
+        progress.listings_found = len(urls)
+        self._report(progress)
+        self.fetch_listings(urls, progress)
+        progress.finished = True
+        self._report(progress)
+        return progress
+
+
+# --- background crawl jobs for the API ---------------------------------------
+_jobs: Dict[str, "CrawlJob"] = {}
+_jobs_lock = threading.Lock()
+
+
+class CrawlLimitError(Exception):
+    """Raised by ``start_crawl`` while ``CRAWL_MAX_JOBS`` crawls are running."""
+
+
+class CrawlJob:
+    """A crawl running on a background thread, polled through the API."""
+
+    def __init__(self, search_url: str):
+        self.id = uuid.uuid4().hex
+        self.progress = CrawlProgress(search_url=search_url)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.finished_at: Optional[float] = None
+
+    def _update(self, progress: CrawlProgress) -> None:
+        self.progress = progress
+
+    def _run(self) -> None:
+        import requests  # pylint: disable=import-outside-toplevel
+
+        try:
+            SearchCrawler(on_progress=self._update).crawl(self.progress.search_url)
+        except (requests.RequestException, ValueError, CircuitOpenError) as exc:
+            logger.error("Crawl %s failed: %s", self.id, exc)
+            self.progress.errors.append(str(exc))
+            self.progress.finished = True
+        finally:
+            connection.close()
+            self.finished_at = time.monotonic()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        self.thread.join(timeout)
+
+
+def _prune_jobs() -> None:
+    # Finished jobs stay pollable for CRAWL_JOB_TTL seconds; caller holds the lock
+    cutoff = time.monotonic() - getattr(settings, "CRAWL_JOB_TTL", 3600)
+    for job_id in [
+        job_id
+        for job_id, job in _jobs.items()
+        if job.finished_at is not None and job.finished_at < cutoff
+    ]:
+        del _jobs[job_id]
+
+
+def start_crawl(search_url: str) -> CrawlJob:
+    """Start a background crawl; raises ``CrawlLimitError`` when at capacity."""
+    job = CrawlJob(search_url)
+    with _jobs_lock:
+        _prune_jobs()
+        running = sum(1 for other in _jobs.values() if other.finished_at is None)
+        limit = getattr(settings, "CRAWL_MAX_JOBS", 2)
+        if running >= limit:
+            raise CrawlLimitError(f"{running} crawls already running (limit {limit}).")
+        _jobs[job.id] = job
+    job.thread.start()
+    return job
+
+
+def get_crawl(job_id: str) -> Optional[CrawlJob]:
+    with _jobs_lock:
+        _prune_jobs()
+        return _jobs.get(job_id)
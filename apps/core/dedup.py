@@ -0,0 +1,238 @@
+"""
+Cross-listing duplicate detection.
+
+The same property often appears under several URLs (re-listings, different
+agents, other portals). Each stored listing gets:
+
+- ``address_key``: its address normalized for exact matching;
+- a MinHash signature over word shingles of its summary, split into LSH
+  bands stored in ``ListingBand``.
+
+A new listing's candidates are the listings sharing its address key or any
+LSH band, both found through indexed lookups rather than pairwise
+comparison. Candidates that pass verification join the same
+``PropertyCluster``.
+"""
+
+import hashlib
+import re
+from typing import List, Optional, Set
+
+from django.db import transaction
+
+from .models import Listing, ListingBand, PropertyCluster
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS  # band threshold ~ (1 / BANDS) ** (1 / ROWS) = 0.42
+SHINGLE_SIZE = 3
+MIN_SIMILARITY = 0.7
+# Summaries only need to be this similar when the addresses already agree
+ADDRESS_SIMILARITY = 0.4
+# Without summaries, same address + beds + price within this ratio
+PRICE_TOLERANCE = 0.1
+# Mersenne prime 2**31 - 1: a * x + b stays below 2**62 with 31-bit inputs
+_PRIME = (1 << 31) - 1
+_SEED = 20240917
+
+ABBREVIATIONS = {
+    "RD": "ROAD",
+    "ST": "STREET",
+    "AVE": "AVENUE",
+    "AV": "AVENUE",
+    "LN": "LANE",
+    "DR": "DRIVE",
+    "CT": "COURT",
+    "PL": "PLACE",
+    "SQ": "SQUARE",
+    "CRES": "CRESCENT",
+    "GDNS": "GARDENS",
+    "TER": "TERRACE",
+    "TERR": "TERRACE",
+    "APT": "FLAT",
+    "APARTMENT": "FLAT",
+}
+NON_ALNUM_RE = re.compile(r"[^A-Z0-9]+")
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+_permutations = None
+
+
+def _np():
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    return numpy
+
+
+def _hash_params():
+    global _permutations  # pylint: disable=global-statement
+    if _permutations is None:
+        np = _np()
+        rng = np.random.default_rng(_SEED)
+        _permutations = (
+            rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64),
+            rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64),
+        )
+    return _permutations
+
+
+def normalize_address(address: Optional[str]) -> Optional[str]:
+    """``"Flat 2, 10 High St., London E6"`` -> ``"FLAT 2 10 HIGH STREET LONDON E6"``."""
+    if not address:
+        return None
+    tokens = NON_ALNUM_RE.sub(" ", address.upper()).split()
+    normalized = " ".join(ABBREVIATIONS.get(token, token) for token in tokens)
+    return normalized[:255] or None
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """31-bit hashes of the word ``size``-grams of ``text``."""
+    words = WORD_RE.findall(text.lower())
+    grams = {
+        " ".join(words[i : i + size]) for i in range(max(1, len(words) - size + 1))
+    }
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "big")
+        & _PRIME
+        for g in grams
+        if g
+    }
+
+
+def minhash(text: Optional[str]):
+    """MinHash signature (``uint32[NUM_PERM]``) of ``text``, or None if empty."""
+    np = _np()
+    hashes = shingles(text or "")
+    if not hashes:
+        return None
+    a, b = _hash_params()
+    x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    return (
+        ((a[:, None] * x[None, :] + b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+    )
+
+
+def band_buckets(signature) -> List[int]:
+    """One signed 64-bit bucket id per LSH band of ``signature``.
+
+    The band number is hashed in, so bucket ids from different bands never
+    collide and candidates are found with a single ``bucket IN (...)`` lookup.
+    """
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                bytes([band]) + signature[band * ROWS : (band + 1) * ROWS].tobytes(),
+                digest_size=8,
+            ).digest(),
+            "big",
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float((sig_a == sig_b).mean())
+
+
+def _signature(listing: Listing):
+    if listing.minhash is None:
+        return None
+    np = _np()
+    return np.frombuffer(bytes(listing.minhash), dtype=np.uint32)
+
+
+def _compatible(a: Listing, b: Listing) -> bool:
+    """Known attributes must agree: a 1-bed and a 3-bed are never the same flat."""
+    for field in ("beds", "bathrooms", "outcode"):
+        x, y = getattr(a, field), getattr(b, field)
+        if x is not None and y is not None and x != y:
+            return False
+    return True
+
+
+def _close_prices(a: Optional[int], b: Optional[int]) -> bool:
+    if a is None or b is None:
+        return False
+    return abs(a - b) <= PRICE_TOLERANCE * max(a, b)
+
+
+def _is_duplicate(listing: Listing, signature, other: Listing) -> bool:
+    if not _compatible(listing, other):
+        return False
+    same_address = (
+        bool(listing.address_key) and listing.address_key == other.address_key
+    )
+    other_signature = _signature(other)
+    if signature is not None and other_signature is not None:
+        score = similarity(signature, other_signature)
+        return score >= MIN_SIMILARITY or (same_address and score >= ADDRESS_SIMILARITY)
+    # Display addresses are usually street-level, so without both summaries a
+    # shared address only counts when size and price agree too.
+    return (
+        same_address
+        and listing.beds is not None
+        and listing.beds == other.beds
+        and _close_prices(listing.price_pence, other.price_pence)
+    )
+
+
+def find_duplicates(listing: Listing, signature, buckets: List[int]) -> List[Listing]:
+    """Stored listings that look like the same property as ``listing``."""
+    ids = set()
+    if listing.address_key:
+        ids.update(
+            Listing.objects.filter(address_key=listing.address_key).values_list(
+                "id", flat=True
+            )
+        )
+    if buckets:
+        ids.update(
+            ListingBand.objects.filter(bucket__in=buckets).values_list(
+                "listing_id", flat=True
+            )
+        )
+    ids.discard(listing.id)
+    candidates = Listing.objects.filter(id__in=ids).order_by("id")
+    return [c for c in candidates if _is_duplicate(listing, signature, c)]
+
+
+@transaction.atomic
+def index_listing(listing: Listing) -> PropertyCluster:
+    """(Re)index ``listing`` and attach it to its property cluster.
+
+    Matching listings in different clusters are merged into the oldest one.
+    A listing with no duplicates gets a cluster of its own.
+    """
+    signature = minhash(listing.summary)
+    buckets = band_buckets(signature) if signature is not None else []
+    listing.address_key = normalize_address(listing.address)
+    listing.minhash = signature.tobytes() if signature is not None else None
+
+    ListingBand.objects.filter(listing=listing).delete()
+    ListingBand.objects.bulk_create(
+        ListingBand(listing=listing, band=band, bucket=bucket)
+        for band, bucket in enumerate(buckets)
+    )
+
+    clusters = {
+        c.cluster_id
+        for c in find_duplicates(listing, signature, buckets)
+        if c.cluster_id
+    }
+    if listing.cluster_id:
+        clusters.add(listing.cluster_id)
+    if clusters:
+        target = min(clusters)
+        merged = clusters - {target}
+        if merged:
+            Listing.objects.filter(cluster_id__in=merged).update(cluster_id=target)
+            PropertyCluster.objects.filter(id__in=merged).delete()
+        cluster = PropertyCluster.objects.get(id=target)
+        cluster.save(update_fields=["updated_at"])
+    else:
+        cluster = PropertyCluster.objects.create()
+    listing.cluster = cluster
+    listing.save(update_fields=["address_key", "minhash", "cluster"])
+    return cluster
@@ -0,0 +1,193 @@
+"""
+Streaming exports of stored listings.
+
+Rows are read in fixed-size chunks and encoded incrementally, so an export
+of millions of listings runs in constant memory whether it is written to a
+file by ``manage.py export_listings`` or streamed over HTTP.
+"""
+
+import csv
+import json
+from datetime import datetime, time
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Tuple
+
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Listing
+
+EXPORT_FIELDS = (
+    "id",
+    "provider",
+    "listing_id",
+    "url",
+    "address",
+    "outcode",
+    "price_pence",
+    "beds",
+    "bathrooms",
+    "summary",
+    "service_charge_pence",
+    "source",
+    "scraped_at",
+)
+INTEGER_FIELDS = {"id", "price_pence", "beds", "bathrooms", "service_charge_pence"}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class ExportUnavailableError(Exception):
+    """The export format needs an optional package that isn't installed."""
+
+
+def _parse_when(value: str, end_of_day=False) -> datetime:
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value!r}")
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def filter_listings(params: Mapping[str, str]):
+    """Build the export queryset from ``provider``/``since``/``until`` filters."""
+    queryset = Listing.objects.all()
+    if provider := params.get("provider"):
+        queryset = queryset.filter(provider=provider)
+    if since := params.get("since"):
+        queryset = queryset.filter(scraped_at__gte=_parse_when(since))
+    if until := params.get("until"):
+        queryset = queryset.filter(scraped_at__lte=_parse_when(until, end_of_day=True))
+    return queryset
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE) -> Iterator[Tuple]:
+    """Yield export rows without materialising the queryset.
+
+    SQLite and PostgreSQL stream through ``iterator(chunk_size=...)`` (a
+    server-side cursor on PostgreSQL). MySQL drivers buffer whole result sets
+    client-side, so there we page by primary key instead.
+    """
+    rows = queryset.order_by("id").values_list(*EXPORT_FIELDS)
+    if connections[queryset.db].vendor != "mysql":
+        yield from rows.iterator(chunk_size=chunk_size)
+        return
+    last_id = 0
+    while True:
+        page = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not page:
+            return
+        yield from page
+        last_id = page[-1][0]
+
+
+def _batched(rows: Iterable[Tuple], size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Buffer:
+    """Write-only file object whose contents are drained after each batch."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(
+            part.encode("utf-8") if isinstance(part, str) else bytes(part)
+            for part in self.parts
+        )
+        self.parts = []
+        return data
+
+
+def iter_csv(rows: Iterable[Tuple], chunk_size=DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    buffer = _Buffer()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.drain()
+    for batch in _batched(rows, chunk_size):
+        writer.writerows(batch)
+        yield buffer.drain()
+
+
+def iter_jsonl(rows: Iterable[Tuple], chunk_size=DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    for batch in _batched(rows, chunk_size):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), default=str) + "\n"
+            for row in batch
+        ).encode("utf-8")
+
+
+def iter_parquet(
+    rows: Iterable[Tuple], chunk_size=DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Encode rows as Parquet, one row group per chunk. Requires ``pyarrow``."""
+    try:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise ExportUnavailableError(
+            "Parquet export requires the optional 'pyarrow' package"
+            " (pip install pyarrow)."
+        ) from exc
+
+    def arrow_type(name):
+        if name in INTEGER_FIELDS:
+            return pa.int64()
+        if name == "scraped_at":
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+
+    schema = pa.schema([(name, arrow_type(name)) for name in EXPORT_FIELDS])
+
+    def encode():
+        buffer = _Buffer()
+        with pq.ParquetWriter(buffer, schema) as writer:
+            for batch in _batched(rows, chunk_size):
+                columns = [list(column) for column in zip(*batch)]
+                writer.write_batch(pa.record_batch(columns, schema=schema))
+                yield buffer.drain()
+        yield buffer.drain()
+
+    return encode()
+
+
+# format name -> (content type, file extension, encoder)
+FORMATS: Dict[str, Tuple[str, str, Callable[..., Iterator[bytes]]]] = {
+    "csv": ("text/csv", "csv", iter_csv),
+    "jsonl": ("application/x-ndjson", "jsonl", iter_jsonl),
+    "parquet": ("application/vnd.apache.parquet", "parquet", iter_parquet),
+}
+
+
+def export_listings(
+    queryset, fmt: str, chunk_size=DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Stream ``queryset`` encoded as ``fmt`` (one of ``FORMATS``)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt!r}")
+    encoder = FORMATS[fmt][2]
+    return encoder(iter_rows(queryset, chunk_size), chunk_size)
@@ -0,0 +1,123 @@
+"""
+Startup import cost, measured with ``python -X importtime``.
+
+Used by ``manage.py import_report`` and the cold-start tests. Imports run in
+a fresh interpreter so the numbers reflect what a new worker or management
+command actually pays.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Loads settings, every installed app and the URLconf: what a worker does
+# before serving its first request.
+STARTUP_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+import {urlconf}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+@dataclass
+class ImportEntry:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass
+class StartupProfile:
+    seconds: float
+    modules: List[str]
+    entries: List[ImportEntry]
+
+
+def parse_importtime(stderr: str) -> List[ImportEntry]:
+    """Parse ``-X importtime`` output, in the order modules finished loading."""
+    entries = []
+    for line in stderr.splitlines():
+        if m := IMPORTTIME_RE.match(line):
+            entries.append(
+                ImportEntry(
+                    name=m.group(4),
+                    depth=len(m.group(3)) // 2,
+                    self_us=int(m.group(1)),
+                    cumulative_us=int(m.group(2)),
+                )
+            )
+    return entries
+
+
+def _belongs(name: str, package: str) -> bool:
+    return name == package or name.startswith(package + ".")
+
+
+def cost_by_package(
+    entries: List[ImportEntry], packages: Iterable[str]
+) -> Dict[str, int]:
+    """Cumulative import microseconds attributed to each package.
+
+    A package is charged for every import it triggers, including third-party
+    dependencies, but nested imports of its own submodules are only counted
+    once. ``-X importtime`` prints children before their parent, so the
+    entries are walked in reverse to see each module's ancestors first.
+    """
+    packages = list(packages)
+    totals = dict.fromkeys(packages, 0)
+    stack: List[ImportEntry] = []
+    for entry in reversed(entries):
+        while stack and stack[-1].depth >= entry.depth:
+            stack.pop()
+        for package in packages:
+            if _belongs(entry.name, package) and not any(
+                _belongs(parent.name, package) for parent in stack
+            ):
+                totals[package] += entry.cumulative_us
+        stack.append(entry)
+    return totals
+
+
+def heaviest(entries: List[ImportEntry], limit=15) -> List[Tuple[str, int]]:
+    """The ``limit`` modules with the largest self time."""
+    ranked = sorted(entries, key=lambda e: e.self_us, reverse=True)[:limit]
+    return [(e.name, e.self_us) for e in ranked]
+
+
+def measure_startup(urlconf: str = None) -> StartupProfile:
+    """Import Django, all apps and the URLconf in a fresh interpreter."""
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "property_manager.settings")
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            STARTUP_SCRIPT.format(urlconf=urlconf or settings.ROOT_URLCONF),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+        cwd=settings.BASE_DIR,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        seconds=report["seconds"],
+        modules=report["modules"],
+        entries=parse_importtime(result.stderr),
+    )
@@ -0,0 +1,54 @@
+"""
+Management command to crawl a Rightmove search-results URL into storage.
+
+Usage: python manage.py crawl_search "<search-url>" [--profile]
+
+``--profile`` samples every thread of the crawl (page and listing workers
+included) and stores the folded stacks with the request profiles.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import profiling
+from apps.core.adapters.rightmove import RightmoveAdapter
+from apps.core.crawler import SearchCrawler
+
+
+class Command(BaseCommand):
+    help = "Crawl a search-results URL and ingest every listing it returns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="Rightmove search-results URL")
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Concurrent fetches"
+        )
+        parser.add_argument(
+            "--profile", action="store_true", help="Sample stacks for a flamegraph"
+        )
+
+    def handle(self, *args, **options):
+        url = options["url"]
+        if not RightmoveAdapter.is_search_url(url):
+            raise CommandError(f"Not a search-results URL: {url}")
+
+        def report(progress):
+            self.stdout.write(
+                f"pages {progress.pages_done}/{progress.pages_total} "
+                f"found={progress.listings_found} fresh={progress.skipped_fresh} "
+                f"fetched={progress.fetched} saved={progress.saved} "
+                f"failed={progress.failed}"
+            )
+
+        profiler = profiling.SamplingProfiler().start() if options["profile"] else None
+        try:
+            progress = SearchCrawler(
+                max_workers=options["workers"], on_progress=report
+            ).crawl(url)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+                name = profiling.save_profile(profiler, profiling.SAMPLE, "crawl")
+                self.stdout.write(f"Profile: {profiling.profile_dir() / name}")
+        for error in progress.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS("Crawl finished."))
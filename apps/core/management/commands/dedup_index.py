@@ -0,0 +1,33 @@
+"""
+Management command to build the duplicate-detection index for stored listings.
+
+Usage: python manage.py dedup_index [--all]
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.dedup import index_listing
+from apps.core.models import Listing
+
+
+class Command(BaseCommand):
+    help = "Index listings for duplicate detection and assign property clusters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-index every listing, not only those without a cluster",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Listing.objects.order_by("id")
+        if not options["all"]:
+            queryset = queryset.filter(cluster=None)
+        indexed = 0
+        for listing in queryset.iterator(chunk_size=500):
+            index_listing(listing)
+            indexed += 1
+            if indexed % 1000 == 0:
+                self.stdout.write(f"indexed {indexed}")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} listings."))
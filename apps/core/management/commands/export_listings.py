@@ -0,0 +1,48 @@
+"""
+Management command to export stored listings in constant memory.
+
+Usage: python manage.py export_listings --format parquet --output listings.parquet
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.exporters import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    ExportUnavailableError,
+    export_listings,
+    filter_listings,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream stored listings to CSV, JSONL or Parquet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument(
+            "--output", default="-", help="File to write, or '-' for stdout"
+        )
+        parser.add_argument("--provider")
+        parser.add_argument("--since", help="Only listings scraped on/after this date")
+        parser.add_argument("--until", help="Only listings scraped on/before this date")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            queryset = filter_listings(options)
+            chunks = export_listings(queryset, options["format"], options["chunk_size"])
+        except (ValueError, ExportUnavailableError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(options["output"], "wb") as out:
+            for chunk in chunks:
+                out.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
@@ -0,0 +1,35 @@
+"""
+Management command reporting what each installed app costs at startup.
+
+Usage: python manage.py import_report [--top 15]
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.importtime import cost_by_package, heaviest, measure_startup
+
+
+class Command(BaseCommand):
+    help = "Measure cold-start import time per installed app in a fresh process."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", type=int, default=15, help="Heaviest modules to list"
+        )
+
+    def handle(self, *args, **options):
+        profile = measure_startup()
+        packages = [config.name for config in apps.get_app_configs()]
+        packages.append(settings.ROOT_URLCONF.rsplit(".", 1)[0])
+
+        self.stdout.write(f"Cold start (setup + URLconf): {profile.seconds:.3f}s\n")
+        self.stdout.write("Cumulative import time per app:")
+        costs = cost_by_package(profile.entries, packages)
+        for package, micros in sorted(costs.items(), key=lambda kv: -kv[1]):
+            self.stdout.write(f"  {micros / 1000:9.1f} ms  {package}")
+
+        self.stdout.write(f"\nHeaviest modules (self time, top {options['top']}):")
+        for name, micros in heaviest(profile.entries, options["top"]):
+            self.stdout.write(f"  {micros / 1000:9.1f} ms  {name}")
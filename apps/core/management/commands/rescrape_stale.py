@@ -0,0 +1,41 @@
+"""
+Management command to refresh stored listings that have gone stale.
+
+Fetches run in the background lane, so they only use request capacity that
+interactive scrapes and bulk crawls leave idle.
+
+Usage: python manage.py rescrape_stale [--older-than HOURS] [--limit N]
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.core.adapters.scheduling import BACKGROUND
+from apps.core.crawler import SearchCrawler
+
+
+class Command(BaseCommand):
+    help = "Re-fetch stored listings last scraped longer ago than --older-than."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=float, default=24, help="Age in hours (default 24)"
+        )
+        parser.add_argument("--limit", type=int, default=500)
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Concurrent fetches"
+        )
+
+    def handle(self, *args, **options):
+        progress = SearchCrawler(
+            max_workers=options["workers"], lane=BACKGROUND
+        ).rescrape_stale(timedelta(hours=options["older_than"]), options["limit"])
+        for error in progress.errors:
+            self.stderr.write(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rescraped {progress.fetched}/{progress.listings_found} "
+                f"listings ({progress.failed} failed)."
+            )
+        )
@@ -0,0 +1,100 @@
+"""
+Response compression.
+
+``CompressionMiddleware`` is Django's ``GZipMiddleware`` plus Brotli: clients
+sending ``Accept-Encoding: br`` get Brotli when the optional ``brotli``
+package is installed (smaller than gzip for JSON at similar speed), everyone
+else gets gzip under the same rules (short bodies and already-encoded
+responses are left alone, streams are compressed chunk by chunk).
+
+Only machine-readable API responses are compressed. HTML pages (the admin,
+the browsable API) carry CSRF tokens next to request-reflected content, and
+compressing them would expose the tokens to BREACH.
+"""
+
+from functools import lru_cache
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+API_PREFIX = "/api/"
+COMPRESSIBLE_TYPES = frozenset(
+    {"application/json", "application/msgpack", "application/x-ndjson", "text/csv"}
+)
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+# Brotli quality: 11 is the maximum and far too slow for live responses;
+# 4-5 compresses better than gzip -6 at about the same speed
+BROTLI_QUALITY = 5
+
+
+@lru_cache(maxsize=None)
+def _brotli():
+    """The ``brotli`` module, imported on first use; None if not installed."""
+    try:
+        import brotli  # pylint: disable=import-outside-toplevel
+    except ImportError:  # optional: fall back to gzip
+        return None
+    return brotli
+
+
+def compressible(request, response) -> bool:
+    """Whether ``response`` is an API response of a machine-readable type."""
+    media_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return request.path_info.startswith(API_PREFIX) and media_type in COMPRESSIBLE_TYPES
+
+
+def compress_brotli(data: bytes) -> bytes:
+    return _brotli().compress(data, quality=BROTLI_QUALITY)
+
+
+def compress_brotli_sequence(sequence):
+    compressor = _brotli().Compressor(quality=BROTLI_QUALITY)
+    for item in sequence:
+        # flush() per chunk so each streamed chunk reaches the client
+        # instead of waiting for the compressor's window to fill
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Compress responses with Brotli or gzip, per ``Accept-Encoding``."""
+
+    def process_response(self, request, response):
+        if not compressible(request, response):
+            return response
+        accepts = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if (
+            not re_accepts_brotli.search(accepts)
+            or _brotli() is None
+            or (response.streaming and response.is_async)
+        ):
+            return super().process_response(request, response)
+
+        if not response.streaming and len(response.content) < 200:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.streaming:
+            response.streaming_content = compress_brotli_sequence(
+                response.streaming_content
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress_brotli(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ProviderConfig",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                (
+                    "field_selectors",
+                    models.JSONField(
+                        help_text=(
+                            "JSON mapping of field names to CSS selectors or XPath"
+                            " expressions"
+                        )
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Listing",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("provider", models.CharField(default="rightmove", max_length=50)),
+                ("listing_id", models.CharField(blank=True, max_length=32, null=True)),
+                ("url", models.URLField(max_length=500, unique=True)),
+                ("address", models.CharField(blank=True, max_length=255, null=True)),
+                ("price", models.CharField(blank=True, max_length=50, null=True)),
+                ("beds", models.CharField(blank=True, max_length=20, null=True)),
+                ("bathrooms", models.CharField(blank=True, max_length=20, null=True)),
+                ("summary", models.TextField(blank=True, null=True)),
+                (
+                    "service_charge",
+                    models.CharField(blank=True, max_length=50, null=True),
+                ),
+                ("scraped_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["provider", "listing_id"],
+                        name="core_listin_provide_a2e63c_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+from apps.core.adapters.records import parse_count, parse_pence
+
+
+def normalize_listings(apps, schema_editor):
+    Listing = apps.get_model("core", "Listing")
+    for listing in Listing.objects.iterator(chunk_size=2000):
+        listing.price_pence = parse_pence(listing.price)
+        listing.service_charge_pence = parse_pence(listing.service_charge)
+        listing.beds = parse_count(listing.beds_raw)
+        listing.bathrooms = parse_count(listing.bathrooms_raw)
+        listing.save(
+            update_fields=["price_pence", "service_charge_pence", "beds", "bathrooms"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RenameField("listing", "beds", "beds_raw"),
+        migrations.RenameField("listing", "bathrooms", "bathrooms_raw"),
+        migrations.AddField(
+            model_name="listing",
+            name="price_pence",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="service_charge_pence",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="beds",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="bathrooms",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="source",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Page strategy parsed",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(normalize_listings, migrations.RunPython.noop),
+        migrations.RemoveField("listing", "price"),
+        migrations.RemoveField("listing", "service_charge"),
+        migrations.RemoveField("listing", "beds_raw"),
+        migrations.RemoveField("listing", "bathrooms_raw"),
+    ]
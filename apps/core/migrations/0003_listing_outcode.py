@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:55
+
+from django.db import migrations, models
+
+from apps.core.adapters.records import extract_outcode
+
+
+def fill_outcodes(apps, schema_editor):
+    Listing = apps.get_model("core", "Listing")
+    for listing in Listing.objects.exclude(address=None).iterator(chunk_size=2000):
+        listing.outcode = extract_outcode(listing.address)
+        listing.save(update_fields=["outcode"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_listing_normalized_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="outcode",
+            field=models.CharField(blank=True, db_index=True, max_length=4, null=True),
+        ),
+        migrations.RunPython(fill_outcodes, migrations.RunPython.noop),
+    ]
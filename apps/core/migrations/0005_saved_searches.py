@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_dedup_clusters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SavedSearch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("outcode", models.CharField(blank=True, max_length=4, null=True)),
+                ("min_price_pence", models.BigIntegerField(blank=True, null=True)),
+                ("max_price_pence", models.BigIntegerField(blank=True, null=True)),
+                ("min_beds", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("max_beds", models.PositiveSmallIntegerField(blank=True, null=True)),
+                (
+                    "webhook_url",
+                    models.URLField(blank=True, default="", max_length=500),
+                ),
+                ("email", models.EmailField(blank=True, default="", max_length=254)),
+                ("active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saved_searches",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SearchAlert",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("price_pence", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "previous_price_pence",
+                    models.BigIntegerField(
+                        blank=True,
+                        help_text="Set when the alert is for a price change",
+                        null=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("delivered_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "listing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.listing",
+                    ),
+                ),
+                (
+                    "search",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alerts",
+                        to="core.savedsearch",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("search", "listing", "price_pence"),
+                        name="unique_alert_per_price",
+                    )
+                ],
+            },
+        ),
+    ]
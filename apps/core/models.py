@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 
@@ -12,3 +13,128 @@ class ProviderConfig(models.Model):
 
     def __str__(self):
         return str(self.name)
+
+
+class PropertyCluster(models.Model):
+    """A group of listings that appear to be the same physical property."""
+
+    objects = models.Manager()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Cluster {self.pk}"
+
+
+class Listing(models.Model):
+    """A scraped listing, upserted by URL every time it is (re)scraped."""
+
+    objects = models.Manager()
+
+    provider = models.CharField(max_length=50, default="rightmove")
+    listing_id = models.CharField(max_length=32, null=True, blank=True)
+    url = models.URLField(max_length=500, unique=True)
+    address = models.CharField(max_length=255, null=True, blank=True)
+    outcode = models.CharField(max_length=4, null=True, blank=True, db_index=True)
+    price_pence = models.BigIntegerField(null=True, blank=True)
+    beds = models.PositiveSmallIntegerField(null=True, blank=True)
+    bathrooms = models.PositiveSmallIntegerField(null=True, blank=True)
+    summary = models.TextField(null=True, blank=True)
+    service_charge_pence = models.BigIntegerField(null=True, blank=True)
+    source = models.CharField(
+        max_length=20, blank=True, default="", help_text="Page strategy parsed"
+    )
+    scraped_at = models.DateTimeField(db_index=True)
+
+    # Duplicate detection (see apps.core.dedup)
+    address_key = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
+    cluster = models.ForeignKey(
+        PropertyCluster,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="listings",
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["provider", "listing_id"])]
+
+    def __str__(self):
+        return str(self.url)
+
+
+class ListingBand(models.Model):
+    """One LSH band of a listing's MinHash signature.
+
+    Listings whose summaries are likely near-duplicates share at least one
+    bucket, so candidates are found with an index lookup.
+    """
+
+    objects = models.Manager()
+
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name="bands")
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["bucket"])]
+
+
+class SavedSearch(models.Model):
+    """Criteria a new or re-priced listing is matched against on ingest.
+
+    Empty bounds match anything; matches are delivered to ``webhook_url``
+    and/or ``email`` (see apps.core.alerts).
+    """
+
+    objects = models.Manager()
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="saved_searches",
+    )
+    name = models.CharField(max_length=100)
+    outcode = models.CharField(max_length=4, null=True, blank=True)
+    min_price_pence = models.BigIntegerField(null=True, blank=True)
+    max_price_pence = models.BigIntegerField(null=True, blank=True)
+    min_beds = models.PositiveSmallIntegerField(null=True, blank=True)
+    max_beds = models.PositiveSmallIntegerField(null=True, blank=True)
+    webhook_url = models.URLField(max_length=500, blank=True, default="")
+    email = models.EmailField(blank=True, default="")
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.name)
+
+
+class SearchAlert(models.Model):
+    """A listing matched a saved search at a given price.
+
+    Unique per (search, listing, price), so a rescrape only alerts again
+    when the price changes.
+    """
+
+    objects = models.Manager()
+
+    search = models.ForeignKey(
+        SavedSearch, on_delete=models.CASCADE, related_name="alerts"
+    )
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name="+")
+    price_pence = models.BigIntegerField(null=True, blank=True)
+    previous_price_pence = models.BigIntegerField(
+        null=True, blank=True, help_text="Set when the alert is for a price change"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["search", "listing", "price_pence"],
+                name="unique_alert_per_price",
+            )
+        ]
@@ -0,0 +1,221 @@
+"""
+On-demand profiling of API requests.
+
+Staff can profile a single request by sending ``X-Profile: sample`` (or
+``cprofile``) or ``?profile=sample``. ``sample`` runs a wall-clock stack
+sampler and writes folded stacks (``.folded``, readable by flamegraph.pl,
+speedscope and inferno); ``cprofile`` runs the deterministic profiler and
+writes a pstats dump (``.prof``, readable by snakeviz or flameprof); only
+one cProfile session runs at a time, and a concurrent ``cprofile`` request
+is sampled instead. A ``PROFILE_SAMPLE_RATE`` fraction of all traffic to
+profiled views is also sampled, for continuous low-overhead profiling.
+
+Profiles are written to ``PROFILE_DIR``, pruned to the newest
+``PROFILE_KEEP`` and served to admins at ``/api/profiles/``.
+"""
+
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.urls import reverse
+
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+MODES = (SAMPLE, CPROFILE)
+EXTENSIONS = {SAMPLE: ".folded", CPROFILE: ".prof"}
+PROFILE_NAME_RE = re.compile(r"^[\w-]+\.(folded|prof)$")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_qualname} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+def fold_stack(frame) -> str:
+    """Render a frame's stack root-first as a folded-stack line prefix."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame).replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Periodically sample the stacks of some (or all) threads from a helper thread.
+
+    Overhead is one ``sys._current_frames()`` walk per ``interval`` and is
+    independent of how many Python calls the profiled code makes.
+    """
+
+    mode = SAMPLE
+
+    def __init__(
+        self, interval: float = 0.005, thread_ids: Optional[Iterable[int]] = None
+    ):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            # pylint: disable=protected-access
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (
+                    self.thread_ids is not None and ident not in self.thread_ids
+                ):
+                    continue
+                self.stacks[fold_stack(frame)] += 1
+            self.samples += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+    def dump(self, path: Path) -> None:
+        path.write_text(self.folded(), encoding="utf-8")
+
+
+# cProfile hooks the whole interpreter (from 3.12 through a process-wide
+# sys.monitoring tool id), so only one session can run at a time
+_cprofile_lock = threading.Lock()
+
+
+class _CProfiler:
+    mode = CPROFILE
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self) -> "_CProfiler":
+        self._profile.enable()
+        return self
+
+    def stop(self) -> None:
+        self._profile.disable()
+        _cprofile_lock.release()
+
+    def dump(self, path: Path) -> None:
+        self._profile.dump_stats(str(path))
+
+
+def start_profiler(mode: str):
+    """Start profiling the calling thread in ``mode``.
+
+    A ``cprofile`` request falls back to sampling while another cProfile
+    session (or other profiling tool) is active; check the returned
+    profiler's ``mode``.
+    """
+    if mode == CPROFILE and _cprofile_lock.acquire(blocking=False):
+        try:
+            return _CProfiler().start()
+        except ValueError:  # "Another profiling tool is already active"
+            _cprofile_lock.release()
+    return SamplingProfiler(
+        interval=getattr(settings, "PROFILE_SAMPLE_INTERVAL", 0.005),
+        thread_ids=[threading.get_ident()],
+    ).start()
+
+
+# --- storage -----------------------------------------------------------------
+def profile_dir() -> Path:
+    path = Path(getattr(settings, "PROFILE_DIR", Path(settings.BASE_DIR) / "profiles"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def list_profiles() -> List[Path]:
+    """Stored profiles, newest first."""
+    paths = [p for p in profile_dir().iterdir() if PROFILE_NAME_RE.match(p.name)]
+    return sorted(paths, key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def profile_path(name: str) -> Optional[Path]:
+    """Path of the stored profile ``name``, or None if it isn't one."""
+    if not PROFILE_NAME_RE.match(name):
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+
+def save_profile(profiler, mode: str, label: str) -> str:
+    """Write ``profiler``'s output, prune old profiles and return the file name."""
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    label = re.sub(r"[^\w-]", "", label)
+    name = f"{stamp}-{label}-{uuid.uuid4().hex[:8]}{EXTENSIONS[mode]}"
+    profiler.dump(profile_dir() / name)
+    for old in list_profiles()[getattr(settings, "PROFILE_KEEP", 200) :]:
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            pass
+    return name
+
+
+# --- views ------------------------------------------------------------------
+def requested_mode(request) -> Optional[str]:
+    """The profiling mode for ``request``, or None to run it unprofiled.
+
+    An explicit ``X-Profile`` header or ``?profile=`` flag is honoured for
+    staff only; anyone else's request may still be picked for sampling at
+    ``PROFILE_SAMPLE_RATE``.
+    """
+    flag = request.headers.get("X-Profile") or request.query_params.get("profile")
+    if flag and getattr(request.user, "is_staff", False):
+        flag = flag.lower()
+        return flag if flag in MODES else SAMPLE
+    rate = getattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+    if rate > 0 and random.random() < rate:
+        return SAMPLE
+    return None
+
+
+class ProfiledViewMixin:
+    """Profile the handler of an ``APIView`` when ``requested_mode`` says so.
+
+    Profiling starts after authentication and permission checks and stops
+    once the response is finalized; the stored file is named in the
+    ``X-Profile-Id`` response header, with its download link in
+    ``X-Profile-Url``.
+    """
+
+    profile_label = "request"
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        mode = requested_mode(request)
+        self._profiler = start_profiler(mode) if mode else None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        profiler = getattr(self, "_profiler", None)
+        if profiler is not None:
+            self._profiler = None
+            profiler.stop()
+            name = save_profile(profiler, profiler.mode, self.profile_label)
+            response["X-Profile-Id"] = name
+            response["X-Profile-Url"] = request.build_absolute_uri(
+                reverse("profile-detail", args=[name])
+            )
+        return response
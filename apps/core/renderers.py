@@ -0,0 +1,32 @@
+"""
+Extra response formats for the API.
+
+``MessagePackRenderer`` serves ``Accept: application/msgpack`` (or
+``?format=msgpack``) to machine clients: the same data as the JSON responses,
+without the text encoding overhead. It needs the optional ``msgpack``
+package; settings only enable it when that is installed.
+"""
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def _encode(value):
+    # Dates, decimals, UUIDs and lazy strings as the JSON renderer writes them
+    return JSONEncoder().default(value)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render response data as MessagePack."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        import msgpack  # pylint: disable=import-outside-toplevel
+
+        return msgpack.packb(data, default=_encode, use_bin_type=True)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import ProviderConfig
+from .alerts import WebhookURLError, check_webhook_url
+from .models import Listing, PropertyCluster, ProviderConfig, SavedSearch
 
 
 class ProviderConfigSerializer(serializers.ModelSerializer):
@@ -7,3 +8,109 @@ class ProviderConfigSerializer(serializers.ModelSerializer):
         model = ProviderConfig
         fields = ["id", "name", "field_selectors"]
         read_only_fields = ["id"]
+
+
+class ListingSerializer(serializers.ModelSerializer):
+    """A stored listing; ``fields=`` keeps only the named fields."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    class Meta:
+        model = Listing
+        fields = [
+            "id",
+            "provider",
+            "listing_id",
+            "url",
+            "address",
+            "outcode",
+            "price_pence",
+            "beds",
+            "bathrooms",
+            "summary",
+            "service_charge_pence",
+            "source",
+            "scraped_at",
+            "cluster",
+        ]
+
+
+class ClusterListingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Listing
+        fields = [
+            "id",
+            "provider",
+            "url",
+            "address",
+            "price_pence",
+            "beds",
+            "bathrooms",
+            "scraped_at",
+        ]
+
+
+class PropertyClusterSerializer(serializers.ModelSerializer):
+    listings = ClusterListingSerializer(many=True, read_only=True)
+    size = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = PropertyCluster
+        fields = ["id", "size", "created_at", "updated_at", "listings"]
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedSearch
+        fields = [
+            "id",
+            "name",
+            "outcode",
+            "min_price_pence",
+            "max_price_pence",
+            "min_beds",
+            "max_beds",
+            "webhook_url",
+            "email",
+            "active",
+            "created_at",
+        ]
+        read_only_fields = ["id", "created_at"]
+
+    def validate_outcode(self, value):
+        return value.upper() if value else None
+
+    def validate_webhook_url(self, value):
+        if value:
+            try:
+                check_webhook_url(value)
+            except WebhookURLError as exc:
+                raise serializers.ValidationError(str(exc)) from exc
+        return value
+
+    def validate(self, attrs):
+        merged = {**self._instance_values(), **attrs}
+        for low, high in (
+            ("min_price_pence", "max_price_pence"),
+            ("min_beds", "max_beds"),
+        ):
+            if (
+                merged.get(low) is not None
+                and merged.get(high) is not None
+                and merged[low] > merged[high]
+            ):
+                raise serializers.ValidationError({low: f"Must not exceed {high}."})
+        if not merged.get("webhook_url") and not merged.get("email"):
+            raise serializers.ValidationError(
+                "Provide a webhook_url or an email to deliver alerts to."
+            )
+        return attrs
+
+    def _instance_values(self):
+        if self.instance is None:
+            return {}
+        return {field: getattr(self.instance, field) for field in self.Meta.fields}
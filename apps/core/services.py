@@ -0,0 +1,106 @@
+"""
+Storage helpers for scraped listings.
+
+Every ingest path (interactive scrapes, search crawls) goes through
+``upsert_listing`` so a listing URL maps to exactly one stored row.
+"""
+
+from datetime import timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from django.utils import timezone
+
+from . import alerts, analytics, dedup
+from .adapters.records import ListingRecord, attributes_for, format_pence
+from .adapters.rightmove import RightmoveAdapter
+from .models import Listing
+
+LISTING_FIELDS = (
+    "address",
+    "outcode",
+    "price_pence",
+    "beds",
+    "bathrooms",
+    "summary",
+    "service_charge_pence",
+    "source",
+)
+
+
+def upsert_listing(
+    record: ListingRecord,
+    provider="rightmove",
+    fields: Optional[Iterable[str]] = None,
+) -> Listing:
+    """Create or refresh the stored listing for ``record.url``.
+
+    ``fields`` are the API fields ``record`` was fetched for; columns it
+    didn't extract keep their stored values.
+    """
+    extracted = attributes_for(fields)
+    defaults = {
+        field: getattr(record, field)
+        for field in LISTING_FIELDS
+        if ("address" if field == "outcode" else field) in extracted
+    }
+    defaults.update(
+        provider=provider,
+        listing_id=RightmoveAdapter.listing_id(record.url),
+        scraped_at=timezone.now(),
+    )
+    previous_price = (
+        Listing.objects.filter(url=record.url)
+        .values_list("price_pence", flat=True)
+        .first()
+    )
+    listing, created = Listing.objects.update_or_create(
+        url=record.url, defaults=defaults
+    )
+    dedup.index_listing(listing)
+    analytics.listing_saved(listing)
+    alerts.listing_ingested(listing, created, previous_price)
+    return listing
+
+
+def sheet_row(listing: Listing) -> list:
+    """The Google Sheets row for a stored listing."""
+    return [
+        listing.url,
+        listing.address,
+        format_pence(listing.price_pence),
+        format_pence(listing.service_charge_pence),
+    ]
+
+
+def fresh_listing_ids(
+    listing_ids: Iterable[str], max_age: timedelta, provider="rightmove"
+) -> Set[str]:
+    """Return the subset of ``listing_ids`` scraped within ``max_age``."""
+    cutoff = timezone.now() - max_age
+    return set(
+        Listing.objects.filter(
+            provider=provider,
+            listing_id__in=list(listing_ids),
+            scraped_at__gte=cutoff,
+        ).values_list("listing_id", flat=True)
+    )
+
+
+def stale_listings(
+    max_age: timedelta, limit: int, provider="rightmove"
+) -> List[Tuple[int, str]]:
+    """Return up to ``limit`` ``(id, url)`` pairs last scraped before
+    ``max_age``, oldest first.
+
+    Only listings with a provider listing ID qualify (not arbitrary scraped
+    URLs), and the stored URL is returned as-is so a rescrape updates the
+    same row.
+    """
+    cutoff = timezone.now() - max_age
+    return list(
+        Listing.objects.filter(
+            provider=provider, scraped_at__lt=cutoff, listing_id__isnull=False
+        )
+        .order_by("scraped_at")
+        .values_list("id", "url")[:limit]
+    )
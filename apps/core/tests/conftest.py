@@ -0,0 +1,23 @@
+# pylint: disable=missing-function-docstring, missing-module-docstring
+import pytest
+
+from apps.core.adapters.circuit import reset_breakers
+from apps.core.adapters.rightmove import RightmoveAdapter
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    # Breakers are process-wide; don't let failures in one test trip another
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+@pytest.fixture(autouse=True)
+def fresh_adapter_state(monkeypatch):
+    # The hedger keeps latency history and the rate budget drains; each test
+    # starts cold
+    monkeypatch.setattr(RightmoveAdapter, "_hedger", None)
+    monkeypatch.setattr(RightmoveAdapter, "_limiter", None)
+    monkeypatch.setattr(RightmoveAdapter, "_scheduler", None)
+    monkeypatch.setattr(RightmoveAdapter, "_transport", None)
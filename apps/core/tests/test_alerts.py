@@ -0,0 +1,288 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+
+from apps.core import alerts
+from apps.core.adapters.records import NEXT_DATA, ListingRecord
+from apps.core.alerts import AlertDispatcher, SearchIndex, SearchSpec
+from apps.core.models import SavedSearch, SearchAlert
+from apps.core.services import upsert_listing
+
+
+class SinkServer(ThreadingHTTPServer):
+    """Local webhook receiver recording every POSTed JSON body."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SinkHandler)
+        self.bodies = []
+        self.hosts = []
+        self.status = 200
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/hook"
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers["Content-Length"])
+        self.server.bodies.append(json.loads(self.rfile.read(length)))
+        self.server.hosts.append(self.headers["Host"])
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sink(settings):
+    settings.ALERTS_WEBHOOK_ALLOWED_HOSTS = ["127.0.0.1"]
+    srv = SinkServer()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def dispatcher(monkeypatch):
+    instance = AlertDispatcher(max_delay=0.05, retries=1, timeout=2)
+    monkeypatch.setattr(alerts, "_dispatcher", instance)
+    alerts.invalidate_index()
+    yield instance
+    alerts.invalidate_index()
+
+
+@pytest.fixture
+def user(db):  # pylint: disable=unused-argument
+    return get_user_model().objects.create_user("buyer", "buyer@example.com", "pw")
+
+
+def listing(n, price_pence, beds=2, outcode="E6"):
+    return ListingRecord(
+        f"https://www.rightmove.co.uk/properties/{n}",
+        NEXT_DATA,
+        address=f"{n} High Street, London {outcode} 1AA",
+        price_pence=price_pence,
+        beds=beds,
+    )
+
+
+def test_index_matches_like_a_full_scan():
+    rng = random.Random(7)
+    specs = []
+    for i in range(2000):
+        low = rng.choice([None, rng.randrange(0, 10**8)])
+        # Spans up to £500k bucket; up to £10m can be too wide to
+        high = rng.choice(
+            [None, (low or 0) + rng.randrange(0, rng.choice([5 * 10**7, 10**9]))]
+        )
+        specs.append(
+            SearchSpec(
+                i,
+                rng.choice([None, "E6", "E7", "N1", "SW1A"]),
+                low,
+                high,
+                rng.choice([None, 1, 2, 3]),
+                rng.choice([None, 3, 4]),
+            )
+        )
+    index = SearchIndex(specs)
+    for _ in range(300):
+        args = (
+            rng.choice(["E6", "E7", "N1", "SW1A", None]),
+            rng.choice([None, rng.randrange(0, 15 * 10**7)]),
+            rng.choice([None, 1, 2, 3, 4, 5]),
+        )
+        expected = sorted(spec.id for spec in specs if spec.matches(*args))
+        assert index.match(*args) == expected
+
+
+def test_max_only_searches_are_bucketed():
+    # "E6, up to £450k": a missing minimum is £0, not an open range
+    specs = [
+        SearchSpec(i, "E6", max_price_pence=20_000_000 + i * 30_000)
+        for i in range(1000)
+    ]
+    index = SearchIndex(specs)
+    # pylint: disable=protected-access
+    assert not index._from and not index._upto and not index._any
+    assert len(index._buckets[("E6", 0)]) == 1000
+    assert index.match("E6", 45_000_000, None) == [
+        spec.id for spec in specs if spec.max_price_pence >= 45_000_000
+    ]
+
+
+def test_search_bounds():
+    spec = SearchSpec(1, "E6", max_price_pence=45_000_000, min_beds=2)
+    assert spec.matches("E6", 45_000_000, 2)
+    assert not spec.matches("E6", 45_000_001, 2)
+    assert not spec.matches("E6", 40_000_000, 1)
+    assert not spec.matches("E7", 40_000_000, 3)
+    assert not spec.matches("E6", None, 3)  # unpriced listings miss price bounds
+    assert SearchSpec(2).matches(None, None, None)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_new_and_repriced_listings_alert_once(user, sink, dispatcher):
+    search = SavedSearch.objects.create(
+        owner=user,
+        name="E6 under 450k",
+        outcode="E6",
+        max_price_pence=45_000_000,
+        min_beds=2,
+        webhook_url=sink.url,
+    )
+    upsert_listing(listing(1, 40_000_000))
+    upsert_listing(listing(2, 50_000_000))  # too expensive
+    upsert_listing(listing(3, 30_000_000, beds=1))  # too small
+    dispatcher.flush()
+    assert len(sink.bodies) == 1
+    (payload,) = sink.bodies[0]["alerts"]
+    assert payload["search"] == {"id": search.pk, "name": "E6 under 450k"}
+    assert payload["listing"]["price_pence"] == 40_000_000
+    assert payload["previous_price_pence"] is None
+
+    upsert_listing(listing(1, 40_000_000))  # rescrape, same price
+    upsert_listing(listing(2, 44_000_000))  # price cut into range
+    dispatcher.flush()
+    assert len(sink.bodies) == 2
+    (payload,) = sink.bodies[1]["alerts"]
+    assert payload["listing"]["url"].endswith("/2")
+    assert payload["previous_price_pence"] == 50_000_000
+    assert SearchAlert.objects.filter(delivered_at__isnull=False).count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deliveries_are_batched_per_destination(user, sink, dispatcher):
+    for name in ("cheap", "two beds"):
+        SavedSearch.objects.create(
+            owner=user,
+            name=name,
+            max_price_pence=50_000_000,
+            webhook_url=sink.url,
+            email="buyer@example.com",
+        )
+    dispatcher.max_delay = 0.5
+    for n in range(3):
+        upsert_listing(listing(n, 20_000_000 + n))
+    dispatcher.flush()
+
+    assert sum(len(body["alerts"]) for body in sink.bodies) == 6
+    assert len(sink.bodies) < 6
+    assert len(mail.outbox) == len(sink.bodies)
+    assert "new listing match" in mail.outbox[0].subject
+    assert dispatcher.stats["delivered"] == 6
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_webhook_leaves_alert_undelivered(user, sink, dispatcher):
+    sink.status = 500
+    SavedSearch.objects.create(owner=user, name="any", webhook_url=sink.url)
+    upsert_listing(listing(1, 10_000_000))
+    dispatcher.flush()
+
+    assert len(sink.bodies) == 1
+    assert SearchAlert.objects.get().delivered_at is None
+    assert dispatcher.stats["failed"] == 1
+
+
+@pytest.mark.django_db
+def test_saved_search_api(user, client):
+    other = get_user_model().objects.create_user("other", "o@example.com", "pw")
+    SavedSearch.objects.create(owner=other, name="theirs", email="o@example.com")
+    client.force_login(user)
+
+    response = client.post(
+        "/api/searches/",
+        {
+            "name": "E6",
+            "outcode": "e6",
+            "max_price_pence": 45_000_000,
+            "email": "b@example.com",
+        },
+        content_type="application/json",
+    )
+    assert response.status_code == 201
+    assert response.json()["outcode"] == "E6"
+    assert [s["name"] for s in client.get("/api/searches/").json()] == ["E6"]
+
+    bad = client.post(
+        "/api/searches/",
+        {"name": "x", "min_beds": 3, "max_beds": 2, "email": "b@example.com"},
+        content_type="application/json",
+    )
+    assert bad.status_code == 400 and "min_beds" in bad.json()
+    nowhere = client.post(
+        "/api/searches/", {"name": "x"}, content_type="application/json"
+    )
+    assert nowhere.status_code == 400
+
+
+@pytest.mark.django_db
+def test_webhook_urls_must_be_public(user, client, settings):
+    settings.ALERTS_WEBHOOK_ALLOWED_HOSTS = []
+    client.force_login(user)
+
+    def create(url):
+        return client.post(
+            "/api/searches/",
+            {"name": "x", "webhook_url": url},
+            content_type="application/json",
+        )
+
+    for url in (
+        "http://127.0.0.1:8000/hook",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://10.0.0.5/hook",
+        "http://[::1]/hook",
+        "ftp://93.184.215.14/hook",
+    ):
+        response = create(url)
+        assert response.status_code == 400, url
+        assert "webhook_url" in response.json()
+    assert create("https://93.184.215.14/hook").status_code == 201
+
+    settings.ALERTS_WEBHOOK_ALLOWED_HOSTS = ["127.0.0.1"]
+    assert create("http://127.0.0.1:8000/hook").status_code == 201
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dispatcher_refuses_private_webhooks(user, sink, dispatcher, settings):
+    SavedSearch.objects.create(
+        owner=user, name="E6", outcode="E6", webhook_url=sink.url
+    )
+    settings.ALERTS_WEBHOOK_ALLOWED_HOSTS = []
+    upsert_listing(listing(1, 40_000_000))
+    dispatcher.flush()
+
+    assert not sink.bodies
+    assert SearchAlert.objects.get().delivered_at is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dispatcher_posts_to_the_checked_address(user, sink, dispatcher, monkeypatch):
+    # hooks.example.test never resolves: the POST must go to the address the
+    # check returned instead of looking the host up again
+    url = f"http://hooks.example.test:{sink.server_port}/hook"
+    monkeypatch.setattr(
+        alerts, "check_webhook_url", lambda u: ["127.0.0.1"] if u == url else []
+    )
+    SavedSearch.objects.create(owner=user, name="E6", outcode="E6", webhook_url=url)
+    upsert_listing(listing(1, 40_000_000))
+    dispatcher.flush()
+
+    assert len(sink.bodies) == 1
+    assert sink.hosts == [f"hooks.example.test:{sink.server_port}"]
+    assert SearchAlert.objects.get().delivered_at is not None
@@ -0,0 +1,130 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import numpy as np
+import pytest
+from django.utils import timezone
+
+from apps.core import analytics
+from apps.core.adapters.records import NEXT_DATA, ListingRecord, extract_outcode
+from apps.core.analytics import MarketSnapshot, grouped_percentiles
+from apps.core.models import Listing
+from apps.core.services import upsert_listing
+
+pytestmark = pytest.mark.django_db
+
+
+def make_listing(i, outcode, price, beds, charge=None):
+    return Listing.objects.create(
+        url=f"https://www.rightmove.co.uk/properties/{i}",
+        listing_id=str(i),
+        address=f"{i} Road, London, {outcode}",
+        outcode=outcode,
+        price_pence=price,
+        beds=beds,
+        service_charge_pence=charge,
+        scraped_at=timezone.now(),
+    )
+
+
+@pytest.fixture
+def listings():
+    make_listing(1, "E6", 300_000_00, 1, 1_000_00)
+    make_listing(2, "E6", 400_000_00, 2, 2_000_00)
+    make_listing(3, "E6", 500_000_00, 2, 3_000_00)
+    make_listing(4, "N1", 900_000_00, 3, 4_000_00)
+    make_listing(5, "N1", None, 2)
+    make_listing(6, None, 200_000_00, 0)
+
+
+@pytest.fixture
+def fresh_snapshot(monkeypatch):
+    snapshot = MarketSnapshot()
+    monkeypatch.setattr(analytics, "snapshot", snapshot)
+    return snapshot
+
+
+def test_extract_outcode():
+    assert extract_outcode("Jahanam Dare, London, E6") == "E6"
+    assert extract_outcode("10 High St, London SW1A 1AA") == "SW1A"
+    assert extract_outcode("Example Street, Testville") is None
+
+
+def test_grouped_percentiles_matches_numpy():
+    rng = np.random.default_rng(0)
+    keys = rng.integers(0, 5, 500)
+    values = rng.normal(100, 20, 500)
+    groups, result = grouped_percentiles(keys, values, (10, 50, 90))
+    for group, row in zip(groups, result):
+        expected = np.percentile(values[keys == group], (10, 50, 90))
+        assert row == pytest.approx(expected)
+
+
+def test_market_aggregates(listings, fresh_snapshot):
+    result = fresh_snapshot.market()
+    assert result["listings"] == 6
+    assert result["priced"] == 5
+    assert result["median_price_by_beds"] == {
+        "0": 200_000_00,
+        "1": 300_000_00,
+        "2": 450_000_00,
+        "3": 900_000_00,
+    }
+    assert result["price_per_bed"]["count"] == 4
+    assert sum(result["price_per_bed"]["histogram"]["counts"]) == 4
+    assert result["service_charge_percentiles"]["E6"]["p50"] == 2_000_00
+    assert set(result["service_charge_percentiles"]) == {"E6", "N1"}
+
+
+def test_market_for_one_outcode(listings, fresh_snapshot):
+    result = fresh_snapshot.market("E6", bins=5)
+    assert result["listings"] == 3
+    assert result["median_price_by_beds"] == {"1": 300_000_00, "2": 450_000_00}
+    assert len(result["price_per_bed"]["histogram"]["counts"]) == 5
+    assert fresh_snapshot.market("ZZ9")["listings"] == 0
+
+
+def test_upsert_invalidates_only_touched_outcodes(
+    listings, fresh_snapshot, django_capture_on_commit_callbacks
+):
+    e6 = fresh_snapshot.market("E6")
+    n1 = fresh_snapshot.market("N1")
+    with django_capture_on_commit_callbacks(execute=True):
+        upsert_listing(
+            ListingRecord(
+                "https://www.rightmove.co.uk/properties/7",
+                NEXT_DATA,
+                address="7 Road, London, E6",
+                price_pence=600_000_00,
+                beds=2,
+            )
+        )
+    assert fresh_snapshot.market("N1") is n1
+    updated = fresh_snapshot.market("E6")
+    assert updated is not e6
+    assert updated["median_price_by_beds"]["2"] == 500_000_00
+    assert fresh_snapshot.market()["listings"] == 7
+
+
+def test_reprice_moves_between_groups(
+    listings, fresh_snapshot, django_capture_on_commit_callbacks
+):
+    fresh_snapshot.market("E6")
+    with django_capture_on_commit_callbacks(execute=True):
+        upsert_listing(
+            ListingRecord(
+                "https://www.rightmove.co.uk/properties/3",
+                NEXT_DATA,
+                address="3 Road, London, N1",
+                price_pence=700_000_00,
+                beds=2,
+            )
+        )
+    assert fresh_snapshot.market("E6")["listings"] == 2
+    assert fresh_snapshot.market("N1")["median_price_by_beds"]["2"] == 700_000_00
+
+
+def test_market_endpoint(listings, fresh_snapshot, admin_client, client):
+    assert client.get("/api/analytics/market/").status_code in (401, 403)
+    response = admin_client.get("/api/analytics/market/?outcode=e6")
+    assert response.status_code == 200
+    assert response.json()["outcode"] == "E6"
+    assert admin_client.get("/api/analytics/market/?bins=0").status_code == 400
@@ -0,0 +1,161 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import pytest
+import requests
+
+from apps.core.adapters import circuit
+from apps.core.adapters.circuit import CircuitBreaker, CircuitOpenError, get_breaker
+from apps.core.adapters.rightmove import RightmoveAdapter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit.time, "monotonic", fake)
+    return fake
+
+
+def make_breaker():
+    return CircuitBreaker(
+        "test", failure_rate=0.5, min_calls=4, window_seconds=10, open_seconds=5
+    )
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.record(breaker.before_call(), failed=True)
+
+
+def test_opens_after_error_rate_threshold(clock):
+    breaker = make_breaker()
+    fail(breaker, 3)
+    assert breaker.state == circuit.CLOSED  # below min_calls
+    fail(breaker, 1)
+    assert breaker.state == circuit.OPEN
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.retry_after == pytest.approx(5)
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_successes_keep_breaker_closed(clock):
+    breaker = make_breaker()
+    for failed in (True, False, False, False, True, False):
+        breaker.record(breaker.before_call(), failed)
+    assert breaker.state == circuit.CLOSED
+
+
+def test_old_failures_leave_the_window(clock):
+    breaker = make_breaker()
+    fail(breaker, 3)
+    clock.now += 11
+    fail(breaker, 1)
+    assert breaker.state == circuit.CLOSED
+
+
+def test_half_open_allows_limited_probes(clock):
+    breaker = make_breaker()
+    fail(breaker, 4)
+    clock.now += 5
+    assert breaker.state == circuit.HALF_OPEN
+    probe = breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe in flight
+    breaker.record(probe, failed=False)
+    assert breaker.state == circuit.CLOSED
+
+
+def test_failed_probe_reopens(clock):
+    breaker = make_breaker()
+    fail(breaker, 4)
+    clock.now += 5
+    fail(breaker, 1)
+    assert breaker.state == circuit.OPEN
+
+
+def test_results_from_before_a_state_change_are_ignored(clock):
+    breaker = make_breaker()
+    slow = breaker.before_call()  # reserved while closed
+    late_failure = breaker.before_call()
+    fail(breaker, 4)
+    assert breaker.state == circuit.OPEN
+
+    # A stale failure while open doesn't re-open (and reset the cool-down)
+    breaker.record(late_failure, failed=True)
+    assert breaker.snapshot()["opened"] == 1
+
+    clock.now += 5
+    probe = breaker.before_call()
+    breaker.record(slow, failed=False)  # not the probe: stays half-open
+    assert breaker.state == circuit.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # the probe is still in flight
+
+    breaker.record(probe, failed=False)
+    assert breaker.state == circuit.CLOSED
+    assert breaker.snapshot()["calls"] == 7
+
+
+def test_adapter_fails_fast_when_open(monkeypatch, settings):
+    settings.CIRCUIT_BREAKER = {"min_calls": 2, "open_seconds": 60}
+    calls = []
+
+    def raise_timeout(*args, **kwargs):
+        calls.append(1)
+        raise requests.exceptions.Timeout
+
+    monkeypatch.setattr(RightmoveAdapter.session, "get", raise_timeout)
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.Timeout):
+            RightmoveAdapter.fetch("https://example.com")
+    with pytest.raises(CircuitOpenError):
+        RightmoveAdapter.fetch("https://example.com")
+    assert len(calls) == 2
+    assert get_breaker("rightmove").state == circuit.OPEN
+
+
+def test_adapter_counts_5xx_as_failure(monkeypatch):
+    class MockResponse:
+        status_code = 503
+        text = "Service Unavailable"
+
+        def raise_for_status(self):
+            raise requests.HTTPError("503")
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(
+        RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
+    )
+    with pytest.raises(requests.HTTPError):
+        RightmoveAdapter.fetch("https://example.com")
+    assert get_breaker("rightmove").snapshot()["failures"] == 1
+
+
+@pytest.mark.django_db
+def test_scrape_returns_503_while_open(monkeypatch, client):
+    def open_circuit(url, fields=None):
+        raise CircuitOpenError("rightmove", 12.4)
+
+    monkeypatch.setattr(RightmoveAdapter, "fetch", staticmethod(open_circuit))
+    response = client.post("/api/scrape/", {"url": "https://example.com"})
+    assert response.status_code == 503
+    assert response["Retry-After"] == "12"
+    assert "temporarily unavailable" in response.json()["error"]
+
+
+@pytest.mark.django_db
+def test_breaker_metrics_endpoint(admin_client, client):
+    fail(get_breaker("rightmove"), 1)
+    assert client.get("/api/metrics/breakers/").status_code in (401, 403)
+    data = admin_client.get("/api/metrics/breakers/").json()
+    assert data["rightmove"]["state"] == "closed"
+    assert data["rightmove"]["failures"] == 1
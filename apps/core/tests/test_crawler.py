@@ -0,0 +1,192 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import json
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.core.adapters.records import NEXT_DATA, ListingRecord
+from apps.core.adapters.rightmove import ListingGoneError, RightmoveAdapter
+from apps.core.adapters.ratelimit import TokenBucket
+from apps.core import crawler
+from apps.core.crawler import SearchCrawler, get_crawl, start_crawl
+from apps.core.models import Listing
+
+SEARCH_URL = (
+    "https://www.rightmove.co.uk/property-for-sale/find.html"
+    "?locationIdentifier=OUTCODE%5E762&index=48"
+)
+
+
+def test_is_search_url():
+    assert RightmoveAdapter.is_search_url(SEARCH_URL)
+    assert not RightmoveAdapter.is_search_url(
+        "https://www.rightmove.co.uk/properties/159360596"
+    )
+    assert RightmoveAdapter.is_search_url(
+        "https://rightmove.co.uk/property-to-rent/find.html"
+    )
+    for url in (
+        "http://www.rightmove.co.uk/property-for-sale/find.html",
+        "https://10.0.0.5/property-for-sale/find.html",
+        "https://www.rightmove.co.uk.evil.test/property-for-sale/find.html",
+        "https://www.rightmove.co.uk:8443/property-for-sale/find.html",
+        "https://www.rightmove.co.uk:bad/property-for-sale/find.html",
+    ):
+        assert not RightmoveAdapter.is_search_url(url), url
+
+
+def test_search_page_url_replaces_index():
+    url = RightmoveAdapter.search_page_url(SEARCH_URL, 24)
+    assert url.count("index=") == 1
+    assert url.endswith("index=24")
+    assert "index" not in RightmoveAdapter.search_page_url(SEARCH_URL, 0)
+
+
+def test_fetch_search_page_json_model(monkeypatch):
+    model = {"properties": [{"id": 1}, {"id": 2}], "resultCount": "1,234"}
+
+    class MockResponse:
+        status_code = 200
+        text = f"<script>window.jsonModel = {json.dumps(model)}</script>"
+
+        def raise_for_status(self):
+            pass
+
+    monkeypatch.setattr(
+        RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
+    )
+    assert RightmoveAdapter.fetch_search_page(SEARCH_URL) == (["1", "2"], 1234)
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=1000, burst=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.acquire() > 0
+
+
+@pytest.fixture
+def fake_search(monkeypatch):
+    # 60 results over 3 pages; listing "1" is pinned to every page
+    pages = {
+        0: ["1"] + [str(i) for i in range(2, 25)],
+        24: ["1"] + [str(i) for i in range(25, 48)],
+        48: ["1"] + [str(i) for i in range(48, 61)],
+    }
+    fetched = []
+
+    def fake_page(url):
+        index = int(url.split("index=")[1]) if "index=" in url else 0
+        return pages[index], 60
+
+    def fake_fetch(url):
+        fetched.append(url)
+        if url.endswith("/13"):
+            raise ListingGoneError(url)
+        return ListingRecord(url, NEXT_DATA, address="Somewhere", price_pence=10**7)
+
+    monkeypatch.setattr(RightmoveAdapter, "fetch_search_page", staticmethod(fake_page))
+    monkeypatch.setattr(RightmoveAdapter, "fetch", staticmethod(fake_fetch))
+    return fetched
+
+
+@pytest.mark.django_db(transaction=True)
+def test_crawl_skips_fresh_and_reports_progress(fake_search, monkeypatch):
+    now = timezone.now()
+    Listing.objects.create(
+        url=RightmoveAdapter.listing_url("2"), listing_id="2", scraped_at=now
+    )
+    Listing.objects.create(
+        url=RightmoveAdapter.listing_url("3"),
+        listing_id="3",
+        scraped_at=now - timedelta(days=30),
+    )
+    reports = []
+    sheet_batches = []
+    monkeypatch.setattr(crawler, "write_rows", sheet_batches.append)
+    progress = SearchCrawler(
+        max_workers=4,
+        fresh_for=timedelta(days=1),
+        on_progress=lambda p: reports.append((p.pages_done, p.fetched)),
+    ).crawl(SEARCH_URL)
+
+    assert progress.finished
+    assert progress.pages_total == 3
+    assert progress.listings_found == 60
+    assert progress.skipped_fresh == 1
+    assert progress.fetched == 58
+    assert progress.saved == 58
+    assert progress.failed == 1
+    assert RightmoveAdapter.listing_url("2") not in fake_search
+    assert Listing.objects.count() == 59
+    assert Listing.objects.get(listing_id="3").scraped_at > now
+    assert len(reports) > 3
+    assert [len(rows) for rows in sheet_batches] == [58]
+    assert sheet_batches[0][0][2] == "£100,000"
+
+
+@pytest.fixture
+def user_client(client, django_user_model, monkeypatch):
+    monkeypatch.setattr(crawler, "_jobs", {})
+    client.force_login(django_user_model.objects.create_user("u", "u@example.com"))
+    return client
+
+
+@pytest.mark.django_db
+def test_crawl_api_requires_login(client):
+    assert client.post("/api/crawl/", {"url": SEARCH_URL}).status_code == 403
+
+
+@pytest.mark.django_db
+def test_crawl_api_rejects_listing_url(user_client):
+    client = user_client
+    response = client.post(
+        "/api/crawl/", {"url": "https://www.rightmove.co.uk/properties/1"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_crawl_api_rejects_foreign_hosts(user_client):
+    response = user_client.post(
+        "/api/crawl/", {"url": "http://10.0.0.5/property-for-sale/find.html"}
+    )
+    assert response.status_code == 400
+    assert not crawler._jobs  # pylint: disable=protected-access
+
+
+@pytest.mark.django_db(transaction=True)
+def test_crawl_api_runs_in_background(fake_search, user_client):
+    client = user_client
+    response = client.post("/api/crawl/", {"url": SEARCH_URL})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    get_crawl(job_id).wait(timeout=10)
+    data = client.get(f"/api/crawl/{job_id}/").json()
+    assert data["finished"]
+    assert data["fetched"] == 59
+
+
+@pytest.mark.django_db
+def test_crawl_jobs_are_capped_and_expire(user_client, settings, monkeypatch):
+    settings.CRAWL_MAX_JOBS = 1
+    release = threading.Event()
+    monkeypatch.setattr(
+        SearchCrawler, "crawl", lambda self, url: release.wait(timeout=10)
+    )
+    first = start_crawl(SEARCH_URL)
+
+    response = user_client.post("/api/crawl/", {"url": SEARCH_URL})
+    assert response.status_code == 429
+
+    release.set()
+    first.wait(timeout=10)
+    assert get_crawl(first.id) is first
+    first.finished_at = time.monotonic() - settings.CRAWL_JOB_TTL - 1
+    assert get_crawl(first.id) is None
+    assert user_client.post("/api/crawl/", {"url": SEARCH_URL}).status_code == 202
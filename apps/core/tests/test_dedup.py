@@ -0,0 +1,118 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import pytest
+
+from apps.core import dedup
+from apps.core.adapters.records import NEXT_DATA, ListingRecord
+from apps.core.models import Listing, ListingBand, PropertyCluster
+from apps.core.services import upsert_listing
+
+pytestmark = pytest.mark.django_db
+
+SUMMARY = (
+    "A bright and spacious two bedroom apartment on the third floor of a "
+    "modern development moments from the station, with a private balcony, "
+    "open plan kitchen and reception room, allocated parking and a share of "
+    "freehold. Offered chain free and viewing is highly recommended."
+)
+
+
+def scrape(n, address="Jahanam Dare, London, E6", summary=SUMMARY, **fields):
+    fields.setdefault("price_pence", 425_000_00)
+    fields.setdefault("beds", 2)
+    return upsert_listing(
+        ListingRecord(
+            f"https://www.rightmove.co.uk/properties/{n}",
+            NEXT_DATA,
+            address=address,
+            summary=summary,
+            **fields,
+        )
+    )
+
+
+def test_normalize_address():
+    assert (
+        dedup.normalize_address("Flat 2, 10 High St., London E6")
+        == "FLAT 2 10 HIGH STREET LONDON E6"
+    )
+    assert dedup.normalize_address("  ") is None
+
+
+def test_minhash_similarity_tracks_jaccard():
+    a = dedup.minhash(SUMMARY)
+    b = dedup.minhash(SUMMARY.replace("Offered chain free and", "Chain free,"))
+    c = dedup.minhash("A detached four bedroom family house with a large garden")
+    assert dedup.similarity(a, a) == 1.0
+    assert dedup.similarity(a, b) > 0.7
+    assert dedup.similarity(a, c) < 0.2
+    assert dedup.minhash("") is None
+
+
+def test_relisting_joins_existing_cluster():
+    first = scrape(1)
+    second = scrape(
+        2,
+        address="Jahanam Dare, London E6",
+        summary=SUMMARY.replace("highly recommended", "recommended"),
+        price_pence=415_000_00,
+    )
+    assert second.cluster_id == first.cluster_id
+    assert ListingBand.objects.filter(listing=second).count() == dedup.BANDS
+
+
+def test_same_street_different_flat_stays_separate():
+    first = scrape(1)
+    other = scrape(
+        2,
+        summary="Three bedroom maisonette with garden, recently refurbished.",
+        beds=3,
+        price_pence=650_000_00,
+    )
+    assert other.cluster_id != first.cluster_id
+
+
+def test_address_only_match_needs_size_and_price():
+    first = scrape(1, summary=None)
+    assert (
+        scrape(2, summary=None, price_pence=300_000_00).cluster_id != first.cluster_id
+    )
+    assert (
+        scrape(3, summary=None, price_pence=430_000_00).cluster_id == first.cluster_id
+    )
+
+
+def test_bridging_listing_merges_clusters():
+    a = scrape(1, summary=None)
+    b = scrape(2, address="Other Road, London, E6")
+    assert a.cluster_id != b.cluster_id
+    bridge = scrape(3)  # same address as a, same summary as b
+    a.refresh_from_db()
+    b.refresh_from_db()
+    assert a.cluster_id == b.cluster_id == bridge.cluster_id
+    assert PropertyCluster.objects.count() == 1
+
+
+def test_rescrape_is_idempotent():
+    scrape(1)
+    listing = scrape(1)
+    assert Listing.objects.count() == 1
+    assert ListingBand.objects.filter(listing=listing).count() == dedup.BANDS
+
+
+def test_clusters_endpoint(admin_client, client):
+    first = scrape(1)
+    scrape(2)
+    scrape(3, address="Somewhere Else, N1", summary="Studio flat", beds=0)
+    assert client.get("/api/clusters/").status_code in (401, 403)
+
+    data = admin_client.get("/api/clusters/").json()
+    assert len(data) == 1
+    assert data[0]["size"] == 2
+    assert {item["url"] for item in data[0]["listings"]} == {
+        first.url,
+        "https://www.rightmove.co.uk/properties/2",
+    }
+    by_url = admin_client.get(
+        "/api/clusters/?url=https://www.rightmove.co.uk/properties/3"
+    ).json()
+    assert by_url[0]["size"] == 1
@@ -0,0 +1,92 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import csv
+import io
+import json
+import sys
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+
+from apps.core.exporters import EXPORT_FIELDS, export_listings, filter_listings
+from apps.core.models import Listing
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def listings():
+    for i in range(25):
+        Listing.objects.create(
+            url=f"https://www.rightmove.co.uk/properties/{i}",
+            listing_id=str(i),
+            address=f"{i} Example St",
+            price_pence=i * 100_000,
+            provider="rightmove" if i % 5 else "other",
+            scraped_at=datetime(2025, 1, 1 + i, tzinfo=dt_timezone.utc),
+        )
+
+
+def test_csv_export_streams_in_chunks(listings):
+    chunks = list(export_listings(Listing.objects.all(), "csv", chunk_size=10))
+    # header + three row batches
+    assert len(chunks) == 4
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == list(EXPORT_FIELDS)
+    assert len(rows) == 26
+    assert rows[1][EXPORT_FIELDS.index("address")] == "0 Example St"
+
+
+def test_jsonl_export_with_filters(listings):
+    queryset = filter_listings(
+        {"provider": "rightmove", "since": "2025-01-05", "until": "2025-01-10"}
+    )
+    lines = b"".join(export_listings(queryset, "jsonl")).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["listing_id"] for r in records] == ["4", "6", "7", "8", "9"]
+
+
+def test_filter_listings_rejects_bad_date():
+    with pytest.raises(ValueError):
+        filter_listings({"since": "yesterday"})
+
+
+def test_parquet_export_row_groups(listings):
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = b"".join(export_listings(Listing.objects.all(), "parquet", chunk_size=10))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_rows == 25
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("url")[0].as_py().endswith("/0")
+    assert table.column("price_pence")[3].as_py() == 300_000
+
+
+def test_export_endpoint_requires_admin(client):
+    assert client.get("/api/listings/export/csv/").status_code in (401, 403)
+
+
+def test_export_endpoint_streams(listings, admin_client):
+    response = admin_client.get("/api/listings/export/jsonl/?provider=other")
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert len(lines) == 5
+
+
+def test_export_endpoint_unknown_format(admin_client):
+    assert admin_client.get("/api/listings/export/xml/").status_code == 400
+
+
+def test_parquet_export_without_pyarrow_is_501(listings, admin_client, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    response = admin_client.get("/api/listings/export/parquet/")
+    assert response.status_code == 501
+    assert "pip install pyarrow" in response.json()["error"]
+
+
+def test_export_command_writes_file(listings, tmp_path):
+    out = tmp_path / "listings.csv"
+    call_command("export_listings", "--format", "csv", "--output", str(out))
+    assert len(out.read_text().splitlines()) == 26
@@ -0,0 +1,197 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from apps.core.adapters.hedging import HedgeBudget, Hedger, LatencyTracker
+from apps.core.adapters.rightmove import RightmoveAdapter
+
+PAGE = (
+    b"<html><script type='application/ld+json'>"
+    b'{"@type": "Offer", "itemOffered": {"address": {"streetAddress": '
+    b'"1 Fast Lane"}}, "price": 250000}</script></html>'
+)
+
+
+class LatencyServer(ThreadingHTTPServer):
+    """Local HTTP server; ``delays`` holds per-request sleeps in arrival order."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), LatencyHandler)
+        self.delays = []
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    def next_delay(self):
+        with self.lock:
+            self.hits += 1
+            return self.delays.pop(0) if self.delays else 0.0
+
+
+class LatencyHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # pylint: disable=invalid-name
+        time.sleep(self.server.next_delay())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = LatencyServer()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+class FakeResponse:
+    def __init__(self, value):
+        self.value = value
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def warm(hedger, seconds=0.01, samples=20):
+    for _ in range(samples):
+        hedger.latencies.record(seconds)
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100, min_samples=10)
+    assert tracker.percentile(95) is None
+    for i in range(100):
+        tracker.record(i / 100)
+    assert tracker.percentile(95) == pytest.approx(0.95)
+
+
+def test_hedge_budget_caps_ratio():
+    budget = HedgeBudget(ratio=0.1, burst=1)
+    spent = 0
+    for _ in range(100):
+        budget.earn()
+        spent += budget.try_spend()
+    assert 9 <= spent <= 10
+
+
+def test_no_hedge_until_warmed_up():
+    hedger = Hedger(max_ratio=1.0, min_delay=0.01)
+    result = hedger.run(lambda: (time.sleep(0.05), FakeResponse("slow"))[1])
+    assert result.value == "slow"
+    assert hedger.stats["hedged"] == 0
+
+
+def test_slow_primary_is_hedged_and_loser_closed():
+    hedger = Hedger(max_ratio=1.0, min_delay=0.02)
+    warm(hedger)
+    calls = []
+    responses = []
+
+    def call():
+        slow = not calls
+        calls.append(1)
+        if slow:
+            time.sleep(0.3)
+        response = FakeResponse("slow" if slow else "fast")
+        responses.append(response)
+        return response
+
+    start = time.monotonic()
+    result = hedger.run(call)
+    assert result.value == "fast"
+    assert time.monotonic() - start < 0.2
+    assert hedger.stats == {"requests": 1, "hedged": 1, "hedge_wins": 1}
+    time.sleep(0.35)
+    assert [r.closed for r in responses if r.value == "slow"] == [True]
+
+
+def test_refused_hedge_keeps_its_budget():
+    allowed = []
+    hedger = Hedger(max_ratio=0.5, min_delay=0.01, can_hedge=lambda: bool(allowed))
+    warm(hedger, samples=100)
+
+    def call():
+        time.sleep(0.05)
+        return FakeResponse("slow")
+
+    hedger.run(call)
+    hedger.run(call)  # budget holds a full token, but the limiter says no
+    assert hedger.stats["hedged"] == 0
+    allowed.append(1)
+    hedger.run(call)
+    assert hedger.stats["hedged"] == 1
+
+
+def test_fast_failure_does_not_beat_pending_request():
+    hedger = Hedger(max_ratio=1.0, min_delay=0.02)
+    warm(hedger)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.1)
+            return FakeResponse("primary")
+        raise ConnectionError("hedge failed")
+
+    assert hedger.run(call).value == "primary"
+
+
+def test_adapter_hedges_against_local_server(server, settings):
+    settings.SCRAPE_HEDGING = {"enabled": True, "max_ratio": 1.0, "min_delay": 0.05}
+    hedger = RightmoveAdapter.hedger()
+    warm(hedger)
+    server.delays = [1.5]  # first request hangs, the hedge is fast
+
+    start = time.monotonic()
+    record = RightmoveAdapter.fetch(
+        f"http://127.0.0.1:{server.server_address[1]}/properties/1"
+    )
+    elapsed = time.monotonic() - start
+
+    assert record.address == "1 Fast Lane"
+    assert elapsed < 1.0
+    assert server.hits == 2
+    assert hedger.stats["hedge_wins"] == 1
+
+
+def test_adapter_hedges_stay_within_ratio(server, settings):
+    settings.SCRAPE_HEDGING = {"enabled": True, "max_ratio": 0.25, "min_delay": 0.02}
+    hedger = RightmoveAdapter.hedger()
+    warm(hedger)
+    server.delays = [0.1] * 100  # every request is slow
+    url = f"http://127.0.0.1:{server.server_address[1]}/properties/1"
+    for _ in range(8):
+        RightmoveAdapter.fetch(url)
+    assert hedger.stats["hedged"] <= 2
+
+
+def test_adapter_hedges_need_a_free_slot_in_the_lane(server, settings):
+    settings.SCRAPE_HEDGING = {"enabled": True, "max_ratio": 1.0, "min_delay": 0.02}
+    settings.SCRAPE_CONCURRENCY = 1
+    hedger = RightmoveAdapter.hedger()
+    warm(hedger)
+    server.delays = [0.2]
+
+    RightmoveAdapter.fetch(f"http://127.0.0.1:{server.server_address[1]}/properties/1")
+
+    # the primary holds the only slot, so no hedge goes out
+    assert server.hits == 1
+    assert hedger.stats["hedged"] == 0
+    assert RightmoveAdapter.scheduler().snapshot()["bulk"]["active"] == 0
+
+
+def test_hedging_disabled_by_default():
+    assert RightmoveAdapter.hedger() is None
@@ -0,0 +1,119 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import pstats
+import sys
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.core import profiling
+from apps.core.adapters.records import JSON_LD, ListingRecord
+from apps.core.adapters.rightmove import RightmoveAdapter
+
+URL = "https://www.rightmove.co.uk/properties/1"
+
+
+def slow_parse(url, fields=None):
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        pass
+    return ListingRecord.from_raw(url, JSON_LD, address="stubbed", price="£123")
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path, monkeypatch):
+    settings.PROFILE_DIR = tmp_path
+    settings.PROFILE_SAMPLE_INTERVAL = 0.001
+    monkeypatch.setattr(RightmoveAdapter, "fetch", staticmethod(slow_parse))
+    return tmp_path
+
+
+@pytest.fixture
+def staff_client(client):
+    admin = get_user_model().objects.create_superuser("admin", "a@b.c", "pw")
+    client.force_login(admin)
+    return client
+
+
+def test_fold_stack_is_root_first():
+    line = profiling.fold_stack(sys._getframe())
+    frames = line.split(";")
+    assert "test_fold_stack_is_root_first (tests/test_profiling.py" in frames[-1]
+    assert len(frames) > 1
+
+
+@pytest.mark.django_db
+def test_staff_sample_profile_is_stored_and_downloadable(profile_dir, staff_client):
+    response = staff_client.post("/api/scrape/", {"url": URL}, HTTP_X_PROFILE="sample")
+    assert response.status_code == 200
+    name = response["X-Profile-Id"]
+    assert name.endswith(".folded")
+    assert response["X-Profile-Url"].endswith(f"/api/profiles/{name}/")
+
+    folded = (profile_dir / name).read_text()
+    assert "slow_parse" in folded
+    for line in folded.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack and int(count) > 0
+
+    listing = staff_client.get("/api/profiles/").json()
+    assert [entry["name"] for entry in listing] == [name]
+    download = staff_client.get(f"/api/profiles/{name}/")
+    assert download.status_code == 200
+    assert b"".join(download.streaming_content).decode() == folded
+
+
+@pytest.mark.django_db
+def test_cprofile_mode_via_query_flag(profile_dir, staff_client):
+    response = staff_client.post("/api/scrape/?profile=cprofile", {"url": URL})
+    name = response["X-Profile-Id"]
+    assert name.endswith(".prof")
+    stats = pstats.Stats(str(profile_dir / name))
+    assert any(func[2] == "slow_parse" for func in stats.stats)
+
+
+@pytest.mark.django_db
+def test_concurrent_cprofile_request_falls_back_to_sampling(profile_dir, staff_client):
+    busy = profiling.start_profiler(profiling.CPROFILE)  # another request's session
+    try:
+        assert busy.mode == profiling.CPROFILE
+        response = staff_client.post("/api/scrape/?profile=cprofile", {"url": URL})
+        assert response.status_code == 200
+        assert response["X-Profile-Id"].endswith(".folded")
+    finally:
+        busy.stop()
+
+    response = staff_client.post("/api/scrape/?profile=cprofile", {"url": URL})
+    assert response["X-Profile-Id"].endswith(".prof")
+
+
+@pytest.mark.django_db
+def test_non_staff_cannot_trigger_profiling(profile_dir, client):
+    response = client.post("/api/scrape/", {"url": URL}, HTTP_X_PROFILE="sample")
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response
+    assert not list(profile_dir.iterdir())
+    assert client.get("/api/profiles/").status_code in (401, 403)
+
+
+@pytest.mark.django_db
+def test_sample_rate_profiles_a_fraction_of_traffic(profile_dir, settings, client):
+    settings.PROFILE_SAMPLE_RATE = 1.0
+    response = client.post("/api/scrape/", {"url": URL})
+    assert response["X-Profile-Id"].endswith(".folded")
+
+
+@pytest.mark.django_db
+def test_old_profiles_are_pruned_and_names_checked(profile_dir, settings, staff_client):
+    settings.PROFILE_KEEP = 2
+    names = []
+    for _ in range(3):
+        names.append(
+            staff_client.post("/api/scrape/", {"url": URL}, HTTP_X_PROFILE="sample")[
+                "X-Profile-Id"
+            ]
+        )
+        time.sleep(0.01)
+    assert sorted(p.name for p in profile_dir.iterdir()) == sorted(names[1:])
+    assert staff_client.get("/api/profiles/..%2Fdb.sqlite3/").status_code == 404
+    assert staff_client.get(f"/api/profiles/{names[0]}/").status_code == 404
@@ -3,7 +3,34 @@ import pytest
 import requests
 import responses
 from django.test import Client
-from apps.core.adapters.rightmove import RightmoveAdapter
+from apps.core.adapters.records import (
+    HTML,
+    JSON_LD,
+    NEXT_DATA,
+    ListingRecord,
+    format_pence,
+    parse_count,
+    parse_fields,
+    parse_pence,
+)
+from apps.core.adapters.rightmove import ListingGoneError, RightmoveAdapter
+
+
+class StreamingMockResponse:
+    """Base for mocked responses: streams ``text`` like requests with stream=True."""
+
+    status_code = 200
+    text = ""
+    encoding = "utf-8"
+    closed = False
+
+    def iter_content(self, chunk_size=1):
+        data = self.text.encode(self.encoding)
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+
+    def close(self):
+        self.closed = True
 
 
 # --- Unit tests for RightmoveAdapter ---
@@ -14,14 +41,14 @@ from apps.core.adapters.rightmove import RightmoveAdapter
             '<html><script type="application/ld+json">{"@type": "Offer", "itemOffered": '
             '{"address": {"streetAddress": "123 Example St"}}, "price": 1000000}</script></html>',
             "123 Example St",
-            "£1000000",
+            "£1,000,000",
         ),
     ],
 )
 def test_fetch_successful_json_ld_parsing(
     monkeypatch, html, expected_address, expected_price
 ):
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -32,8 +59,10 @@ def test_fetch_successful_json_ld_parsing(
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["address"] == expected_address
-    assert result["price"] == expected_price
+    assert result.address == expected_address
+    assert result.price == expected_price
+    assert result.price_pence == 100_000_000
+    assert result.source == JSON_LD
 
 
 def test_fetch_http_error(monkeypatch):
@@ -54,7 +83,7 @@ def test_fetch_next_data_parsing(monkeypatch):
         "</script></html>"
     )
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -65,9 +94,10 @@ def test_fetch_next_data_parsing(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["address"] == "123 Example St"
-    assert result["price"] == "£1,000,000"
-    assert result["summary"] == "A beautiful property"
+    assert result.address == "123 Example St"
+    assert result.price == "£1,000,000"
+    assert result.summary == "A beautiful property"
+    assert result.source == NEXT_DATA
 
 
 def test_fetch_html_fallback(monkeypatch):
@@ -77,7 +107,7 @@ def test_fetch_html_fallback(monkeypatch):
     ) as f:
         html = f.read()
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -88,13 +118,12 @@ def test_fetch_html_fallback(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert "address" in result
-    assert "price" in result
-    assert "service_charge" in result
+    assert result.address == "123 Example St"
+    assert result.price_pence == 100_000_000
 
 
 def test_fetch_all_strategies_fail(monkeypatch):
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = "<html></html>"
 
@@ -109,7 +138,7 @@ def test_fetch_all_strategies_fail(monkeypatch):
 
 
 def test_fetch_service_charge_parsing(monkeypatch):
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = "<html><p>Service charge: £300</p></html>"
 
@@ -120,7 +149,9 @@ def test_fetch_service_charge_parsing(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["service_charge"] == "£300"
+    assert result.service_charge == "£300"
+    assert result.service_charge_pence == 30_000
+    assert result.source == HTML
 
 
 def test_fetch_timeout(monkeypatch):
@@ -135,7 +166,7 @@ def test_fetch_timeout(monkeypatch):
 def test_fetch_invalid_json_ld(monkeypatch):
     html = "<html><script type='application/ld+json'>Invalid JSON</script></html>"
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -152,7 +183,7 @@ def test_fetch_invalid_json_ld(monkeypatch):
 def test_fetch_malformed_html(monkeypatch):
     html = "<html><h1>123 Example St"
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -163,11 +194,11 @@ def test_fetch_malformed_html(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["address"] == "123 Example St"
+    assert result.address == "123 Example St"
 
 
 def test_fetch_non_200_status_code(monkeypatch):
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 404
         text = "Not Found"
 
@@ -187,7 +218,7 @@ def test_fetch_json_ld_missing_fields(monkeypatch):
         '"Offer", "itemOffered": {"address": {}}, "price": null}</script></html>'
     )
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -198,8 +229,8 @@ def test_fetch_json_ld_missing_fields(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["address"] is None
-    assert result["price"] is None
+    assert result.address is None
+    assert result.price is None
 
 
 def test_fetch_multiple_json_ld_scripts(monkeypatch):
@@ -211,7 +242,7 @@ def test_fetch_multiple_json_ld_scripts(monkeypatch):
         "</html>"
     )
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -222,8 +253,9 @@ def test_fetch_multiple_json_ld_scripts(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["address"] == "Valid Address"
-    assert result["price"] == "£123"
+    assert result.address == "Valid Address"
+    assert result.price == "£123"
+    assert result.price_pence == 12_300
 
 
 def test_fetch_next_data_missing_fields(monkeypatch):
@@ -233,7 +265,7 @@ def test_fetch_next_data_missing_fields(monkeypatch):
         '{"listing": {}}}}}}</script></html>'
     )
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -244,8 +276,8 @@ def test_fetch_next_data_missing_fields(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["address"] is None
-    assert result["price"] is None
+    assert result.address is None
+    assert result.price is None
 
 
 def test_fetch_html_beds_bathrooms(monkeypatch):
@@ -254,7 +286,7 @@ def test_fetch_html_beds_bathrooms(monkeypatch):
         "</dt><dd>2</dd><dt>Bathrooms</dt><dd>1</dd></dl></html>"
     )
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -265,14 +297,65 @@ def test_fetch_html_beds_bathrooms(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["beds"] == "2"
-    assert result["bathrooms"] == "1"
+    assert result.beds == 2
+    assert result.bathrooms == 1
+
+
+def test_fetch_fields_skip_unrequested_extraction(monkeypatch):
+    next_data = (
+        "<html><script id='__NEXT_DATA__' type='application/json'>"
+        '{"props": {"pageProps": {"initialReduxState": {"propertySummary":'
+        ' {"listing": {"displayAddress": "1 Example St", "formattedPrice":'
+        ' "£1,000"}}, "propertyDescription": {"description": "Long text"}}}}}'
+        "</script></html>"
+    )
+    fallback = (
+        "<html><h1>Some Address</h1><p>£250,000</p><p>Service Charge: £900</p>"
+        "<meta name='description' content='Long text'/>"
+        "<dl><dt>Bedrooms</dt><dd>2</dd></dl></html>"
+    )
+    pages = iter([next_data, fallback])
+
+    class MockResponse(StreamingMockResponse):
+        def __init__(self):
+            self.text = next(pages)
+
+        def raise_for_status(self):
+            pass
+
+    monkeypatch.setattr(
+        RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
+    )
+    result = RightmoveAdapter.fetch("https://example.com", fields=("url", "price"))
+    assert result.price_pence == 100_000
+    assert result.summary is None
+    assert result.source == NEXT_DATA
+
+    result = RightmoveAdapter.fetch("https://example.com", fields=("price",))
+    assert result.source == HTML
+    assert result.price_pence == 25_000_000
+    assert (result.summary, result.beds, result.service_charge_pence) == (
+        None,
+        None,
+        None,
+    )
+    assert result.as_dict(["url", "price"]) == {
+        "url": "https://example.com",
+        "price": "£250,000",
+    }
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields(" url, price ,url") == ("url", "price")
+    with pytest.raises(ValueError, match="bogus"):
+        parse_fields("url,bogus")
 
 
 def test_fetch_html_service_charge_variants(monkeypatch):
     html = "<html><p>Service Charge: £123</p><p>Service charge £456</p></html>"
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -283,7 +366,7 @@ def test_fetch_html_service_charge_variants(monkeypatch):
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
     result = RightmoveAdapter.fetch("https://example.com")
-    assert result["service_charge"] in ["£123", "£456"]
+    assert result.service_charge in ["£123", "£456"]
 
 
 def test_fetch_real_rightmove_html(monkeypatch):
@@ -293,7 +376,7 @@ def test_fetch_real_rightmove_html(monkeypatch):
     ) as f:
         html = f.read()
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -306,18 +389,14 @@ def test_fetch_real_rightmove_html(monkeypatch):
     result = RightmoveAdapter.fetch(
         "https://www.rightmove.co.uk/properties/159360596#/?channel=RES_BUY"
     )
-    assert isinstance(result, dict)
-    assert "url" in result
-    assert "address" in result
-    assert "price" in result
-    assert "beds" in result
-    assert "bathrooms" in result
-    assert "summary" in result
-    assert "service_charge" in result
-
-
-def test_fetch_410_gone_returns_user_friendly_error(monkeypatch):
-    class MockResponse:
+    assert isinstance(result, ListingRecord)
+    assert result.url == "https://www.rightmove.co.uk/properties/159360596"
+    assert result.address == "123 Example St"
+    assert result.price_pence == 100_000_000
+
+
+def test_fetch_410_gone_raises_user_friendly_error(monkeypatch):
+    class MockResponse(StreamingMockResponse):
         status_code = 410
         text = "Gone"
 
@@ -329,15 +408,46 @@ def test_fetch_410_gone_returns_user_friendly_error(monkeypatch):
     monkeypatch.setattr(
         RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
     )
-    result = RightmoveAdapter.fetch("https://example.com")
-    assert "error" in result
-    assert "listing is gone" in result["error"]
+    with pytest.raises(ListingGoneError) as exc_info:
+        RightmoveAdapter.fetch("https://example.com")
+    assert "listing is gone" in exc_info.value.message
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("£1,000,000", 100_000_000),
+        ("£1,234.50 pcm", 123_450),
+        (425000, 42_500_000),
+        (99.99, 9_999),
+        ("POA", None),
+        (None, None),
+    ],
+)
+def test_parse_pence(value, expected):
+    assert parse_pence(value) == expected
+
+
+def test_parse_count_and_format():
+    assert parse_count("2") == 2
+    assert parse_count(3) == 3
+    assert parse_count("Studio") is None
+    assert format_pence(100_000_000) == "£1,000,000"
+    assert format_pence(123_450) == "£1,234.50"
+    assert format_pence(None) is None
+
+
+def test_listing_record_is_slotted_and_immutable():
+    record = ListingRecord("https://example.com", HTML, price_pence=100)
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.price_pence = 200
 
 
 def test_fetch_next_data_invalid_json(monkeypatch):
     html = "<html><script id='__NEXT_DATA__' type='application/json'>Invalid JSON</script></html>"
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -354,7 +464,7 @@ def test_fetch_next_data_invalid_json(monkeypatch):
 def test_fetch_html_dt_without_dd(monkeypatch):
     html = "<html><dl><dt>Bedrooms</dt></dl></html>"
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -371,7 +481,7 @@ def test_fetch_html_dt_without_dd(monkeypatch):
 def test_fetch_html_no_fields(monkeypatch):
     html = "<html><body>No useful data here</body></html>"
 
-    class MockResponse:
+    class MockResponse(StreamingMockResponse):
         status_code = 200
         text = html
 
@@ -395,13 +505,14 @@ def client():
 
 
 def test_rightmove_api_success(monkeypatch, client):
-    def mock_fetch(url):
-        return {
-            "address": "123 Example St",
-            "price": "£1000000",
-            "summary": "A nice place",
-            "url": url,
-        }
+    def mock_fetch(url, fields=None):
+        return ListingRecord.from_raw(
+            url,
+            JSON_LD,
+            address="123 Example St",
+            price="£1000000",
+            summary="A nice place",
+        )
 
     monkeypatch.setattr(RightmoveAdapter, "fetch", mock_fetch)
     url = "/api/scrape/"
@@ -410,10 +521,12 @@ def test_rightmove_api_success(monkeypatch, client):
     assert "address" in response.json()
     assert response.json()["address"] == "123 Example St"
     assert response.json()["url"] == "https://example.com"
+    assert response.json()["price"] == "£1,000,000"
+    assert response.json()["price_pence"] == 100_000_000
 
 
 def test_rightmove_api_error(monkeypatch, client):
-    def mock_fetch(url):
+    def mock_fetch(url, fields=None):
         raise ValueError("Could not parse property data")
 
     monkeypatch.setattr(RightmoveAdapter, "fetch", mock_fetch)
@@ -449,4 +562,4 @@ def test_scrape_api_smoke_e2e(client):
         assert response.status_code == 200
         data = response.json()
         assert data["address"] == "E2E Test Address"
-        assert data["price"] == "£123456"
+        assert data["price"] == "£123,456"
@@ -0,0 +1,247 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.core.adapters.records import NEXT_DATA, ListingRecord
+from apps.core.adapters.rightmove import RightmoveAdapter
+from apps.core.adapters.scheduling import (
+    BACKGROUND,
+    BULK,
+    INTERACTIVE,
+    LaneScheduler,
+    current_lane,
+    in_lane,
+    lane,
+)
+from apps.core.crawler import SearchCrawler
+from apps.core.models import Listing
+
+
+class ManualLimiter:
+    """A rate budget the test hands tokens out of explicitly."""
+
+    rate = 200.0
+
+    def __init__(self):
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.tokens:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def queue_workers(scheduler, lanes, order):
+    def work(name):
+        with scheduler.slot(name):
+            order.append(name)
+
+    threads = [threading.Thread(target=work, args=(name,)) for name in lanes]
+    for thread in threads:
+        thread.start()
+    wait_for(
+        lambda: sum(lane["queued"] for lane in scheduler.snapshot().values())
+        == len(lanes)
+    )
+    return threads
+
+
+def test_lane_context():
+    assert current_lane() == BULK
+    with lane(INTERACTIVE):
+        assert current_lane() == INTERACTIVE
+        assert in_lane(BACKGROUND, current_lane)() == BACKGROUND
+    assert current_lane() == BULK
+    with pytest.raises(ValueError):
+        with lane("urgent"):
+            pass
+
+
+def test_slots_are_shared_by_weight():
+    scheduler = LaneScheduler(
+        weights={INTERACTIVE: 2, BULK: 1}, concurrency=1, reserved_interactive=0
+    )
+    order = []
+    scheduler.acquire(BACKGROUND)
+    threads = queue_workers(scheduler, [BULK] * 6 + [INTERACTIVE] * 6, order)
+    scheduler.release(BACKGROUND)
+    for thread in threads:
+        thread.join(5)
+
+    assert order[:9].count(INTERACTIVE) == 6
+    assert order.count(BULK) == 6
+
+
+def test_rate_tokens_are_shared_by_weight():
+    limiter = ManualLimiter()
+    scheduler = LaneScheduler(
+        weights={INTERACTIVE: 3, BULK: 1}, concurrency=50, limiter=limiter
+    )
+    order = []
+    threads = queue_workers(scheduler, [BULK] * 10 + [INTERACTIVE] * 10, order)
+    limiter.tokens = 8
+    wait_for(lambda: len(order) == 8)
+
+    assert order.count(INTERACTIVE) == 6
+    assert order.count(BULK) == 2
+    limiter.tokens = 12
+    for thread in threads:
+        thread.join(5)
+    assert len(order) == 20
+
+
+def test_reserved_slot_keeps_interactive_moving():
+    scheduler = LaneScheduler(concurrency=2, reserved_interactive=1)
+    scheduler.acquire(BULK)
+    order = []
+    (bulk,) = queue_workers(scheduler, [BULK], order)
+
+    with scheduler.slot(INTERACTIVE):
+        order.append(INTERACTIVE)
+    assert order == [INTERACTIVE]
+    assert scheduler.snapshot()[BULK]["queued"] == 1
+
+    scheduler.release(BULK)
+    bulk.join(5)
+    assert order == [INTERACTIVE, BULK]
+
+
+def test_try_acquire_never_jumps_the_queue():
+    limiter = ManualLimiter()
+    scheduler = LaneScheduler(concurrency=2, reserved_interactive=1, limiter=limiter)
+    (waiter,) = queue_workers(scheduler, [INTERACTIVE], [])
+    # no rate token: a request is queued, so nothing can slip past it
+    assert not scheduler.try_acquire(BULK)
+
+    limiter.tokens = 3
+    waiter.join(5)
+    assert scheduler.try_acquire(BULK)
+    # the last slot is reserved for interactive requests
+    assert not scheduler.try_acquire(BULK)
+    assert scheduler.try_acquire(INTERACTIVE)
+    assert scheduler.snapshot()[BULK]["active"] == 1
+
+
+def test_snapshot_reports_waits():
+    scheduler = LaneScheduler(concurrency=1, reserved_interactive=0)
+    scheduler.acquire(BULK)
+    order = []
+    (waiter,) = queue_workers(scheduler, [INTERACTIVE], order)
+    time.sleep(0.05)
+    assert scheduler.snapshot()[INTERACTIVE]["oldest_wait"] >= 0.05
+    scheduler.release(BULK)
+    waiter.join(5)
+
+    stats = scheduler.snapshot()[INTERACTIVE]
+    assert stats["dispatched"] == 1
+    assert stats["queued"] == 0
+    assert stats["max_wait"] >= 0.05
+    assert stats["p95_wait"] == stats["max_wait"]
+
+
+def test_adapter_requests_use_caller_lane(monkeypatch):
+    class MockResponse:
+        status_code = 200
+
+    monkeypatch.setattr(
+        RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
+    )
+    with lane(INTERACTIVE):
+        RightmoveAdapter._get("https://www.rightmove.co.uk/properties/1")
+    RightmoveAdapter._get("https://www.rightmove.co.uk/properties/2")
+
+    snapshot = RightmoveAdapter.scheduler().snapshot()
+    assert snapshot[INTERACTIVE]["dispatched"] == 1
+    assert snapshot[BULK]["dispatched"] == 1
+
+
+def test_streamed_response_holds_its_slot_until_closed(monkeypatch):
+    class MockResponse:
+        status_code = 200
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(
+        RightmoveAdapter.session, "get", lambda url, **kwargs: MockResponse()
+    )
+    url = "https://www.rightmove.co.uk/properties/1"
+    RightmoveAdapter._get(url)
+    assert RightmoveAdapter.scheduler().snapshot()[BULK]["active"] == 0
+
+    resp = RightmoveAdapter._get(url, stream=True)
+    assert RightmoveAdapter.scheduler().snapshot()[BULK]["active"] == 1
+    resp.close()
+    resp.close()
+    assert resp.closed
+    assert RightmoveAdapter.scheduler().snapshot()[BULK]["active"] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rescrape_stale_runs_in_background_lane(monkeypatch):
+    old = timezone.now() - timedelta(days=3)
+    for listing_id, scraped_at in (("1", old), ("2", timezone.now())):
+        Listing.objects.create(
+            url=RightmoveAdapter.listing_url(listing_id),
+            listing_id=listing_id,
+            scraped_at=scraped_at,
+        )
+    lanes = []
+
+    def fake_fetch(url):
+        lanes.append(current_lane())
+        return ListingRecord(url, NEXT_DATA, address="Somewhere")
+
+    monkeypatch.setattr(RightmoveAdapter, "fetch", staticmethod(fake_fetch))
+    progress = SearchCrawler(lane=BACKGROUND).rescrape_stale(timedelta(days=1))
+
+    assert progress.listings_found == 1
+    assert progress.fetched == 1
+    assert lanes == [BACKGROUND]
+    assert Listing.objects.get(listing_id="1").scraped_at > old
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rescrape_stale_refetches_stored_urls(monkeypatch):
+    old = timezone.now() - timedelta(days=3)
+    tracked = "https://www.rightmove.co.uk/properties/123?channel=RES_BUY"
+    Listing.objects.create(url=tracked, listing_id="123", scraped_at=old)
+    Listing.objects.create(url="https://example.com/flat", scraped_at=old)
+    fetched = []
+
+    def fake_fetch(url):
+        fetched.append(url)
+        return ListingRecord(url, NEXT_DATA, address="Somewhere")
+
+    monkeypatch.setattr(RightmoveAdapter, "fetch", staticmethod(fake_fetch))
+    SearchCrawler().rescrape_stale(timedelta(days=1))
+
+    assert fetched == [tracked]
+    assert Listing.objects.count() == 2
+    assert Listing.objects.get(listing_id="123").scraped_at > old
+
+
+@pytest.mark.django_db
+def test_lane_metrics_endpoint(client):
+    assert client.get("/api/metrics/lanes/").status_code in (401, 403)
+    admin = get_user_model().objects.create_superuser("admin", "a@b.c", "pw")
+    client.force_login(admin)
+    data = client.get("/api/metrics/lanes/").json()
+    assert set(data) == {INTERACTIVE, BULK, BACKGROUND}
+    assert data[INTERACTIVE]["weight"] == 8
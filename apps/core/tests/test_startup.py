@@ -0,0 +1,58 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import pytest
+
+from apps.core.adapters.rightmove import _LazyClassAttribute
+from apps.core.importtime import cost_by_package, measure_startup, parse_importtime
+
+# Generous ceiling for setup + URLconf in a fresh interpreter; the measured
+# value is recorded on every run so regressions show up in the junit report.
+COLD_START_BUDGET_SECONDS = 3.0
+
+SAMPLE_IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     bs4.element
+import time:       200 |        300 |   bs4
+import time:        50 |         50 |     apps.core.models
+import time:        25 |        375 |   apps.core.views
+import time:        10 |        685 | apps.core
+"""
+
+
+def test_parse_importtime_and_attribute_costs():
+    entries = parse_importtime(SAMPLE_IMPORTTIME)
+    assert [e.name for e in entries][-1] == "apps.core"
+    assert entries[0].depth == 2
+    costs = cost_by_package(entries, ["apps.core", "bs4"])
+    # nested apps.core submodules are not double counted
+    assert costs == {"apps.core": 685, "bs4": 300}
+
+
+@pytest.fixture(scope="module")
+def startup():
+    return measure_startup()
+
+
+def test_cold_start_skips_scraping_stack(startup):
+    loaded = set(startup.modules)
+    assert "apps.core.views" in loaded
+    assert "bs4" not in loaded
+    assert "numpy" not in loaded
+    assert "apps.core.adapters.rightmove" in loaded
+
+
+def test_cold_start_time_budget(startup, record_property):
+    record_property("cold_start_seconds", round(startup.seconds, 4))
+    assert startup.seconds < COLD_START_BUDGET_SECONDS
+
+
+def test_lazy_class_attribute_builds_once():
+    calls = []
+
+    class Holder:
+        value = _LazyClassAttribute(lambda: calls.append(1) or object())
+
+    assert not calls
+    first = Holder.value
+    assert Holder.value is first
+    assert Holder.__dict__["value"] is first
+    assert len(calls) == 1
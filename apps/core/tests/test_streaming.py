@@ -0,0 +1,135 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import json
+
+import pytest
+
+from apps.core.adapters.rightmove import RightmoveAdapter
+from apps.core.adapters.streaming import _TAG_TAIL, ModelScanner, read_until_model
+
+NEXT_DATA = (
+    "<script id='__NEXT_DATA__' type='application/json'>"
+    + json.dumps(
+        {
+            "props": {
+                "pageProps": {
+                    "initialReduxState": {
+                        "propertySummary": {
+                            "listing": {
+                                "displayAddress": "1 Early St, London, E6",
+                                "formattedPrice": "£425,000",
+                                "bedroomNumber": 2,
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    )
+    + "</script>"
+)
+TAIL = "<p>" + "x" * 200_000 + "</p></html>"
+
+
+class FakeStream:
+    status_code = 200
+    encoding = "utf-8"
+
+    def __init__(self, text):
+        self.data = text.encode("utf-8")
+        self.served = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.data), chunk_size):
+            chunk = self.data[start : start + chunk_size]
+            self.served += len(chunk)
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+    def raise_for_status(self):
+        pass
+
+
+def test_scanner_handles_tags_split_across_chunks():
+    scanner = ModelScanner()
+    page = "<html><script>var a = 1;</script>" + NEXT_DATA + TAIL
+    done = [scanner.feed(page[i : i + 7]) for i in range(0, 2000, 7)]
+    assert any(done)
+    assert scanner.model_kind == "next_data"
+
+
+def test_scanner_only_rescans_a_bounded_tail():
+    scanner = ModelScanner()
+    body = "<p>" + "x" * 200_000 + "<script>var a = 1;</script>" + "y" * 50_000
+    for i in range(0, len(body), 1000):
+        assert not scanner.feed(body[i : i + 1000])
+        assert len(scanner._window) <= _TAG_TAIL  # pylint: disable=protected-access
+    assert scanner.text == body
+
+
+def test_scanner_ignores_non_offer_json_ld():
+    scanner = ModelScanner()
+    assert not scanner.feed(
+        '<script type="application/ld+json">{"@type": "Organization"}</script>'
+    )
+    assert scanner.feed(
+        '<script type="application/ld+json">{"@type": "Offer", "price": 1}</script>'
+    )
+    assert scanner.model_kind == "json_ld"
+
+
+def test_scanner_ignores_invalid_next_data():
+    scanner = ModelScanner()
+    assert not scanner.feed(
+        "<script id='__NEXT_DATA__' type='application/json'>nope</script>"
+    )
+
+
+def test_read_stops_after_model_and_closes():
+    resp = FakeStream("<html><head>" + NEXT_DATA + TAIL)
+    page = read_until_model(resp, max_bytes=0, chunk_size=4096)
+    assert page.model_kind == "next_data"
+    assert page.bytes_read < len(resp.data) / 10
+    assert resp.served == page.bytes_read
+    assert resp.closed
+
+
+def test_read_enforces_body_cap():
+    resp = FakeStream("<html>" + TAIL)
+    page = read_until_model(resp, max_bytes=50_000, chunk_size=4096)
+    assert page.truncated
+    assert page.model_kind is None
+    assert page.bytes_read < 60_000
+    assert resp.closed
+
+
+def test_read_whole_body_without_model():
+    resp = FakeStream("<html><h1>No model</h1>£1,000</html>")
+    page = read_until_model(resp, max_bytes=0)
+    assert page.text.endswith("</html>")
+    assert not page.truncated
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3])
+def test_multibyte_characters_split_across_chunks(chunk_size):
+    resp = FakeStream("<html><p>£300</p></html>")
+    page = read_until_model(resp, max_bytes=0, chunk_size=chunk_size)
+    assert "£300" in page.text
+
+
+def test_fetch_reads_only_until_model(monkeypatch):
+    resp = FakeStream("<html><head>" + NEXT_DATA + TAIL)
+    calls = []
+    monkeypatch.setattr(
+        RightmoveAdapter.session,
+        "get",
+        lambda url, **kwargs: calls.append(kwargs) or resp,
+    )
+    record = RightmoveAdapter.fetch("https://www.rightmove.co.uk/properties/1")
+    assert record.address == "1 Early St, London, E6"
+    assert record.price_pence == 42_500_000
+    assert resp.served < len(resp.data) / 10
+    assert resp.closed
+    assert calls[0]["stream"] is True
@@ -0,0 +1,220 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import asyncio
+import socket
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from apps.core.adapters.rightmove import ListingGoneError, RightmoveAdapter
+from apps.core.adapters.transport import HttpxTransport, RequestsTransport
+
+h2_connection = pytest.importorskip("h2.connection")
+h2_config = pytest.importorskip("h2.config")
+h2_events = pytest.importorskip("h2.events")
+pytest.importorskip("httpx")
+
+PAGE = (
+    b"<html><script type='application/ld+json'>"
+    b'{"@type": "Offer", "itemOffered": {"address": {"streetAddress": '
+    b'"1 Fast Lane"}}, "price": 250000}</script></html>'
+)
+PREFACE = b"PRI * HTTP/2.0"
+
+
+class LocalServer:
+    """Cleartext server speaking HTTP/2 (prior knowledge) and HTTP/1.1.
+
+    Counts accepted connections per protocol. HTTP/1.1 responses are
+    delayed by ``delay`` so concurrent clients need parallel connections;
+    paths containing "gone" answer 410.
+    """
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.connections = Counter()
+        self.requests = Counter()
+        self.lock = threading.Lock()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _count(self, protocol, kind="connections"):
+        with self.lock:
+            getattr(self, kind)[protocol] += 1
+
+    def _handle(self, conn):
+        with conn:
+            first = conn.recv(len(PREFACE), socket.MSG_PEEK | socket.MSG_WAITALL)
+            if first == PREFACE:
+                self._count("h2")
+                self._serve_h2(conn)
+            else:
+                self._count("http/1.1")
+                self._serve_http1(conn)
+
+    def _response(self, path):
+        return (410, b"") if "gone" in path else (200, PAGE)
+
+    def _serve_h2(self, conn):
+        h2 = h2_connection.H2Connection(h2_config.H2Configuration(client_side=False))
+        h2.initiate_connection()
+        conn.sendall(h2.data_to_send())
+        while data := conn.recv(65535):
+            for event in h2.receive_data(data):
+                if isinstance(event, h2_events.RequestReceived):
+                    self._count("h2", "requests")
+                    path = dict(event.headers)[b":path"].decode()
+                    status, body = self._response(path)
+                    h2.send_headers(
+                        event.stream_id,
+                        [
+                            (":status", str(status)),
+                            ("content-type", "text/html; charset=utf-8"),
+                            ("content-length", str(len(body))),
+                        ],
+                    )
+                    h2.send_data(event.stream_id, body, end_stream=True)
+                elif isinstance(event, h2_events.ConnectionTerminated):
+                    return
+            conn.sendall(h2.data_to_send())
+
+    def _serve_http1(self, conn):
+        reader = conn.makefile("rb")
+        while request_line := reader.readline():
+            while reader.readline() not in (b"\r\n", b""):
+                pass
+            self._count("http/1.1", "requests")
+            time.sleep(self.delay)
+            status, body = self._response(request_line.split()[1].decode())
+            conn.sendall(
+                f"HTTP/1.1 {status} X\r\nContent-Type: text/html; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+
+    def close(self):
+        # shutdown() wakes the accept() thread; close() alone would leave the
+        # blocked call holding the listener open
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+@pytest.fixture(autouse=True)
+def unthrottled(settings):
+    settings.SCRAPE_RATE_LIMIT = 0
+
+
+@pytest.fixture
+def server():
+    srv = LocalServer()
+    yield srv
+    srv.close()
+
+
+@pytest.fixture
+def h2_transport(monkeypatch):
+    transport = HttpxTransport(http1=False, retries=0)
+    monkeypatch.setattr(RightmoveAdapter, "_transport", transport)
+    yield transport
+    transport.close()
+
+
+def fetch_many(server, count=32, workers=8):
+    urls = [server.url(f"/properties/{n}") for n in range(count)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(RightmoveAdapter.fetch, urls))
+
+
+def test_http2_multiplexes_concurrent_fetches(server, h2_transport):
+    records = fetch_many(server)
+
+    assert {record.address for record in records} == {"1 Fast Lane"}
+    assert server.requests["h2"] == 32
+    assert server.connections == {"h2": 1}
+    stats = h2_transport.stats()
+    assert stats["connections"] == 1
+    assert stats["requests"] == 32
+    assert stats["http_versions"] == {"HTTP/2": 32}
+    assert stats["connect_seconds"] > 0
+
+
+def test_concurrent_handshakes_are_timed_separately(monkeypatch):
+    # pylint: disable=protected-access
+    transport = HttpxTransport(http1=False, retries=0)
+    clock = iter([0.0, 1.0, 3.0, 5.0])
+    monkeypatch.setattr(
+        "apps.core.adapters.transport.time.perf_counter", lambda: next(clock)
+    )
+
+    async def both():
+        a_started, b_done = asyncio.Event(), asyncio.Event()
+
+        async def a():  # connects from t=0 to t=5
+            await transport._trace("connection.connect_tcp.started", {})
+            a_started.set()
+            await b_done.wait()
+            await transport._trace("connection.connect_tcp.complete", {})
+
+        async def b():  # connects from t=1 to t=3, inside a's handshake
+            await a_started.wait()
+            await transport._trace("connection.connect_tcp.started", {})
+            await transport._trace("connection.connect_tcp.complete", {})
+            b_done.set()
+
+        await asyncio.gather(a(), b())
+
+    try:
+        asyncio.run(both())
+        stats = transport.stats()
+        assert stats["connections"] == 2
+        assert stats["connect_seconds"] == pytest.approx(5.0 + 2.0)
+    finally:
+        transport.close()
+
+
+def test_http1_opens_a_connection_per_concurrent_fetch(server, monkeypatch):
+    monkeypatch.setattr(
+        RightmoveAdapter, "_transport", RequestsTransport(RightmoveAdapter.session)
+    )
+    fetch_many(server)
+
+    assert server.requests["http/1.1"] == 32
+    assert server.connections["http/1.1"] > 1
+
+
+def test_httpx_errors_surface_as_requests_errors(server, h2_transport):
+    with pytest.raises(ListingGoneError):
+        RightmoveAdapter.fetch(server.url("/properties/gone"))
+
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        port = sock.getsockname()[1]
+    with pytest.raises(requests.ConnectionError):
+        h2_transport.get(f"http://127.0.0.1:{port}/properties/1")
+
+
+def test_transport_setting_selects_httpx(settings, monkeypatch):
+    settings.SCRAPE_TRANSPORT = "httpx"
+    monkeypatch.setattr(RightmoveAdapter, "_transport", None)
+    transport = RightmoveAdapter.transport()
+    try:
+        assert isinstance(transport, HttpxTransport)
+        assert transport.client.headers["User-Agent"].startswith("Mozilla/5.0")
+    finally:
+        transport.close()
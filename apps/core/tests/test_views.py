@@ -1,6 +1,12 @@
 # pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import gzip
+
 import pytest
-from apps.core.adapters.rightmove import RightmoveAdapterError
+from django.contrib.auth import get_user_model
+from apps.core.adapters.records import JSON_LD, NEXT_DATA, ListingRecord
+from apps.core.adapters.rightmove import ListingGoneError, RightmoveAdapterError
+from apps.core.models import Listing
+from apps.core.services import upsert_listing
 
 
 @pytest.mark.django_db
@@ -14,13 +20,10 @@ def test_scrape_without_url(client):
 @pytest.fixture
 def adapter_monkeypatch(monkeypatch):
     # Patch the fetch method on the RightmoveAdapter as a staticmethod
-    def fake_fetch(url):
-        return {
-            "address": "stubbed",
-            "price": "£123",
-            "url": url,
-            "service_charge": "£300",
-        }
+    def fake_fetch(url, fields=None):
+        return ListingRecord.from_raw(
+            url, JSON_LD, address="stubbed", price="£123", service_charge="£300"
+        )
 
     monkeypatch.setattr(  # pylint: disable=unused-argument
         "apps.core.adapters.rightmove.RightmoveAdapter.fetch", staticmethod(fake_fetch)
@@ -39,12 +42,13 @@ def test_scrape_with_stub(
     data = response.json()
     assert data["address"] == "stubbed"
     assert data["price"] == "£123"
+    assert Listing.objects.get(url="https://example.com").price_pence == 12_300
 
 
 @pytest.mark.django_db
 def test_scrape_adapter_valueerror(monkeypatch, client):
     # Simulate RightmoveAdapter.fetch raising ValueError
-    def fake_fetch(url):
+    def fake_fetch(url, fields=None):
         raise ValueError("Could not parse property data")
 
     monkeypatch.setattr(
@@ -58,7 +62,7 @@ def test_scrape_adapter_valueerror(monkeypatch, client):
 @pytest.mark.django_db
 def test_scrape_adapter_exception(monkeypatch, client):
     # Simulate RightmoveAdapter.fetch raising a custom RightmoveAdapterError
-    def fake_fetch(url):
+    def fake_fetch(url, fields=None):
         raise RightmoveAdapterError("Something went wrong!")
 
     monkeypatch.setattr(
@@ -69,16 +73,26 @@ def test_scrape_adapter_exception(monkeypatch, client):
     assert "unexpected error" in response.json().get("error", "").lower()
 
 
+@pytest.mark.django_db
+def test_scrape_gone_listing_returns_410(monkeypatch, client):
+    def fake_fetch(url, fields=None):
+        raise ListingGoneError(url)
+
+    monkeypatch.setattr(
+        "apps.core.adapters.rightmove.RightmoveAdapter.fetch", staticmethod(fake_fetch)
+    )
+    response = client.post("/api/scrape/", data={"url": "https://example.com"})
+    assert response.status_code == 410
+    assert "listing is gone" in response.json()["error"]
+
+
 @pytest.mark.django_db
 def test_scrape_append_row_called(monkeypatch, client, capsys):
     # Patch both fetch and append_row
-    def fake_fetch(url):
-        return {
-            "url": url,
-            "address": "stubbed",
-            "price": "£123",
-            "service_charge": "£300",
-        }
+    def fake_fetch(url, fields=None):
+        return ListingRecord.from_raw(
+            url, JSON_LD, address="stubbed", price="£123", service_charge="£300"
+        )
 
     monkeypatch.setattr(
         "apps.core.adapters.rightmove.RightmoveAdapter.fetch", staticmethod(fake_fetch)
@@ -95,3 +109,112 @@ def test_scrape_append_row_called(monkeypatch, client, capsys):
         "[sheets] append_row called with: ['https://example.com', 'stubbed', '£123', '£300']"
         in captured.out
     )
+
+
+@pytest.mark.django_db
+def test_scrape_fields_projection_keeps_stored_values(monkeypatch, client):
+    url = "https://www.rightmove.co.uk/properties/1"
+    upsert_listing(
+        ListingRecord(
+            url, NEXT_DATA, address="1 Road, E6", price_pence=1, summary="Long"
+        )
+    )
+    requested = []
+
+    def fake_fetch(url, fields=None):
+        requested.append(fields)
+        return ListingRecord(url, JSON_LD, price_pence=12_300)
+
+    monkeypatch.setattr(
+        "apps.core.adapters.rightmove.RightmoveAdapter.fetch", staticmethod(fake_fetch)
+    )
+    response = client.post("/api/scrape/?fields=url,price", data={"url": url})
+
+    assert response.json() == {"url": url, "price": "£123"}
+    assert requested == [("url", "price")]
+    stored = Listing.objects.get(url=url)
+    assert (stored.price_pence, stored.address, stored.summary) == (
+        12_300,
+        "1 Road, E6",
+        "Long",
+    )
+    assert stored.outcode == "E6"
+
+    response = client.post("/api/scrape/?fields=url,bogus", data={"url": url})
+    assert response.status_code == 400
+    assert "bogus" in response.json()["error"]
+
+
+@pytest.fixture
+def listings(db):
+    for n, address in enumerate(["1 Road, E6", "2 Road, E6", "3 Road, N1"]):
+        upsert_listing(
+            ListingRecord(
+                f"https://www.rightmove.co.uk/properties/{n}",
+                NEXT_DATA,
+                address=address,
+                price_pence=n * 100,
+                summary="x" * 500,
+            )
+        )
+
+
+def test_listing_api_fields_and_filters(listings, client):
+    assert client.get("/api/listings/").status_code == 403
+    client.force_login(get_user_model().objects.create_user("u", "u@example.com"))
+
+    data = client.get("/api/listings/?outcode=e6&fields=url,price_pence").json()
+    assert data["count"] == 2
+    assert all(set(row) == {"url", "price_pence"} for row in data["results"])
+
+    full = client.get("/api/listings/?limit=1").json()
+    assert len(full["results"]) == 1 and full["next"]
+    assert full["results"][0]["summary"] == "x" * 500
+
+    assert client.get("/api/listings/?fields=nope").status_code == 400
+
+
+def test_listing_api_compresses_responses(listings, client):
+    client.force_login(get_user_model().objects.create_user("u", "u@example.com"))
+
+    plain = client.get("/api/listings/")
+    zipped = client.get("/api/listings/", HTTP_ACCEPT_ENCODING="gzip")
+    assert zipped["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped["Vary"]
+    assert gzip.decompress(zipped.content) == plain.content
+    assert len(zipped.content) < len(plain.content)
+
+    brotli = pytest.importorskip("brotli")
+    compressed = client.get("/api/listings/", HTTP_ACCEPT_ENCODING="gzip, br")
+    assert compressed["Content-Encoding"] == "br"
+    assert brotli.decompress(compressed.content) == plain.content
+
+
+def test_html_pages_are_not_compressed(listings, client):
+    # pages carrying CSRF tokens stay uncompressed (BREACH)
+    user = get_user_model().objects.create_superuser("a", "a@example.com", "pw")
+    client.force_login(user)
+
+    browsable = client.get(
+        "/api/listings/", HTTP_ACCEPT="text/html", HTTP_ACCEPT_ENCODING="gzip, br"
+    )
+    assert browsable["Content-Type"].startswith("text/html")
+    assert not browsable.has_header("Content-Encoding")
+
+    admin = client.get("/admin/", HTTP_ACCEPT_ENCODING="gzip, br")
+    assert admin.status_code == 200
+    assert not admin.has_header("Content-Encoding")
+
+
+def test_listing_api_renders_msgpack(listings, client):
+    msgpack = pytest.importorskip("msgpack")
+    client.force_login(get_user_model().objects.create_user("u", "u@example.com"))
+
+    response = client.get(
+        "/api/listings/?fields=url,scraped_at", HTTP_ACCEPT="application/msgpack"
+    )
+    assert response["Content-Type"] == "application/msgpack"
+    data = msgpack.unpackb(response.content)
+    assert data["count"] == 3
+    assert data["results"][0]["url"].startswith("https://www.rightmove.co.uk/")
+    assert isinstance(data["results"][0]["scraped_at"], str)
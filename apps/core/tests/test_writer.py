@@ -0,0 +1,75 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import DatabaseError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from apps.core import writer as writer_module
+from apps.core.adapters.records import NEXT_DATA, ListingRecord
+from apps.core.models import Listing
+from apps.core.writer import BatchWriter
+
+
+def record(n):
+    return ListingRecord(
+        f"https://www.rightmove.co.uk/properties/{n}",
+        NEXT_DATA,
+        address=f"{n} High Street, London E6 1AA",
+        price_pence=10**7 + n,
+    )
+
+
+@pytest.fixture
+def writer():
+    instance = BatchWriter(batch_size=50, max_delay=0.05)
+    yield instance
+    instance.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_submits_are_committed_in_batches(writer):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        saves = list(pool.map(lambda n: writer.submit(record(n)), range(200)))
+    listings = [save.result(timeout=10) for save in saves]
+
+    assert {listing.listing_id for listing in listings} == {str(n) for n in range(200)}
+    assert Listing.objects.count() == 200
+    assert writer.stats["written"] == 200
+    assert writer.stats["batches"] < 50
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failing_record_does_not_sink_its_batch(writer, monkeypatch):
+    real_upsert = writer_module.upsert_listing
+
+    def flaky_upsert(rec, provider):
+        if rec.url.endswith("/13"):
+            raise DatabaseError("disk full")
+        return real_upsert(rec, provider)
+
+    monkeypatch.setattr(writer_module, "upsert_listing", flaky_upsert)
+    saves = [writer.submit(record(n)) for n in range(20)]
+    writer.close()
+
+    assert isinstance(saves[13].exception(timeout=5), DatabaseError)
+    assert all(save.result(timeout=5) for i, save in enumerate(saves) if i != 13)
+    assert Listing.objects.count() == 19
+    assert writer.stats["failed"] == 1
+
+
+def test_sqlite_connections_use_wal(tmp_path, django_db_blocker):
+    settings_dict = copy.deepcopy(connection.settings_dict)
+    settings_dict["NAME"] = str(tmp_path / "wal.sqlite3")
+    wrapper = DatabaseWrapper(settings_dict)
+    with django_db_blocker.unblock():
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                assert cursor.fetchone()[0] == "wal"
+                cursor.execute("PRAGMA synchronous")
+                assert cursor.fetchone()[0] == 1  # NORMAL
+            assert wrapper.transaction_mode == "IMMEDIATE"
+        finally:
+            wrapper.close()
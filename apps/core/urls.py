@@ -1,10 +1,39 @@
 from django.urls import path
-from apps.core.views import ScrapeView, ProviderConfigViewSet
+from apps.core.views import (
+    BreakerMetricsView,
+    CrawlView,
+    ExportView,
+    LaneMetricsView,
+    ListingViewSet,
+    MarketAnalyticsView,
+    ProfileView,
+    PropertyClusterViewSet,
+    ProviderConfigViewSet,
+    SavedSearchViewSet,
+    ScrapeView,
+    TransportMetricsView,
+)
 from rest_framework.routers import SimpleRouter
 
 router = SimpleRouter()
+router.register(r"listings", ListingViewSet, basename="listing")
 router.register(r"configs", ProviderConfigViewSet, basename="config")
+router.register(r"clusters", PropertyClusterViewSet, basename="cluster")
+router.register(r"searches", SavedSearchViewSet, basename="search")
 
 urlpatterns = [
     path("scrape/", ScrapeView.as_view(), name="scrape"),
+    path("crawl/", CrawlView.as_view(), name="crawl"),
+    path("crawl/<str:job_id>/", CrawlView.as_view(), name="crawl-detail"),
+    path("analytics/market/", MarketAnalyticsView.as_view(), name="analytics-market"),
+    path("metrics/breakers/", BreakerMetricsView.as_view(), name="metrics-breakers"),
+    path("metrics/lanes/", LaneMetricsView.as_view(), name="metrics-lanes"),
+    path(
+        "metrics/transport/",
+        TransportMetricsView.as_view(),
+        name="metrics-transport",
+    ),
+    path("profiles/", ProfileView.as_view(), name="profile-list"),
+    path("profiles/<str:name>/", ProfileView.as_view(), name="profile-detail"),
+    path("listings/export/<str:fmt>/", ExportView.as_view(), name="listing-export"),
 ] + router.urls
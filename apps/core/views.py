@@ -3,29 +3,66 @@ Views for the core app of the Property Manager project.
 
 This file contains:
 - API views for scraping property data and appending it to Google Sheets
-- ViewSets for managing provider configurations
+- API views for crawling search-results URLs into stored listings
+- A streaming export of stored listings as CSV, JSONL or Parquet
+- Admin download of request profiles captured with ``X-Profile``
+- Admin metrics views exposing circuit breaker state and priority-lane queues
+- Market analytics over stored listings
+- Read-only access to stored listings and to clusters of duplicate listings
+- ViewSets for managing provider configurations and saved-search alerts
 """
 
+from django.db.models import Count
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, viewsets, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
 from apps.sheets.sheets import append_row
 
-from .adapters.rightmove import RightmoveAdapter, RightmoveAdapterError
-from .models import ProviderConfig
-from .serializers import ProviderConfigSerializer
+from . import analytics, profiling
+from .adapters.circuit import CircuitOpenError, all_breakers
+from .adapters.records import parse_fields
+from .adapters.rightmove import (
+    ListingGoneError,
+    RightmoveAdapter,
+    RightmoveAdapterError,
+)
+from .adapters.scheduling import INTERACTIVE, lane
+from .crawler import CrawlLimitError, get_crawl, start_crawl
+from .exporters import (
+    FORMATS,
+    ExportUnavailableError,
+    export_listings,
+    filter_listings,
+)
+from .models import Listing, PropertyCluster, ProviderConfig, SavedSearch
+from .serializers import (
+    ListingSerializer,
+    PropertyClusterSerializer,
+    ProviderConfigSerializer,
+    SavedSearchSerializer,
+)
+from .services import sheet_row, upsert_listing
 
 
-class ScrapeView(APIView):
-    """API view to scrape property data from a given URL and append it to Google Sheets."""
+class ScrapeView(profiling.ProfiledViewMixin, APIView):
+    """API view to scrape property data from a given URL and append it to Google Sheets.
+
+    Staff can profile a scrape with ``X-Profile: sample|cprofile``.
+    """
 
     permission_classes = [permissions.AllowAny]
+    profile_label = "scrape"
 
     def post(self, request):
         """Handle POST requests to scrape property data from the provided URL.
 
         Args:
-            request: The HTTP request object containing the 'url' in the body.
+            request: The HTTP request object containing the 'url' in the body;
+                ``?fields=url,price`` returns (and extracts) only those fields.
 
         Returns:
             Response: A JSON response with the scraped data or an error message.
@@ -37,16 +74,25 @@ class ScrapeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         try:
-            data = RightmoveAdapter.fetch(url)
-            append_row(
-                [
-                    data.get("url"),
-                    data.get("address"),
-                    data.get("price"),
-                    data.get("service_charge"),
-                ]
+            fields = parse_fields(request.query_params.get("fields"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with lane(INTERACTIVE):
+                record = RightmoveAdapter.fetch(url, fields=fields)
+            listing = upsert_listing(record, fields=fields)
+            # From the stored row: a projected fetch leaves unrequested
+            # values out of the record, not out of the sheet
+            append_row(sheet_row(listing))
+            return Response(record.as_dict(fields), status=status.HTTP_200_OK)
+        except ListingGoneError as exc:
+            return Response({"error": exc.message}, status=status.HTTP_410_GONE)
+        except CircuitOpenError as exc:
+            return Response(
+                {"error": str(exc)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(max(1, round(exc.retry_after)))},
             )
-            return Response(data, status=status.HTTP_200_OK)
         except ValueError as exc:
             return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         except (TypeError, KeyError, AttributeError) as exc:
@@ -61,9 +107,251 @@ class ScrapeView(APIView):
             )
 
 
+class CrawlView(APIView):
+    """API view to crawl a search-results URL in the background.
+
+    Only ``CRAWL_MAX_JOBS`` crawls run at once; further requests get 429.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """Start crawling the search URL given in the request body.
+
+        Returns:
+            Response: 202 with the crawl id and initial progress, or 429 when
+            too many crawls are already running.
+        """
+        url = request.data.get("url")
+        if not url or not RightmoveAdapter.is_search_url(url):
+            return Response(
+                {
+                    "error": (
+                        "You must provide a search-results 'url' in the request body."
+                    )
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            job = start_crawl(url)
+        except CrawlLimitError as exc:
+            return Response(
+                {"error": str(exc)}, status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+        return Response(
+            {"id": job.id, **job.progress.as_dict()}, status=status.HTTP_202_ACCEPTED
+        )
+
+    def get(self, request, job_id):
+        """Return the progress of a running or finished crawl."""
+        job = get_crawl(job_id)
+        if job is None:
+            return Response(
+                {"error": "Unknown crawl id."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response({"id": job.id, **job.progress.as_dict()})
+
+
+class ExportView(APIView):
+    """API view streaming stored listings in a bulk export format."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, fmt):
+        """Stream all listings matching ``provider``/``since``/``until`` filters.
+
+        Returns:
+            StreamingHttpResponse: the encoded listings, a 400 on bad input or
+            a 501 when the format's optional package isn't installed.
+        """
+        if fmt not in FORMATS:
+            return Response(
+                {"error": f"Unsupported format; choose one of {sorted(FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            queryset = filter_listings(request.query_params)
+            chunks = export_listings(queryset, fmt)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except ExportUnavailableError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        content_type, extension, _ = FORMATS[fmt]
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="listings.{extension}"'
+        return response
+
+
+class BreakerMetricsView(APIView):
+    """API view reporting the state of every provider circuit breaker."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """Return a snapshot per provider: state, window error rate, totals."""
+        return Response(
+            {name: breaker.snapshot() for name, breaker in all_breakers().items()}
+        )
+
+
+class ProfileView(APIView):
+    """API view listing and serving stored request profiles."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, name=None):
+        """List stored profiles, newest first, or download the profile ``name``."""
+        if name is None:
+            return Response(
+                [
+                    {
+                        "name": path.name,
+                        "size": path.stat().st_size,
+                        "url": request.build_absolute_uri(
+                            reverse("profile-detail", args=[path.name])
+                        ),
+                    }
+                    for path in profiling.list_profiles()
+                ]
+            )
+        path = profiling.profile_path(name)
+        if path is None:
+            raise Http404("No such profile.")
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
+
+
+class LaneMetricsView(APIView):
+    """API view reporting queue depth and wait times per scrape priority lane."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """Return weight, queued/active requests and wait times (seconds) per lane."""
+        return Response(RightmoveAdapter.scheduler().snapshot())
+
+
+class TransportMetricsView(APIView):
+    """API view reporting the scrape transport's request and connection counts."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """Return requests sent, connections opened and handshake time (seconds)."""
+        return Response(RightmoveAdapter.transport().stats())
+
+
+class MarketAnalyticsView(APIView):
+    """API view with price and service-charge aggregates over stored listings."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Return aggregates for ``?outcode=`` (or every listing).
+
+        ``?bins=`` sets the number of price-per-bed histogram buckets.
+        """
+        outcode = (request.query_params.get("outcode") or "").upper() or None
+        try:
+            bins = int(request.query_params.get("bins", analytics.DEFAULT_BINS))
+            if not 1 <= bins <= 200:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"error": "'bins' must be an integer between 1 and 200."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(analytics.snapshot.market(outcode, bins))
+
+
 class ProviderConfigViewSet(viewsets.ModelViewSet):
     """ViewSet for managing ProviderConfig objects."""
 
     permission_classes = [permissions.IsAdminUser]
     queryset = ProviderConfig.objects.all()
     serializer_class = ProviderConfigSerializer
+
+
+class ListingPagination(LimitOffsetPagination):
+    default_limit = 100
+    max_limit = 1000
+
+
+class ListingViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet reading stored listings, most recently scraped first.
+
+    ``?outcode=`` and ``?provider=`` filter the list. ``?fields=url,price_pence``
+    returns only those fields and loads only those columns.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ListingSerializer
+    pagination_class = ListingPagination
+
+    def requested_fields(self):
+        try:
+            return parse_fields(
+                self.request.query_params.get("fields"), ListingSerializer.Meta.fields
+            )
+        except ValueError as exc:
+            raise ValidationError({"fields": str(exc)}) from exc
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, fields=self.requested_fields(), **kwargs)
+
+    def get_queryset(self):
+        queryset = Listing.objects.order_by("-scraped_at", "-id")
+        if fields := self.requested_fields():
+            queryset = queryset.only(*fields)
+        if self.action != "list":
+            return queryset
+        if outcode := self.request.query_params.get("outcode"):
+            queryset = queryset.filter(outcode=outcode.upper())
+        if provider := self.request.query_params.get("provider"):
+            queryset = queryset.filter(provider=provider)
+        return queryset
+
+
+class PropertyClusterViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet listing groups of listings that are the same property.
+
+    Only clusters with at least ``?min_size=`` (default 2) listings are
+    returned; ``?url=`` finds the cluster containing a given listing.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = PropertyClusterSerializer
+
+    def get_queryset(self):
+        queryset = (
+            PropertyCluster.objects.annotate(size=Count("listings"))
+            .prefetch_related("listings")
+            .order_by("-updated_at")
+        )
+        if self.action != "list":
+            return queryset
+        if url := self.request.query_params.get("url"):
+            return queryset.filter(listings__url=url)
+        try:
+            min_size = int(self.request.query_params.get("min_size", 2))
+        except ValueError:
+            min_size = 2
+        return queryset.filter(size__gte=min_size)
+
+
+class SavedSearchViewSet(viewsets.ModelViewSet):
+    """ViewSet for the current user's saved searches.
+
+    New and re-priced listings matching an active search are delivered to
+    its ``webhook_url`` and/or ``email``.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = SavedSearchSerializer
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(owner=self.request.user).order_by(
+            "-created_at"
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
@@ -0,0 +1,146 @@
+"""
+Single-writer ingest pipeline for scraped listings.
+
+Crawl workers hand records to ``BatchWriter.submit`` instead of writing
+themselves; one writer thread drains the queue and upserts up to
+``batch_size`` records per transaction. On SQLite that means one writer
+lock and one commit per batch instead of per listing, so ingest throughput
+grows with the number of fetch workers rather than collapsing into lock
+contention. The same code runs unchanged on MySQL, where batching still
+saves a commit round-trip per listing.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .adapters.records import ListingRecord
+from .models import Listing
+from .services import upsert_listing
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+_Item = Tuple[ListingRecord, str, Future]
+
+
+class BatchWriter:
+    """Upsert submitted records from a single background thread, in batches."""
+
+    def __init__(
+        self, batch_size: int = 100, max_delay: float = 0.05, max_queue: int = 1000
+    ):
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        # Bounded, so fetch workers slow down when the database falls behind
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"batches": 0, "written": 0, "failed": 0}
+
+    def submit(
+        self, record: ListingRecord, provider: str = "rightmove"
+    ) -> "Future[Listing]":
+        """Queue ``record``.
+
+        The future resolves to the stored ``Listing`` once committed.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="ingest-writer", daemon=True
+                )
+                self._thread.start()
+        future: "Future[Listing]" = Future()
+        self._queue.put((record, provider, future))
+        return future
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write everything already submitted, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _next_batch(self) -> Tuple[List[_Item], bool]:
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._write(batch)
+        finally:
+            connection.close()
+
+    def _write(self, batch: List[_Item]) -> None:
+        # pylint: disable=broad-exception-caught
+        # Any error must reach the submitter's future; a dead writer thread
+        # would leave every later submit() waiting forever.
+        try:
+            with transaction.atomic():
+                listings = [
+                    upsert_listing(record, provider) for record, provider, _ in batch
+                ]
+        except Exception:
+            logger.warning(
+                "Ingest batch of %d failed; retrying one by one",
+                len(batch),
+                exc_info=True,
+            )
+            for record, provider, future in batch:
+                try:
+                    with transaction.atomic():
+                        future.set_result(upsert_listing(record, provider))
+                    self.stats["written"] += 1
+                except Exception as exc:
+                    self.stats["failed"] += 1
+                    future.set_exception(exc)
+        else:
+            for (_, _, future), listing in zip(batch, listings):
+                future.set_result(listing)
+            self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+
+_writer: Optional[BatchWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> BatchWriter:
+    """The process-wide writer every crawl submits to."""
+    global _writer  # pylint: disable=global-statement
+    with _writer_lock:
+        if _writer is None:
+            _writer = BatchWriter(
+                batch_size=getattr(settings, "INGEST_BATCH_SIZE", 100),
+                max_delay=getattr(settings, "INGEST_BATCH_DELAY", 0.05),
+            )
+        return _writer
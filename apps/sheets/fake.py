@@ -0,0 +1,75 @@
+# pylint: disable=invalid-name, redefined-builtin, unused-argument
+"""
+In-memory stand-in for the Google Sheets API client.
+
+Implements the ``spreadsheets().values()`` calls ``SheetSync`` makes
+(``get``, ``batchUpdate``, ``append``) over a list of rows, and counts them,
+for tests and for trying the integration locally without credentials.
+Exceptions queued in ``errors`` are raised by the next calls instead.
+"""
+
+import re
+from collections import Counter
+from typing import List
+
+_CELL_RE = re.compile(r"!\$?[A-Z]+\$?(\d+)")
+
+
+class _Request:
+    def __init__(self, result, errors):
+        self._result = result
+        self._errors = errors
+
+    def execute(self):
+        if self._errors:
+            raise self._errors.pop(0)
+        return self._result()
+
+
+class FakeSheetsService:
+    """A single-sheet spreadsheet; ``rows[0]`` is row 1."""
+
+    def __init__(self, rows: List[List[str]] = None):
+        self.rows = [list(row) for row in rows or []]
+        self.calls: Counter = Counter()
+        self.errors: List[Exception] = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId, range):
+        def result():
+            self.calls["get"] += 1
+            return {"values": [list(row) for row in self.rows]}
+
+        return _Request(result, self.errors)
+
+    def batchUpdate(self, spreadsheetId, body):
+        def result():
+            self.calls["batchUpdate"] += 1
+            for update in body["data"]:
+                number = int(_CELL_RE.search(update["range"]).group(1))
+                while len(self.rows) < number:
+                    self.rows.append([])
+                self.rows[number - 1] = list(update["values"][0])
+            return {"totalUpdatedRows": len(body["data"])}
+
+        return _Request(result, self.errors)
+
+    def append(self, spreadsheetId, range, valueInputOption, insertDataOption, body):
+        def result():
+            self.calls["append"] += 1
+            first = len(self.rows) + 1
+            self.rows.extend(list(row) for row in body["values"])
+            last = len(self.rows)
+            return {
+                "updates": {
+                    "updatedRange": f"Sheet1!A{first}:D{last}",
+                    "updatedRows": last - first + 1,
+                }
+            }
+
+        return _Request(result, self.errors)
@@ -1,6 +1,279 @@
+"""
+Google Sheets integration: one row per listing URL.
+
+``SheetSync`` keeps a local index of URL -> row number (and each row's last
+written values), so a rescrape updates the listing's existing row in place
+instead of appending a duplicate. The index is loaded from the sheet once,
+then kept current from the row numbers the API reports for appends; every
+``resync_seconds`` it is rebuilt from the sheet to repair drift from manual
+edits. Writes are batched: all changed rows go in one ``values.batchUpdate``
+and all new rows in one ``values.append``; crawls send their rows through
+``write_rows`` in chunks of ``GOOGLE_SHEETS_BATCH_ROWS``.
+
+The sheet is a copy of stored listings, so a Sheets failure (API error,
+auth, network) is logged and the index marked for resync rather than
+raised to the caller. Without credentials configured, ``append_row`` and
+``write_rows`` only log.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = 4  # url, address, price, service charge
+_ROW_RE = re.compile(r"!\$?[A-Z]+\$?(\d+)")
+
+
+def api_errors() -> Tuple[type, ...]:
+    """Exceptions a Sheets call can raise: API, auth and transport errors."""
+    errors = [OSError]
+    # pylint: disable=import-outside-toplevel
+    try:
+        from googleapiclient.errors import Error
+
+        errors.append(Error)
+    except ImportError:
+        pass
+    try:
+        from google.auth.exceptions import GoogleAuthError
+
+        errors.append(GoogleAuthError)
+    except ImportError:
+        pass
+    try:
+        from httplib2 import HttpLib2Error
+
+        errors.append(HttpLib2Error)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def _last_column() -> str:
+    return chr(ord("A") + COLUMNS - 1)
+
+
+class SheetSync:
+    """Write listing rows to a sheet, keyed on the URL in column A."""
+
+    def __init__(
+        self,
+        service,
+        spreadsheet_id: str,
+        sheet: str = "Sheet1",
+        resync_seconds: float = 3600,
+    ):
+        self.service = service
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet = sheet
+        self.resync_seconds = resync_seconds
+        self.rows: Dict[str, int] = {}
+        self.cache: Dict[int, List[str]] = {}
+        self._next_row = 1
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _values(self):
+        return self.service.spreadsheets().values()  # pylint: disable=no-member
+
+    def _range(self, first: int, last: Optional[int] = None) -> str:
+        return f"'{self.sheet}'!A{first}:{_last_column()}{last or first}"
+
+    def resync(self) -> None:
+        """Rebuild the index from the sheet's current contents."""
+        result = (
+            self._values()
+            .get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"'{self.sheet}'!A:{_last_column()}",
+            )
+            .execute()
+        )
+        rows = result.get("values", [])
+        self.rows, self.cache = {}, {}
+        for number, values in enumerate(rows, start=1):
+            values = [str(v) for v in values]
+            self.cache[number] = values
+            if values and values[0]:
+                # On duplicate URLs (from before the index) keep the first row
+                self.rows.setdefault(values[0], number)
+        self._next_row = len(rows) + 1
+        self._synced_at = time.monotonic()
+
+    def _due_for_resync(self) -> bool:
+        return (
+            self._synced_at is None
+            or time.monotonic() - self._synced_at >= self.resync_seconds
+        )
+
+    def write_rows(self, rows: Sequence[Sequence]) -> Dict[str, int]:
+        """Update rows whose URL is already in the sheet and append the rest.
+
+        Unchanged rows are skipped. Returns counts of ``updated``,
+        ``appended`` and ``unchanged`` rows; if a Sheets call fails the error
+        is logged, the index is rebuilt on the next write and every row is
+        counted as ``failed``.
+        """
+        with self._lock:
+            try:
+                return self._write_rows(rows)
+            except api_errors() as exc:
+                logger.error(
+                    "Writing %d row(s) to sheet %s failed: %s",
+                    len(rows),
+                    self.sheet,
+                    exc,
+                )
+                self._synced_at = None
+                return {
+                    "updated": 0,
+                    "appended": 0,
+                    "unchanged": 0,
+                    "failed": len(rows),
+                }
+
+    def _write_rows(self, rows: Sequence[Sequence]) -> Dict[str, int]:
+        if self._due_for_resync():
+            self.resync()
+
+        updates, appends = {}, {}
+        unchanged = 0
+        for row in rows:
+            values = ["" if v is None else str(v) for v in row]
+            number = self.rows.get(values[0])
+            if number is None:
+                appends[values[0]] = values  # last write of a URL wins
+            elif self.cache.get(number) == values:
+                unchanged += 1
+            else:
+                updates[number] = values
+
+        if updates:
+            self._values().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={
+                    "valueInputOption": "USER_ENTERED",
+                    "data": [
+                        {"range": self._range(number), "values": [values]}
+                        for number, values in sorted(updates.items())
+                    ],
+                },
+            ).execute()
+            self.cache.update(updates)
+        if appends:
+            self._append(list(appends.values()))
+        return {
+            "updated": len(updates),
+            "appended": len(appends),
+            "unchanged": unchanged,
+        }
+
+    def _append(self, rows: List[List[str]]) -> None:
+        result = (
+            self._values()
+            .append(
+                spreadsheetId=self.spreadsheet_id,
+                range=self._range(1),
+                valueInputOption="USER_ENTERED",
+                insertDataOption="INSERT_ROWS",
+                body={"values": rows},
+            )
+            .execute()
+        )
+        match = _ROW_RE.search(result.get("updates", {}).get("updatedRange", ""))
+        if match is None:
+            # Can't tell where the rows landed; rebuild on the next write
+            self._synced_at = None
+            return
+        first = int(match.group(1))
+        if first != self._next_row:
+            logger.info(
+                "Sheet %s grew outside the index (row %d, expected %d); resyncing soon",
+                self.sheet,
+                first,
+                self._next_row,
+            )
+            self._synced_at = None
+        for offset, values in enumerate(rows):
+            self.rows[values[0]] = first + offset
+            self.cache[first + offset] = values
+        self._next_row = first + len(rows)
+
+
+def _build_service():
+    # pylint: disable=import-outside-toplevel
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+
+    credentials = service_account.Credentials.from_service_account_file(
+        settings.GOOGLE_SHEETS_CREDENTIALS,
+        scopes=["https://www.googleapis.com/auth/spreadsheets"],
+    )
+    return build("sheets", "v4", credentials=credentials, cache_discovery=False)
+
+
+_sync: Optional[SheetSync] = None
+_sync_lock = threading.Lock()
+
+
+def get_sync() -> Optional[SheetSync]:
+    """The process-wide ``SheetSync``, or None if Sheets isn't configured."""
+    global _sync  # pylint: disable=global-statement
+    if not (
+        settings.GOOGLE_SHEETS_CREDENTIALS and settings.GOOGLE_SHEETS_SPREADSHEET_ID
+    ):
+        return None
+    with _sync_lock:
+        if _sync is None:
+            _sync = SheetSync(
+                _build_service(),
+                settings.GOOGLE_SHEETS_SPREADSHEET_ID,
+                sheet=getattr(settings, "GOOGLE_SHEETS_SHEET", "Sheet1"),
+                resync_seconds=getattr(settings, "GOOGLE_SHEETS_RESYNC_SECONDS", 3600),
+            )
+        return _sync
+
+
+def _write(rows: List[list], stub: str) -> Optional[Dict[str, int]]:
+    try:
+        sync = get_sync()
+    except api_errors() as exc:
+        logger.error("Google Sheets is unavailable: %s", exc)
+        return None
+    if sync is None:
+        print(f"[sheets] {stub}")
+        return None
+    return sync.write_rows(rows)
+
+
 def append_row(values: list):
+    """Write a listing row, updating the URL's existing row if it has one.
+
+    When Sheets isn't configured this just logs the row.
     """
-    Stub for Google Sheets integration.
-    Later this will call the Sheets API; for now we just log.
+    _write([values], f"append_row called with: {values}")
+
+
+def write_rows(rows: List[list]) -> Optional[Dict[str, int]]:
+    """Write many listing rows, ``GOOGLE_SHEETS_BATCH_ROWS`` per batch.
+
+    Returns the summed counts, or None when Sheets isn't configured.
     """
-    print(f"[sheets] append_row called with: {values}")
+    size = getattr(settings, "GOOGLE_SHEETS_BATCH_ROWS", 500)
+    totals: Optional[Dict[str, int]] = None
+    for start in range(0, len(rows), size):
+        counts = _write(
+            rows[start : start + size], f"write_rows called with {len(rows)} rows"
+        )
+        if counts is None:
+            return None
+        totals = totals or {}
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
@@ -0,0 +1,143 @@
+# pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring, redefined-outer-name
+import pytest
+
+from apps.core.adapters.records import JSON_LD, ListingRecord
+from apps.core.adapters.rightmove import RightmoveAdapter
+from apps.sheets import sheets
+from apps.sheets.fake import FakeSheetsService
+from apps.sheets.sheets import SheetSync
+
+HEADER = ["url", "address", "price", "service charge"]
+
+
+def row(n, price="£100,000"):
+    return [f"https://www.rightmove.co.uk/properties/{n}", f"{n} High St", price, ""]
+
+
+@pytest.fixture
+def service():
+    return FakeSheetsService([HEADER, row(1), row(2)])
+
+
+def test_rescrape_updates_row_in_place(service):
+    sync = SheetSync(service, "sheet-id")
+    result = sync.write_rows([row(2, price="£95,000"), row(3)])
+
+    assert result == {"updated": 1, "appended": 1, "unchanged": 0}
+    assert service.rows == [HEADER, row(1), row(2, price="£95,000"), row(3)]
+    assert service.calls == {"get": 1, "batchUpdate": 1, "append": 1}
+
+
+def test_index_is_kept_without_rereading(service):
+    sync = SheetSync(service, "sheet-id")
+    sync.write_rows([row(3)])
+    sync.write_rows([row(3, price="£1")])
+    assert sync.write_rows([row(3, price="£1"), row(1)]) == {
+        "updated": 0,
+        "appended": 0,
+        "unchanged": 2,
+    }
+
+    assert service.calls["get"] == 1
+    assert service.rows[3] == row(3, price="£1")
+    assert len(service.rows) == 4
+
+
+def test_changes_are_batched(service):
+    sync = SheetSync(service, "sheet-id")
+    sync.write_rows(
+        [row(1, price="£1"), row(2, price="£2"), row(4), row(5), row(4, "£4")]
+    )
+    assert service.calls == {"get": 1, "batchUpdate": 1, "append": 1}
+    assert service.rows[1:] == [row(1, "£1"), row(2, "£2"), row(4, "£4"), row(5)]
+
+
+def test_periodic_resync_repairs_drift(service, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(sheets.time, "monotonic", lambda: clock[0])
+    sync = SheetSync(service, "sheet-id", resync_seconds=60)
+    sync.write_rows([row(1)])
+
+    # Someone sorts the sheet by hand
+    service.rows[1], service.rows[2] = service.rows[2], service.rows[1]
+    clock[0] += 61
+    sync.write_rows([row(1, price="£1")])
+
+    assert service.calls["get"] == 2
+    assert service.rows == [HEADER, row(2), row(1, "£1")]
+
+
+def test_append_outside_index_forces_resync(service):
+    sync = SheetSync(service, "sheet-id")
+    sync.write_rows([row(1)])
+    service.rows.append(row(9))  # added by hand
+    sync.write_rows([row(3)])
+    sync.write_rows([row(9, price="£9")])
+
+    assert service.calls["get"] == 2
+    assert service.rows[3:] == [row(9, "£9"), row(3)]
+
+
+def test_append_row_without_credentials_logs(settings, capsys):
+    settings.GOOGLE_SHEETS_CREDENTIALS = None
+    sheets.append_row(row(1))
+    assert "[sheets] append_row called with:" in capsys.readouterr().out
+
+
+def test_append_row_uses_configured_sync(settings, service, monkeypatch):
+    settings.GOOGLE_SHEETS_CREDENTIALS = "/secrets/sa.json"
+    settings.GOOGLE_SHEETS_SPREADSHEET_ID = "sheet-id"
+    monkeypatch.setattr(sheets, "_sync", None)
+    monkeypatch.setattr(sheets, "_build_service", lambda: service)
+
+    sheets.append_row(row(2, price="£3"))
+    sheets.append_row(row(2, price="£3"))
+    assert service.rows[2] == row(2, "£3")
+    assert service.calls == {"get": 1, "batchUpdate": 1}
+
+
+def test_api_errors_are_logged_and_force_resync(service, caplog):
+    sync = SheetSync(service, "sheet-id")
+    sync.write_rows([row(1)])
+    service.errors.append(ConnectionResetError("reset by peer"))
+
+    assert sync.write_rows([row(3)]) == {
+        "updated": 0,
+        "appended": 0,
+        "unchanged": 0,
+        "failed": 1,
+    }
+    assert "reset by peer" in caplog.text
+    sync.write_rows([row(3)])
+    assert service.calls["get"] == 2
+    assert service.rows[3:] == [row(3)]
+
+
+@pytest.fixture
+def configured(settings, service, monkeypatch):
+    settings.GOOGLE_SHEETS_CREDENTIALS = "/secrets/sa.json"
+    settings.GOOGLE_SHEETS_SPREADSHEET_ID = "sheet-id"
+    monkeypatch.setattr(sheets, "_sync", None)
+    monkeypatch.setattr(sheets, "_build_service", lambda: service)
+    return service
+
+
+def test_write_rows_sends_batches(settings, configured):
+    settings.GOOGLE_SHEETS_BATCH_ROWS = 2
+    counts = sheets.write_rows([row(n) for n in range(3, 8)] + [row(1, "£1")])
+
+    assert counts == {"updated": 1, "appended": 5, "unchanged": 0}
+    assert configured.calls == {"get": 1, "append": 3, "batchUpdate": 1}
+    assert len(configured.rows) == 8
+
+
+@pytest.mark.django_db
+def test_scrape_succeeds_when_sheets_fails(configured, client, monkeypatch):
+    monkeypatch.setattr(
+        RightmoveAdapter,
+        "fetch",
+        staticmethod(lambda url, fields=None: ListingRecord(url, JSON_LD)),
+    )
+    configured.errors.append(TimeoutError("timed out"))
+    response = client.post("/api/scrape/", {"url": row(1)[0]})
+    assert response.status_code == 200
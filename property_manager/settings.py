@@ -9,6 +9,7 @@ This file contains configurations for:
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -29,6 +30,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # gzip, or Brotli when the optional brotli package is installed; API
+    # responses only, so CSRF-bearing HTML pages are not exposed to BREACH
+    "apps.core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,11 +61,25 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "property_manager.wsgi.application"
 
-# Database: default to SQLite for local dev
+# Database: default to SQLite for local dev. WAL lets readers run alongside
+# the writer; IMMEDIATE transactions take the write lock up front, so
+# concurrent writers wait out `timeout` seconds instead of failing with
+# "database is locked" when a read transaction tries to upgrade.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "timeout": 20,
+            "transaction_mode": "IMMEDIATE",
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA cache_size=-20000;"
+                "PRAGMA mmap_size=134217728;"
+            ),
+        },
     }
 }
 
@@ -91,11 +109,96 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
     ],
+    # MessagePack (Accept: application/msgpack) needs the optional msgpack package
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ]
+    + (["apps.core.renderers.MessagePackRenderer"] if find_spec("msgpack") else []),
+}
+
+# Scraping: request budget shared by every fetch in the process
+SCRAPE_RATE_LIMIT = float(os.getenv("SCRAPE_RATE_LIMIT", "5"))  # requests/second
+SCRAPE_RATE_BURST = int(os.getenv("SCRAPE_RATE_BURST", "10"))
+# Priority lanes: outbound requests in flight at once, the relative share of
+# slots and rate tokens each lane gets under contention, and slots only the
+# interactive lane may use.
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "8"))
+SCRAPE_LANE_WEIGHTS = {"interactive": 8, "bulk": 3, "background": 1}
+SCRAPE_INTERACTIVE_RESERVED = int(os.getenv("SCRAPE_INTERACTIVE_RESERVED", "1"))
+# Hedged fetches (opt-in): a GET still pending after the running p95 latency
+# is duplicated and the first response wins; hedges are capped at max_ratio
+# of requests and only sent when the rate budget has a spare token
+SCRAPE_HEDGING = {
+    "enabled": os.getenv("SCRAPE_HEDGING", "False") == "True",
+    "percentile": 95,
+    "max_ratio": float(os.getenv("SCRAPE_HEDGING_MAX_RATIO", "0.05")),
+    "min_delay": 0.05,
+}
+# Listing pages are streamed; stop reading (and parse what arrived) past this
+SCRAPE_MAX_BODY_BYTES = int(os.getenv("SCRAPE_MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+# HTTP transport for fetches: "requests" (HTTP/1.1 session) or "httpx" (one
+# shared HTTP/2 client multiplexing requests over up to SCRAPE_MAX_CONNECTIONS
+# connections per host; needs httpx[http2])
+SCRAPE_TRANSPORT = os.getenv("SCRAPE_TRANSPORT", "requests")
+SCRAPE_MAX_CONNECTIONS = int(os.getenv("SCRAPE_MAX_CONNECTIONS", "10"))
+
+# Per-provider circuit breaker around outbound fetches: opens when the error
+# rate over the window crosses failure_rate, then probes after open_seconds
+CIRCUIT_BREAKER = {
+    "failure_rate": float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+    "min_calls": int(os.getenv("CIRCUIT_MIN_CALLS", "10")),
+    "window_seconds": float(os.getenv("CIRCUIT_WINDOW_SECONDS", "60")),
+    "open_seconds": float(os.getenv("CIRCUIT_OPEN_SECONDS", "30")),
+    "half_open_probes": int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1")),
 }
 
+# Search crawls: concurrent page/listing fetches and how long a stored
+# listing counts as fresh (skipped on re-crawl)
+CRAWL_MAX_WORKERS = int(os.getenv("CRAWL_MAX_WORKERS", "8"))
+CRAWL_FRESH_SECONDS = int(os.getenv("CRAWL_FRESH_SECONDS", str(24 * 3600)))
+# Background crawls started through the API: how many may run at once and
+# how long a finished one stays pollable
+CRAWL_MAX_JOBS = int(os.getenv("CRAWL_MAX_JOBS", "2"))
+CRAWL_JOB_TTL = int(os.getenv("CRAWL_JOB_TTL", "3600"))
+# Crawled listings are written by one writer thread per process, committing
+# up to INGEST_BATCH_SIZE upserts per transaction (waiting at most
+# INGEST_BATCH_DELAY seconds to fill a batch)
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "100"))
+INGEST_BATCH_DELAY = float(os.getenv("INGEST_BATCH_DELAY", "0.05"))
+
+# Market analytics: seconds before the in-memory columnar snapshot is reloaded
+# from the database (picks up listings written by other processes)
+ANALYTICS_SNAPSHOT_TTL = int(os.getenv("ANALYTICS_SNAPSHOT_TTL", "300"))
+
+# Saved-search alerts: seconds before the in-memory search index is reloaded
+# (picks up searches saved by other processes) and how deliveries are batched
+ALERTS_INDEX_TTL = int(os.getenv("ALERTS_INDEX_TTL", "300"))
+ALERTS_BATCH_SIZE = int(os.getenv("ALERTS_BATCH_SIZE", "50"))
+ALERTS_BATCH_DELAY = float(os.getenv("ALERTS_BATCH_DELAY", "1.0"))
+ALERTS_WEBHOOK_TIMEOUT = float(os.getenv("ALERTS_WEBHOOK_TIMEOUT", "5"))
+# Webhook hosts exempt from the public-address check (comma-separated), for
+# receivers on the local network
+ALERTS_WEBHOOK_ALLOWED_HOSTS = [
+    host for host in os.getenv("ALERTS_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host
+]
+
+# Request profiling: staff send X-Profile: sample|cprofile; a further
+# PROFILE_SAMPLE_RATE fraction of profiled-view traffic is stack-sampled
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", BASE_DIR / "profiles"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+
 # Google Sheets integration
 GOOGLE_SHEETS_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 GOOGLE_SHEETS_SPREADSHEET_ID = os.getenv("GOOGLE_SHEETS_SPREADSHEET_ID")
+GOOGLE_SHEETS_SHEET = os.getenv("GOOGLE_SHEETS_SHEET", "Sheet1")
+# Rebuild the URL -> row index from the sheet this often, to pick up edits
+# made by hand
+GOOGLE_SHEETS_RESYNC_SECONDS = int(os.getenv("GOOGLE_SHEETS_RESYNC_SECONDS", "3600"))
+# Crawls write their rows in batches of this many (one batchUpdate + append each)
+GOOGLE_SHEETS_BATCH_ROWS = int(os.getenv("GOOGLE_SHEETS_BATCH_ROWS", "500"))
 
 # Logging configuration
 LOGGING = {